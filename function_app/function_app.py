@@ -1,14 +1,21 @@
 """Azure Function entry points for the Policy Localisation Engine.
 
-Provides two triggers:
-  - HTTP trigger (POST /api/localise) for on-demand runs
+Provides these triggers:
+  - HTTP trigger (POST /api/localise) to queue an on-demand run
+  - HTTP trigger (GET /api/localise/{run_id}) for a run's live status
+  - Queue trigger that carries out a queued on-demand run
+  - HTTP trigger (POST /api/localise/fanout) to start a sharded run
+  - HTTP trigger (GET /api/metrics) for Prometheus metrics of this host
+  - HTTP trigger (GET /api/preview) to render one document for a look
   - Timer trigger for scheduled annual runs
+  - Queue trigger that processes one shard of a sharded run
 """
 
 import json
 import logging
 import sys
 from pathlib import Path
+from typing import List, Optional
 
 import azure.functions as func
 
@@ -16,33 +23,69 @@ import azure.functions as func
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
 from policy_localiser.config import Config
-from policy_localiser.graph.auth import GraphAuth
-from policy_localiser.graph.client import GraphClient
-from policy_localiser.graph.sharepoint_files import SharePointFiles
-from policy_localiser.graph.sharepoint_lists import SharePointLists
-from policy_localiser.orchestrator.sharepoint_pipeline import SharePointPipeline
+from policy_localiser.orchestrator.deadline import Deadline, function_timeout
+
+# Only azure.functions, the config and the deadline helpers are imported at
+# load time, which keeps indexing (cold start) fast; the Graph client, msal
+# and the pipeline load on first use, docxtpl on the first render.
 
 app = func.FunctionApp()
 
+SHARD_QUEUE = "policy-shards"
+RUN_QUEUE = "policy-runs"
+QUEUE_CONNECTION = "AzureWebJobsStorage"
 
-def _build_pipeline() -> SharePointPipeline:
-    config = Config.from_env()
-    auth = GraphAuth(config.tenant_id, config.client_id, config.client_secret)
-    client = GraphClient(auth)
-    sp_lists = SharePointLists(client, config.sharepoint_site_id)
-    sp_files = SharePointFiles(client, config.sharepoint_site_id)
-    return SharePointPipeline(sp_lists, sp_files)
+# Runs stop admitting documents in time to finish within functionTimeout
+HOST_JSON = Path(__file__).parent / "host.json"
+
+
+def _context():
+    """Client, caches and history shared by invocations on this host.
+
+    Kept while the host stays warm and rebuilt if the app settings change.
+    """
+    from policy_localiser.orchestrator.context import get_context
+
+    return get_context()
+
+
+def _fan_out(
+    shards: func.Out[List[str]],
+    school_filter: Optional[List[str]] = None,
+    template_filter: Optional[List[str]] = None,
+    schools_per_shard: int = 1,
+) -> list:
+    from policy_localiser.orchestrator.sharding import start_run
+
+    context = _context()
+    plan = start_run(
+        context.sp_lists,
+        context.config.run_record_dir,
+        school_filter=school_filter,
+        template_filter=template_filter,
+        schools_per_shard=schools_per_shard,
+    )
+    shards.set([shard.to_message() for shard in plan])
+    return plan
 
 
 @app.route(route="localise", methods=["POST"], auth_level=func.AuthLevel.FUNCTION)
-def manual_trigger(req: func.HttpRequest) -> func.HttpResponse:
+@app.queue_output(arg_name="runs", queue_name=RUN_QUEUE, connection=QUEUE_CONNECTION)
+def manual_trigger(req: func.HttpRequest, runs: func.Out[str]) -> func.HttpResponse:
     """HTTP trigger for on-demand runs.
 
     POST body (optional):
     {
         "schools": ["STM", "HFC"],     // filter to specific schools
-        "templates": ["Enrolment Policy"]  // filter to specific templates
+        "templates": ["Enrolment Policy"],  // filter to specific templates
+        "incremental": true,                // only re-render what changed
+        "resume": "a1b2c3d4",               // continue an interrupted run
+        "plan": true                        // estimate only, change nothing
     }
+
+    A plan is returned directly. Anything else is queued for run_worker
+    and answered at once with 202 Accepted and the run ID; poll the
+    Location URL (GET /api/localise/{run_id}) for progress.
     """
     logging.info("Manual policy localisation triggered")
 
@@ -52,30 +95,228 @@ def manual_trigger(req: func.HttpRequest) -> func.HttpResponse:
     except ValueError:
         pass
 
-    school_filter = body.get("schools")
-    template_filter = body.get("templates")
+    try:
+        context = _context()
+        if body.get("plan"):
+            plan = context.pipeline().plan(
+                school_filter=body.get("schools"),
+                template_filter=body.get("templates"),
+                resume=body.get("resume"),
+            )
+            return func.HttpResponse(
+                json.dumps(plan.to_dict()),
+                mimetype="application/json",
+                status_code=200,
+            )
+        from policy_localiser.orchestrator.run_status import STALE_MARGIN
+
+        # A run queued or running for longer than a Function can live is dead
+        timeout = function_timeout(HOST_JSON)
+        try:
+            run_id = context.submit_run(
+                body, stale_after=timeout + STALE_MARGIN if timeout else None
+            )
+        except ValueError as e:
+            # Not a run ID
+            return func.HttpResponse(
+                json.dumps({"error": str(e)}),
+                mimetype="application/json",
+                status_code=400,
+            )
+        except RuntimeError as e:
+            # Already queued or running
+            return func.HttpResponse(
+                json.dumps({"error": str(e)}),
+                mimetype="application/json",
+                status_code=409,
+            )
+    except Exception as e:
+        logging.exception("Policy localisation failed")
+        return func.HttpResponse(
+            json.dumps({"error": str(e)}),
+            mimetype="application/json",
+            status_code=500,
+        )
+
+    runs.set(json.dumps({"run_id": run_id, "request": body}))
+    status_url = f"{req.url.split('?')[0].rstrip('/')}/{run_id}"
+    return func.HttpResponse(
+        json.dumps({"run_id": run_id, "state": "queued", "status": status_url}),
+        mimetype="application/json",
+        status_code=202,
+        headers={"Location": status_url, "Retry-After": "5"},
+    )
+
+
+@app.route(
+    route="localise/{run_id}", methods=["GET"], auth_level=func.AuthLevel.FUNCTION
+)
+def run_status(req: func.HttpRequest) -> func.HttpResponse:
+    """Live status of a queued run: state, progress counts, per-stage
+    timings, failures and, once finished, any continuation run ID."""
+    from policy_localiser.orchestrator.run_status import RunStatusStore
 
+    # Reads one file on the shared mount; no Graph client is needed
+    run_id = req.route_params.get("run_id", "")
+    config = Config.from_env()
     try:
-        pipeline = _build_pipeline()
-        results = pipeline.run(
-            school_filter=school_filter,
-            template_filter=template_filter,
+        config.check_shared_storage()
+    except ValueError as e:
+        # A relative RUN_RECORD_DIR is per instance, so runs would go missing
+        logging.error(str(e))
+        return func.HttpResponse(
+            json.dumps({"error": str(e)}),
+            mimetype="application/json",
+            status_code=500,
         )
+    status = RunStatusStore(config.run_record_dir).load(run_id)
+    if status is None:
+        return func.HttpResponse(
+            json.dumps({"error": f"No run '{run_id}'"}),
+            mimetype="application/json",
+            status_code=404,
+        )
+    return func.HttpResponse(
+        json.dumps(status.to_dict()),
+        mimetype="application/json",
+        status_code=200,
+    )
 
-        success = sum(1 for r in results if r.status.value == "Success")
-        failed = sum(1 for r in results if r.status.value == "Error")
 
+@app.queue_trigger(arg_name="msg", queue_name=RUN_QUEUE, connection=QUEUE_CONNECTION)
+def run_worker(msg: func.QueueMessage) -> None:
+    """Carry out a run queued by manual_trigger.
+
+    The run stops starting documents in time to finish within
+    functionTimeout; its status then carries a continuation run ID to
+    POST back as "resume". Failures are recorded in the status, not
+    raised, so the queue does not start the run over.
+    """
+    message = json.loads(msg.get_body().decode("utf-8"))
+    status = _context().execute_run(
+        message["run_id"],
+        message.get("request", {}),
+        deadline=Deadline.from_host_json(HOST_JSON),
+    )
+    logging.info(
+        f"Run {status.run_id} {status.state}: {status.processed} of "
+        f"{status.total} document(s), {status.counts.get('Error', 0)} failed"
+    )
+
+
+@app.route(route="metrics", methods=["GET"], auth_level=func.AuthLevel.FUNCTION)
+def metrics(req: func.HttpRequest) -> func.HttpResponse:
+    """Prometheus text exposition of this host's metrics since it started.
+
+    Each instance reports its own totals; scrape every instance (or sum
+    them) when the app is scaled out.
+    """
+    from policy_localiser.metrics import CONTENT_TYPE, REGISTRY
+
+    return func.HttpResponse(
+        REGISTRY.render(),
+        headers={"Content-Type": CONTENT_TYPE},
+        status_code=200,
+    )
+
+
+@app.route(route="preview", methods=["GET"], auth_level=func.AuthLevel.FUNCTION)
+def preview(req: func.HttpRequest) -> func.HttpResponse:
+    """Render one policy for one school and return the .docx.
+
+    GET /api/preview?school=STM&template=Enrolment Policy
+
+    Rendered in memory from the host's caches; nothing is uploaded or
+    logged. 404 for an unknown school or template, 422 if the school has
+    no logo or the template no logo slot.
+    """
+    from policy_localiser.orchestrator.preview import (
+        DOCX_CONTENT_TYPE,
+        MissingAssetError,
+    )
+
+    school = req.params.get("school")
+    template = req.params.get("template")
+    if not school or not template:
+        return func.HttpResponse(
+            json.dumps({"error": "school and template are required"}),
+            mimetype="application/json",
+            status_code=400,
+        )
+
+    try:
+        result = _context().preview.render(school, template)
+    except ValueError as e:
+        return func.HttpResponse(
+            json.dumps({"error": str(e)}),
+            mimetype="application/json",
+            status_code=404,
+        )
+    except MissingAssetError as e:
+        return func.HttpResponse(
+            json.dumps({"error": str(e)}),
+            mimetype="application/json",
+            status_code=422,
+        )
+    except Exception as e:
+        logging.exception("Preview failed")
+        return func.HttpResponse(
+            json.dumps({"error": str(e)}),
+            mimetype="application/json",
+            status_code=500,
+        )
+    return func.HttpResponse(
+        result.content,
+        headers={
+            "Content-Type": DOCX_CONTENT_TYPE,
+            "Content-Disposition": f'attachment; filename="{result.file_name}"',
+            "Cache-Control": "no-store",
+        },
+        status_code=200,
+    )
+
+
+@app.route(
+    route="localise/fanout", methods=["POST"], auth_level=func.AuthLevel.FUNCTION
+)
+@app.queue_output(
+    arg_name="shards", queue_name=SHARD_QUEUE, connection=QUEUE_CONNECTION
+)
+def fanout_trigger(
+    req: func.HttpRequest, shards: func.Out[List[str]]
+) -> func.HttpResponse:
+    """Start a sharded run: one queue message per block of schools.
+
+    POST body (optional):
+    {
+        "schools": ["STM", "HFC"],
+        "templates": ["Enrolment Policy"],
+        "schools_per_shard": 2              // default 1
+    }
+    """
+    body = {}
+    try:
+        body = req.get_json()
+    except ValueError:
+        pass
+
+    try:
+        plan = _fan_out(
+            shards,
+            school_filter=body.get("schools"),
+            template_filter=body.get("templates"),
+            schools_per_shard=int(body.get("schools_per_shard", 1)),
+        )
         return func.HttpResponse(
             json.dumps({
-                "processed": len(results),
-                "success": success,
-                "failed": failed,
+                "run_id": plan[0].run_id if plan else None,
+                "shards": len(plan),
             }),
             mimetype="application/json",
-            status_code=200,
+            status_code=202,
         )
     except Exception as e:
-        logging.exception("Policy localisation failed")
+        logging.exception("Failed to start sharded run")
         return func.HttpResponse(
             json.dumps({"error": str(e)}),
             mimetype="application/json",
@@ -83,25 +324,73 @@ def manual_trigger(req: func.HttpRequest) -> func.HttpResponse:
         )
 
 
+@app.queue_trigger(
+    arg_name="msg", queue_name=SHARD_QUEUE, connection=QUEUE_CONNECTION
+)
+def shard_worker(msg: func.QueueMessage) -> None:
+    """Process one shard; an exception makes the queue redeliver it."""
+    from policy_localiser.orchestrator.sharding import Shard, process_shard
+
+    # Shards share their run's ID, so the per-run checkpoint is not used;
+    # a failed shard is redelivered by the queue instead
+    context = _context()
+    shard = Shard.from_message(msg.get_body().decode("utf-8"))
+    results = process_shard(
+        context.pipeline(checkpoints=False), context.config.run_record_dir, shard
+    )
+    failed = sum(1 for r in results if r.status.value == "Error")
+    logging.info(
+        f"Shard {shard.index} of run {shard.run_id}: {len(results)} document(s), "
+        f"{failed} failed"
+    )
+
+
 # Timer: runs at 2:00 AM on January 15 each year
 @app.timer_trigger(
     schedule="0 0 2 15 1 *",
     arg_name="timer",
     run_on_startup=False,
 )
-def annual_policy_localisation(timer: func.TimerRequest) -> None:
-    """Scheduled annual policy localisation run."""
+@app.queue_output(
+    arg_name="shards", queue_name=SHARD_QUEUE, connection=QUEUE_CONNECTION
+)
+def annual_policy_localisation(
+    timer: func.TimerRequest, shards: func.Out[List[str]]
+) -> None:
+    """Scheduled annual policy localisation run.
+
+    With SCHOOLS_PER_SHARD set, the run is fanned out to queue workers
+    instead of processing every document in this invocation.
+    """
     logging.info("Starting scheduled annual policy localisation")
 
+    schools_per_shard = Config.from_env().schools_per_shard
+    if schools_per_shard > 0:
+        plan = _fan_out(shards, schools_per_shard=schools_per_shard)
+        logging.info(f"Annual run fanned out as {len(plan)} shard(s)")
+        return
+
     try:
-        pipeline = _build_pipeline()
-        results = pipeline.run()
+        pipeline = _context().pipeline()
+        results = pipeline.run(deadline=Deadline.from_host_json(HOST_JSON))
         success = sum(1 for r in results if r.status.value == "Success")
         failed = sum(1 for r in results if r.status.value == "Error")
         logging.info(
             f"Annual run complete: {success} succeeded, {failed} failed "
             f"out of {len(results)}"
         )
+        if pipeline.deferred and pipeline.continuation:
+            logging.warning(
+                f"Annual run reached the function timeout with "
+                f"{len(pipeline.deferred)} document(s) left; continue it with "
+                f'POST /api/localise {{"resume": "{pipeline.continuation}"}}'
+            )
+        elif pipeline.deferred:
+            logging.warning(
+                f"Annual run reached the function timeout with "
+                f"{len(pipeline.deferred)} document(s) left and no checkpoint "
+                "to resume from; run them again with POST /api/localise"
+            )
     except Exception:
         logging.exception("Annual policy localisation failed")
         raise
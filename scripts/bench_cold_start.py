@@ -0,0 +1,134 @@
+"""Benchmark Function cold start and warm reuse, offline.
+
+Import cost: each module set is imported in fresh interpreters and the
+median wall time reported:
+    index        what function_app.py loads when the host indexes functions
+    first use    the shared context (Graph client, pipeline, requests, msal)
+    first render docxtpl, loaded by the first document rendered
+
+Invocations: the fake Graph server (with --latency per request) is run
+against repeatedly, once building everything per invocation as the app
+used to, and once through the shared context as it does now.
+
+Example:
+    python scripts/bench_cold_start.py --latency 0.03 --invocations 3
+"""
+
+import argparse
+import json
+import logging
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from bench_sharepoint import seed_site
+
+from policy_localiser.config import Config
+from policy_localiser.orchestrator.context import AppContext, get_context, reset_context
+from policy_localiser.testing.fake_graph import FakeAuth, FakeGraphConfig, FakeGraphServer
+
+IMPORT_SETS = {
+    "index": [
+        "azure.functions",
+        "policy_localiser.config",
+        "policy_localiser.orchestrator.deadline",
+    ],
+    "first use": ["policy_localiser.orchestrator.context", "msal"],
+    "first render": ["docxtpl"],
+}
+
+
+def time_imports(modules, repeats: int):
+    """(median seconds, modules not installed) importing in fresh interpreters."""
+    code = (
+        "import importlib, json, time\n"
+        "missing = []\n"
+        "start = time.perf_counter()\n"
+        f"for name in {modules!r}:\n"
+        "    try:\n"
+        "        importlib.import_module(name)\n"
+        "    except ImportError:\n"
+        "        missing.append(name)\n"
+        "print(json.dumps([time.perf_counter() - start, missing]))\n"
+    )
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(
+        [str(ROOT / "src"), os.environ.get("PYTHONPATH", "")]
+    )}
+    samples = [
+        json.loads(subprocess.run(
+            [sys.executable, "-c", code], env=env,
+            capture_output=True, text=True, check=True,
+        ).stdout)
+        for _ in range(repeats)
+    ]
+    return statistics.median(t for t, _ in samples), samples[0][1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold start / warm reuse benchmark")
+    parser.add_argument("--schools", type=int, default=5)
+    parser.add_argument("--templates", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0.03,
+                        help="Seconds added to every Graph request (default: 0.03)")
+    parser.add_argument("--invocations", type=int, default=3)
+    parser.add_argument("--repeats", type=int, default=5,
+                        help="Fresh interpreters per import measurement")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    print("Import cost (median of fresh interpreters):")
+    for name, modules in IMPORT_SETS.items():
+        seconds, missing = time_imports(modules, args.repeats)
+        note = f"; not installed: {', '.join(missing)}" if missing else ""
+        print(f"  {name:<13} {seconds * 1000:>7.1f} ms  ({', '.join(modules)}{note})")
+
+    with tempfile.TemporaryDirectory(prefix="fake_graph_") as tmp:
+        tmp_path = Path(tmp)
+        with FakeGraphServer(tmp_path / "graph", FakeGraphConfig(latency=args.latency)) as server:
+            seed_site(server, args.schools, args.templates)
+            config = Config(
+                sharepoint_site_id="site",
+                checkpoint_dir=tmp_path / "checkpoints",
+                history_db_path=tmp_path / "history.db",
+                run_record_dir=tmp_path / "runs",
+                delta_state_path=tmp_path / "state.json",
+            )
+
+            def build(c: Config) -> AppContext:
+                return AppContext(c, auth=FakeAuth(), base_url=server.base_url)
+
+            # Publish everything first so both modes measure the same reruns
+            build(config).pipeline().run()
+
+            for mode in ("per invocation", "shared context"):
+                reset_context()
+                print(f"\nInvocations, {mode}:")
+                print(f"  {'#':>3} {'Seconds':>8} {'Requests':>9}")
+                for n in range(1, args.invocations + 1):
+                    server.request_counts.clear()
+                    start = time.perf_counter()
+                    if mode == "per invocation":
+                        context = build(config)
+                    else:
+                        context = get_context(config, factory=build)
+                    context.pipeline().run()
+                    elapsed = time.perf_counter() - start
+                    requests = sum(server.request_counts.values())
+                    print(f"  {n:>3} {elapsed:>8.2f} {requests:>9}")
+            cache = context.asset_cache
+            print(
+                f"\nShared asset cache: {cache.hits} hit(s), "
+                f"{cache.misses} download(s)"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Benchmark and profile the SharePoint pipeline by replaying a cassette.
+
+Record a cassette from a real run first:
+    python scripts/run_sharepoint.py --record data/cassettes/full.zip
+
+Then replay it offline, as often as needed:
+    python scripts/bench_replay.py data/cassettes/full.zip --latency-scale 1.0
+    python scripts/bench_replay.py data/cassettes/full.zip --latency-scale 0 \\
+        --profile data/profiles/replay.prof
+"""
+
+import argparse
+import cProfile
+import logging
+import pstats
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from policy_localiser.graph.client import GraphClient
+from policy_localiser.graph.recording import ReplaySession
+from policy_localiser.graph.sharepoint_files import SharePointFiles
+from policy_localiser.graph.sharepoint_lists import SharePointLists
+from policy_localiser.orchestrator.sharepoint_pipeline import SharePointPipeline
+from policy_localiser.testing.fake_graph import FakeAuth
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a recorded SharePoint run")
+    parser.add_argument("cassette", type=Path, help="Cassette zip from --record")
+    parser.add_argument(
+        "--latency-scale", type=float, default=1.0,
+        help="Multiply recorded Graph latencies (0 = no network time, default: 1.0)",
+    )
+    parser.add_argument("--school", nargs="*", help="Same school filter as the recording")
+    parser.add_argument("--policy", nargs="*", help="Same policy filter as the recording")
+    parser.add_argument("--runs", type=int, default=1)
+    parser.add_argument(
+        "--profile", type=Path,
+        help="Write cProfile stats for the last run to this file",
+    )
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO if args.verbose else logging.WARNING,
+        format="%(asctime)s %(levelname)-7s %(message)s",
+        datefmt="%H:%M:%S",
+    )
+
+    timings = []
+    for run in range(1, args.runs + 1):
+        session = ReplaySession(args.cassette, latency_scale=args.latency_scale)
+        site_id = session.metadata.get("site_id", "")
+        client = GraphClient(
+            FakeAuth(),
+            base_url=session.metadata.get("base_url", GraphClient.BASE_URL),
+            session=session,
+        )
+        pipeline = SharePointPipeline(
+            SharePointLists(client, site_id), SharePointFiles(client, site_id)
+        )
+
+        profiler = cProfile.Profile() if args.profile and run == args.runs else None
+        start = time.perf_counter()
+        if profiler:
+            profiler.enable()
+        results = pipeline.run(school_filter=args.school, template_filter=args.policy)
+        if profiler:
+            profiler.disable()
+        elapsed = time.perf_counter() - start
+        timings.append(elapsed)
+
+        print(
+            f"Run {run}: {len(results)} document(s) in {elapsed:.2f}s "
+            f"({len(results) / elapsed:.1f} docs/s), {session.misses} replay miss(es)"
+        )
+
+    if len(timings) > 1:
+        ordered = sorted(timings)
+        print(
+            f"\nmin {ordered[0]:.2f}s | median {ordered[len(ordered) // 2]:.2f}s | "
+            f"max {ordered[-1]:.2f}s over {len(timings)} run(s)"
+        )
+
+    if args.profile:
+        args.profile.parent.mkdir(parents=True, exist_ok=True)
+        profiler.dump_stats(str(args.profile))
+        print(f"\nProfile written to {args.profile}; top functions by cumulative time:")
+        pstats.Stats(str(args.profile)).sort_stats("cumulative").print_stats(15)
+
+
+if __name__ == "__main__":
+    main()
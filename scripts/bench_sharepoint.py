@@ -0,0 +1,144 @@
+"""Benchmark the SharePoint pipeline offline against the fake Graph server.
+
+Seeds a fake site with N schools x M templates (817 = 43 x 19 by default)
+from the test fixtures, then runs SharePointPipeline with the requested
+latency, bandwidth and throttling and reports throughput and Graph traffic.
+
+Example:
+    python scripts/bench_sharepoint.py --latency 0.08 --throttle-rate 0.02
+"""
+
+import argparse
+import json
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from policy_localiser.graph.client import GraphClient
+from policy_localiser.graph.sharepoint_files import SharePointFiles
+from policy_localiser.graph.sharepoint_lists import SharePointLists
+from policy_localiser.orchestrator.scheduling import STRATEGIES
+from policy_localiser.orchestrator.sharepoint_pipeline import SharePointPipeline
+from policy_localiser.orchestrator.sinks import NullSink
+from policy_localiser.testing.fake_graph import FakeAuth, FakeGraphConfig, FakeGraphServer
+
+FIXTURES_DIR = Path(__file__).parent.parent / "tests" / "fixtures"
+
+
+def seed_site(server: FakeGraphServer, num_schools: int, num_templates: int) -> None:
+    """Populate the fake site with generated schools, templates and logos."""
+    with open(FIXTURES_DIR / "sample_schools.json") as f:
+        base_schools = json.load(f)
+
+    schools = []
+    for i in range(num_schools):
+        school = dict(base_schools[i % len(base_schools)])
+        school["SchoolCode"] = f"S{i:03d}"
+        school["Title"] = f"{school['Title']} {i}"
+        schools.append(school)
+
+    server.add_list("School Directory", schools)
+    server.add_list("Processing Log")
+    for library in (
+        SharePointPipeline.TEMPLATES_LIBRARY,
+        SharePointPipeline.LOGOS_LIBRARY,
+        SharePointPipeline.OUTPUT_LIBRARY,
+    ):
+        server.add_drive(library)
+
+    template = (FIXTURES_DIR / "templates" / "Sample_Policy.docx").read_bytes()
+    for i in range(num_templates):
+        server.put_file(SharePointPipeline.TEMPLATES_LIBRARY, f"Policy {i:02d}.docx", template)
+
+    logo = (FIXTURES_DIR / "logos" / "STM.png").read_bytes()
+    for school in schools:
+        server.put_file(SharePointPipeline.LOGOS_LIBRARY, f"{school['SchoolCode']}.png", logo)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline SharePoint pipeline benchmark")
+    parser.add_argument("--schools", type=int, default=43)
+    parser.add_argument("--templates", type=int, default=19)
+    parser.add_argument("--latency", type=float, default=0.05,
+                        help="Seconds added to every Graph request (default: 0.05)")
+    parser.add_argument("--jitter", type=float, default=0.0,
+                        help="Extra uniform random latency in seconds")
+    parser.add_argument("--bandwidth", type=float, default=None,
+                        help="Simulated bandwidth in bytes/second")
+    parser.add_argument("--throttle-rate", type=float, default=0.0,
+                        help="Probability of an injected 429 per request")
+    parser.add_argument("--unavailable-rate", type=float, default=0.0,
+                        help="Probability of an injected 503 per request")
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Documents processed concurrently")
+    parser.add_argument("--upload-workers", type=int, default=None,
+                        help="Threads each for logo downloads, uploads and log "
+                             "writes (default: --workers)")
+    parser.add_argument("--null-sink", action="store_true",
+                        help="Discard rendered documents instead of uploading them")
+    parser.add_argument("--schedule", choices=STRATEGIES, default="lpt")
+    parser.add_argument("--runs", type=int, default=1,
+                        help="Repeat the run against the same site (reruns hit skips)")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO if args.verbose else logging.WARNING,
+        format="%(asctime)s %(levelname)-7s %(message)s",
+        datefmt="%H:%M:%S",
+    )
+
+    config = FakeGraphConfig(
+        latency=args.latency,
+        latency_jitter=args.jitter,
+        bandwidth=args.bandwidth,
+        throttle_rate=args.throttle_rate,
+        unavailable_rate=args.unavailable_rate,
+        retry_after=args.retry_after,
+        page_size=args.page_size,
+        seed=0,
+    )
+
+    with tempfile.TemporaryDirectory(prefix="fake_graph_") as tmp:
+        with FakeGraphServer(Path(tmp), config) as server:
+            seed_site(server, args.schools, args.templates)
+            client = GraphClient(FakeAuth(), base_url=server.base_url)
+            pipeline = SharePointPipeline(
+                SharePointLists(client, "site"),
+                SharePointFiles(client, "site"),
+                workers=args.workers,
+                scheduling=args.schedule,
+                upload_workers=args.upload_workers,
+                sink=NullSink(Path(tmp) / "discarded") if args.null_sink else None,
+            )
+
+            for run in range(1, args.runs + 1):
+                server.request_counts.clear()
+                start = time.perf_counter()
+                results = pipeline.run()
+                elapsed = time.perf_counter() - start
+
+                by_status = {}
+                for r in results:
+                    by_status[r.status.value] = by_status.get(r.status.value, 0) + 1
+                print(f"\nRun {run}: {len(results)} document(s) in {elapsed:.2f}s "
+                      f"({len(results) / elapsed:.1f} docs/s) {by_status}")
+                if pipeline.schedule_report:
+                    print(pipeline.schedule_report.summary())
+                print(f"{'Requests':>9}  Endpoint")
+                for endpoint, count in server.request_counts.most_common():
+                    print(f"{count:>9}  {endpoint}")
+
+            stats = client.throttle_stats()
+            print(f"\nThrottle stats: {stats}")
+            print("\n".join(client.tracer.summary_lines()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Render one policy for one school from SharePoint, without uploading it.
+
+Examples:
+    python scripts/preview.py --school STM --policy "Enrolment Policy"
+    python scripts/preview.py --school STM --policy "Enrolment Policy" -o stm.docx
+
+Nothing is uploaded or written to the Processing Log. The deployed
+equivalent is GET /api/preview?school=STM&template=Enrolment Policy.
+"""
+
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from dotenv import load_dotenv
+
+from policy_localiser.config import Config
+from policy_localiser.graph.auth import GraphAuth
+from policy_localiser.graph.client import GraphClient
+from policy_localiser.graph.sharepoint_files import SharePointFiles
+from policy_localiser.graph.sharepoint_lists import SharePointLists
+from policy_localiser.orchestrator.preview import PreviewService
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Preview one localised policy")
+    parser.add_argument("--school", required=True, help="School code, e.g. STM")
+    parser.add_argument(
+        "--policy", required=True, help="Template name, with or without .docx"
+    )
+    parser.add_argument(
+        "-o", "--output", type=Path,
+        help="Where to write the .docx (default: '<school> - <policy>.docx')",
+    )
+    parser.add_argument(
+        "--env-file", type=Path, default=Path(".env"),
+        help="Path to .env file (default: .env)",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s %(levelname)-7s %(message)s",
+        datefmt="%H:%M:%S",
+    )
+
+    load_dotenv(args.env_file)
+    config = Config.from_env()
+    if not config.tenant_id or not config.client_id or not config.client_secret:
+        print("ERROR: Missing Azure credentials. Check your .env file.")
+        sys.exit(1)
+
+    auth = GraphAuth(config.tenant_id, config.client_id, config.client_secret)
+    client = GraphClient(auth, **config.graph_options())
+    service = PreviewService(
+        SharePointLists(client, config.sharepoint_site_id),
+        SharePointFiles(client, config.sharepoint_site_id),
+    )
+    try:
+        preview = service.render(args.school, args.policy)
+    except (ValueError, RuntimeError) as e:
+        print(f"ERROR: {e}")
+        sys.exit(1)
+    finally:
+        client.close()
+
+    output = args.output or Path(preview.file_name)
+    output.write_bytes(preview.content)
+    print(f"Wrote {output} ({len(preview.content)} bytes, {preview.seconds:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
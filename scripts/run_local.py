@@ -4,13 +4,24 @@ import argparse
 import json
 import logging
 import sys
+import tempfile
 from pathlib import Path
 
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
 from policy_localiser.engine.models import SchoolRecord, ProcessingStatus
+from policy_localiser.metrics import REGISTRY
+from policy_localiser.orchestrator.history import RunHistory
 from policy_localiser.orchestrator.pipeline import LocalPipeline
+from policy_localiser.orchestrator.progress import (
+    CallbackSink,
+    JsonLinesSink,
+    ProgressEmitter,
+    console_progress,
+)
+from policy_localiser.orchestrator.sinks import ZipBundleSink
+from policy_localiser.orchestrator.watch import LocalWatcher
 
 
 def load_schools_from_json(json_path: Path):
@@ -19,6 +30,22 @@ def load_schools_from_json(json_path: Path):
     return [SchoolRecord(**s) for s in data]
 
 
+def print_results(results):
+    print("\n" + "=" * 70)
+    print(f"{'Status':<8} {'School':<8} {'Policy':<35} {'Time':>6}")
+    print("-" * 70)
+    for r in results:
+        icon = "OK" if r.status == ProcessingStatus.SUCCESS else "FAIL"
+        print(f"{icon:<8} {r.school_code:<8} {r.policy_name:<35} {r.duration_seconds:>5.2f}s")
+        if r.error_message:
+            print(f"         ERROR: {r.error_message}")
+    print("=" * 70)
+
+    success = sum(1 for r in results if r.status == ProcessingStatus.SUCCESS)
+    failed = sum(1 for r in results if r.status == ProcessingStatus.ERROR)
+    print(f"\nTotal: {len(results)} | Success: {success} | Failed: {failed}")
+
+
 def main():
     parser = argparse.ArgumentParser(description="Policy Localisation Engine — Local Runner")
     parser.add_argument(
@@ -30,8 +57,16 @@ def main():
         help="Path to directory containing school logo PNGs",
     )
     parser.add_argument(
-        "--output", type=Path, required=True,
-        help="Path to output directory",
+        "--output", type=Path,
+        help="Path to output directory (required unless --plan or --zip)",
+    )
+    parser.add_argument(
+        "--zip", type=Path, metavar="PATH",
+        help="Write every document into one zip bundle instead of --output",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=1,
+        help="Documents rendered concurrently (default: 1)",
     )
     parser.add_argument(
         "--schools-json", type=Path, required=True,
@@ -45,8 +80,40 @@ def main():
         "--policy", nargs="*",
         help="Filter to specific policy names without extension (e.g. --policy 'Sample_Policy')",
     )
+    parser.add_argument(
+        "--plan", action="store_true",
+        help="Validate and estimate the run without rendering anything",
+    )
+    parser.add_argument(
+        "--watch", action="store_true",
+        help="After the first run, keep watching the templates, logos and "
+             "schools JSON and re-render only the documents a change affects",
+    )
+    parser.add_argument(
+        "--debounce", type=float, default=0.3, metavar="SECONDS",
+        help="With --watch, wait until files have been quiet this long "
+             "(default: 0.3)",
+    )
+    parser.add_argument(
+        "--history", type=Path, metavar="PATH",
+        help="Record runs in this SQLite run history and order work (and "
+             "estimate --plan) from its render times",
+    )
+    parser.add_argument(
+        "--events", type=Path, metavar="PATH",
+        help="Append structured progress events (JSON Lines) to this file",
+    )
+    parser.add_argument(
+        "--metrics-file", type=Path, metavar="PATH",
+        help="Write Prometheus metrics (documents, stage latencies, Graph "
+             "requests, bytes, retries) to this file when the run ends",
+    )
 
     args = parser.parse_args()
+    if not args.plan and args.output is None and args.zip is None:
+        parser.error("--output is required unless --plan or --zip is given")
+    if args.watch and (args.plan or args.output is None):
+        parser.error("--watch needs --output and cannot be used with --plan")
 
     logging.basicConfig(
         level=logging.INFO,
@@ -55,31 +122,72 @@ def main():
     )
 
     schools = load_schools_from_json(args.schools_json)
-    pipeline = LocalPipeline()
-
-    results = pipeline.process_all(
-        template_dir=args.templates,
-        logo_dir=args.logos,
-        output_dir=args.output,
-        schools=schools,
-        template_filter=args.policy,
-        school_filter=args.school,
-    )
+    sinks = [CallbackSink(console_progress())]
+    if args.events:
+        sinks.append(JsonLinesSink(args.events))
+    progress = ProgressEmitter(sinks)
+    history = RunHistory(args.history) if args.history else None
+    pipeline = LocalPipeline(progress=progress, workers=args.workers, history=history)
 
-    # Print results table
-    print("\n" + "=" * 70)
-    print(f"{'Status':<8} {'School':<8} {'Policy':<35} {'Time':>6}")
-    print("-" * 70)
-    for r in results:
-        icon = "OK" if r.status == ProcessingStatus.SUCCESS else "FAIL"
-        print(f"{icon:<8} {r.school_code:<8} {r.policy_name:<35} {r.duration_seconds:>5.2f}s")
-        if r.error_message:
-            print(f"         ERROR: {r.error_message}")
-    print("=" * 70)
+    if args.plan:
+        plan = pipeline.plan(
+            template_dir=args.templates,
+            logo_dir=args.logos,
+            schools=schools,
+            template_filter=args.policy,
+            school_filter=args.school,
+        )
+        print("\n".join(plan.lines()))
+        if history is not None:
+            history.close()
+        sys.exit(1 if plan.blocking else 0)
 
-    success = sum(1 for r in results if r.status == ProcessingStatus.SUCCESS)
-    failed = sum(1 for r in results if r.status == ProcessingStatus.ERROR)
-    print(f"\nTotal: {len(results)} | Success: {success} | Failed: {failed}")
+    if args.watch:
+        watcher = LocalWatcher(
+            pipeline,
+            args.templates,
+            args.logos,
+            args.schools_json,
+            args.output,
+            load_schools=load_schools_from_json,
+            template_filter=args.policy,
+            school_filter=args.school,
+            debounce=args.debounce,
+        )
+        print_results(watcher.start())
+        try:
+            watcher.run(print_results)
+        except KeyboardInterrupt:
+            pass
+        if args.metrics_file:
+            REGISTRY.write(args.metrics_file)
+        progress.close()
+        if history is not None:
+            history.close()
+        return
+
+    with tempfile.TemporaryDirectory(prefix="policy_loc_") as staging:
+        sink = ZipBundleSink(Path(staging), args.zip) if args.zip else None
+        try:
+            results = pipeline.process_all(
+                template_dir=args.templates,
+                logo_dir=args.logos,
+                output_dir=args.output,
+                schools=schools,
+                template_filter=args.policy,
+                school_filter=args.school,
+                sink=sink,
+            )
+        finally:
+            if sink is not None:
+                sink.close()
+
+    print_results(results)
+    if args.metrics_file:
+        REGISTRY.write(args.metrics_file)
+    progress.close()
+    if history is not None:
+        history.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,139 @@
+"""Run several SharePoint sites concurrently in one process.
+
+Requires .env file with Azure credentials and SHAREPOINT_SITES, e.g.
+    SHAREPOINT_SITES=north=contoso.sharepoint.com,<guid>,<guid>;south=...
+
+Examples:
+    python scripts/run_multisite.py                    # every configured site
+    python scripts/run_multisite.py --site north --policy "Enrolment Policy"
+"""
+
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from dotenv import load_dotenv
+
+from policy_localiser.config import Config
+from policy_localiser.engine.models import ProcessingStatus
+from policy_localiser.graph.auth import GraphAuth
+from policy_localiser.graph.client import GraphClient
+from policy_localiser.metrics import REGISTRY
+from policy_localiser.orchestrator.deadline import Deadline
+from policy_localiser.orchestrator.multisite import MultiSiteRunner
+from policy_localiser.orchestrator.progress import (
+    CallbackSink,
+    JsonLinesSink,
+    ProgressEmitter,
+    console_progress,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Policy Localisation Engine — multi-site runner"
+    )
+    parser.add_argument(
+        "--site", nargs="*",
+        help="Site names from SHAREPOINT_SITES to run (default: all)",
+    )
+    parser.add_argument("--school", nargs="*", help="Filter to specific school codes")
+    parser.add_argument("--policy", nargs="*", help="Filter to specific policy names")
+    parser.add_argument(
+        "--max-sites", type=int,
+        help="Sites processed at once (default: all of them)",
+    )
+    parser.add_argument(
+        "--time-limit", type=float, metavar="SECONDS",
+        help="Stop starting documents in time to finish within this many seconds",
+    )
+    parser.add_argument(
+        "--events", type=Path, metavar="PATH",
+        help="Append structured progress events (JSON Lines) to this file",
+    )
+    parser.add_argument(
+        "--metrics-file", type=Path, metavar="PATH",
+        help="Write Prometheus metrics (documents, stage latencies, Graph "
+             "requests, bytes, retries) to this file when the run ends",
+    )
+    parser.add_argument(
+        "--env-file", type=Path, default=Path(".env"),
+        help="Path to .env file (default: .env)",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s %(levelname)-7s [%(threadName)s] %(message)s",
+        datefmt="%H:%M:%S",
+    )
+
+    load_dotenv(args.env_file)
+    config = Config.from_env()
+
+    if not config.tenant_id or not config.client_id or not config.client_secret:
+        print("ERROR: Missing Azure credentials. Check your .env file.")
+        sys.exit(1)
+    if not config.sharepoint_sites and not config.sharepoint_site_id:
+        print("ERROR: Missing SHAREPOINT_SITES. Check your .env file.")
+        sys.exit(1)
+
+    sites = args.site or list(config.sites())
+    concurrent = min(args.max_sites or len(sites), len(sites))
+    # One client for every site: shared token, connection pool and limiter
+    auth = GraphAuth(config.tenant_id, config.client_id, config.client_secret)
+    uploads = config.upload_workers or config.pipeline_workers
+    client = GraphClient(
+        auth, pool_size=concurrent * 3 * uploads + 4, **config.graph_options()
+    )
+    sinks = [CallbackSink(console_progress())]
+    if args.events:
+        sinks.append(JsonLinesSink(args.events))
+    progress = ProgressEmitter(sinks)
+    runner = MultiSiteRunner(
+        client, config, max_concurrent_sites=args.max_sites, progress=progress
+    )
+    runs = runner.run(
+        sites=sites,
+        school_filter=args.school,
+        template_filter=args.policy,
+        deadline=Deadline(args.time_limit) if args.time_limit else None,
+    )
+
+    print("\n" + "=" * 70)
+    print(f"{'Site':<16} {'Run':<10} {'Total':>6} {'OK':>5} {'Same':>5} {'Fail':>5}  Note")
+    print("-" * 70)
+    for run in runs.values():
+        note = run.error or (
+            f"{run.deferred} deferred, resume {run.continuation}" if run.deferred else ""
+        )
+        print(
+            f"{run.site:<16} {run.run_id or '-':<10} {len(run.results):>6} "
+            f"{run.count(ProcessingStatus.SUCCESS):>5} "
+            f"{run.count(ProcessingStatus.SKIPPED):>5} "
+            f"{run.count(ProcessingStatus.ERROR):>5}  {note}"
+        )
+    print("=" * 70)
+
+    cache = runner.asset_cache
+    stats = client.throttle_stats()
+    print(f"Asset cache: {cache.hits} hit(s), {cache.misses} download(s)")
+    print(
+        f"Graph: {stats.requests} request(s) | Throttled: {stats.throttled} | "
+        f"Retries: {stats.retries} ({stats.wait_seconds:.1f}s waiting)"
+    )
+    print("\n" + "\n".join(client.tracer.summary_lines()))
+    if args.metrics_file:
+        REGISTRY.write(args.metrics_file)
+    progress.close()
+    client.close()
+
+    if any(run.error for run in runs.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""Run the coordinator/worker flow on one machine with a SQLite queue.
+
+Requires .env file with Azure/SharePoint credentials.
+
+Plan a run and process it with four worker threads:
+    python scripts/run_sharded.py --workers 4
+
+Or run the roles as separate processes sharing the queue and run record:
+    python scripts/run_sharded.py --role coordinator --schools-per-shard 2
+    python scripts/run_sharded.py --role worker      # in as many shells as wanted
+    python scripts/run_sharded.py --role status --run-id a1b2c3d4
+"""
+
+import argparse
+import logging
+import sys
+import threading
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from dotenv import load_dotenv
+
+from policy_localiser.config import Config
+from policy_localiser.engine.models import ProcessingStatus
+from policy_localiser.graph.auth import GraphAuth
+from policy_localiser.graph.client import GraphClient
+from policy_localiser.graph.sharepoint_files import SharePointFiles
+from policy_localiser.graph.sharepoint_lists import SharePointLists
+from policy_localiser.metrics import REGISTRY
+from policy_localiser.orchestrator.asset_cache import AssetCache
+from policy_localiser.orchestrator.history import RunHistory
+from policy_localiser.orchestrator.sharding import (
+    RunRecord,
+    ShardQueue,
+    drain_queue,
+    start_run,
+)
+from policy_localiser.orchestrator.sharepoint_pipeline import SharePointPipeline
+
+
+def print_status(record: RunRecord) -> None:
+    results = record.results()
+    success = sum(1 for r in results if r.status == ProcessingStatus.SUCCESS)
+    failed = sum(1 for r in results if r.status == ProcessingStatus.ERROR)
+    skipped = sum(1 for r in results if r.status == ProcessingStatus.SKIPPED)
+    shards = record.shards()
+    print(
+        f"\nRun {record.run_id}: {len(record.finished_shards())}/{len(shards)} "
+        f"shard(s) finished"
+    )
+    print(
+        f"Total: {len(results)} | Success: {success} | "
+        f"Unchanged: {skipped} | Failed: {failed}"
+    )
+    pending = record.pending_shards()
+    if pending:
+        print(f"Pending shards: {', '.join(str(i) for i in pending)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Policy Localisation Engine — sharded runner (local queue)"
+    )
+    parser.add_argument(
+        "--role", choices=["all", "coordinator", "worker", "status"], default="all",
+    )
+    parser.add_argument("--school", nargs="*", help="Filter to specific school codes")
+    parser.add_argument("--policy", nargs="*", help="Filter to specific policy names")
+    parser.add_argument("--schools-per-shard", type=int, default=1)
+    parser.add_argument(
+        "--workers", type=int, default=4,
+        help="Worker threads in this process (default: 4)",
+    )
+    parser.add_argument(
+        "--queue", type=Path, default=Path("./data/queue/shards.db"),
+        help="SQLite queue file shared by coordinator and workers",
+    )
+    parser.add_argument("--run-id", help="Run to report on with --role status")
+    parser.add_argument(
+        "--metrics-file", type=Path, metavar="PATH",
+        help="Write Prometheus metrics (documents, stage latencies, Graph "
+             "requests, bytes, retries) to this file when the run ends",
+    )
+    parser.add_argument(
+        "--env-file", type=Path, default=Path(".env"),
+        help="Path to .env file (default: .env)",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s %(levelname)-7s [%(threadName)s] %(message)s",
+        datefmt="%H:%M:%S",
+    )
+
+    load_dotenv(args.env_file)
+    config = Config.from_env()
+    run_id = args.run_id
+
+    if args.role == "status":
+        if not run_id:
+            print("ERROR: --role status needs --run-id")
+            sys.exit(1)
+        print_status(RunRecord(config.run_record_dir, run_id))
+        return
+
+    if not config.tenant_id or not config.client_id or not config.client_secret:
+        print("ERROR: Missing Azure credentials. Check your .env file.")
+        sys.exit(1)
+    if not config.sharepoint_site_id:
+        print("ERROR: Missing SHAREPOINT_SITE_ID. Check your .env file.")
+        sys.exit(1)
+
+    auth = GraphAuth(config.tenant_id, config.client_id, config.client_secret)
+    client = GraphClient(auth, **config.graph_options())
+    sp_lists = SharePointLists(client, config.sharepoint_site_id)
+    sp_files = SharePointFiles(client, config.sharepoint_site_id)
+    queue = ShardQueue(args.queue)
+
+    if args.role in ("all", "coordinator"):
+        shards = start_run(
+            sp_lists,
+            config.run_record_dir,
+            school_filter=args.school,
+            template_filter=args.policy,
+            schools_per_shard=args.schools_per_shard,
+        )
+        for shard in shards:
+            queue.send(shard.to_message())
+        if shards:
+            run_id = shards[0].run_id
+        print(f"Run {run_id}: queued {len(shards)} shard(s)")
+
+    if args.role in ("all", "worker"):
+        # Each worker thread is a warm worker with its own pipeline; they
+        # share the client (and its rate limiter) and the asset cache
+        cache = AssetCache()
+        history = RunHistory(config.history_db_path)
+
+        def work():
+            pipeline = SharePointPipeline(
+                sp_lists, sp_files, asset_cache=cache, history=history
+            )
+            drain_queue(queue, pipeline, config.run_record_dir)
+
+        threads = [
+            threading.Thread(target=work, name=f"worker-{i}")
+            for i in range(args.workers)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        history.close()
+        print(f"\nAsset cache: {cache.hits} hit(s), {cache.misses} download(s)")
+        print("\n".join(client.tracer.summary_lines()))
+        if queue.poison_count():
+            print(f"Poison shards: {queue.poison_count()}")
+
+    if run_id:
+        print_status(RunRecord(config.run_record_dir, run_id))
+    if args.metrics_file:
+        REGISTRY.write(args.metrics_file)
+    client.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -16,12 +16,30 @@ from policy_localiser.config import Config
 from policy_localiser.engine.models import ProcessingStatus
 from policy_localiser.graph.auth import GraphAuth
 from policy_localiser.graph.client import GraphClient
+from policy_localiser.graph.recording import RecordingSession
 from policy_localiser.graph.sharepoint_files import SharePointFiles
 from policy_localiser.graph.sharepoint_lists import SharePointLists
+from policy_localiser.metrics import REGISTRY
+from policy_localiser.orchestrator.deadline import Deadline
+from policy_localiser.orchestrator.history import RunHistory
+from policy_localiser.orchestrator.progress import (
+    CallbackSink,
+    JsonLinesSink,
+    ProgressEmitter,
+    console_progress,
+)
+from policy_localiser.orchestrator.scheduling import STRATEGIES
 from policy_localiser.orchestrator.sharepoint_pipeline import SharePointPipeline
 from policy_localiser.sharing.folder_sharing import FolderSharing
 
 
+STATUS_ICONS = {
+    ProcessingStatus.SUCCESS: "OK",
+    ProcessingStatus.SKIPPED: "SAME",
+    ProcessingStatus.ERROR: "FAIL",
+}
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Policy Localisation Engine — SharePoint Runner"
@@ -34,10 +52,59 @@ def main():
         "--policy", nargs="*",
         help="Filter to specific policy names (e.g. --policy 'Enrolment Policy')",
     )
+    parser.add_argument(
+        "--incremental", action="store_true",
+        help="Only re-render documents affected by School Directory or logo "
+             "changes since the last incremental run",
+    )
+    parser.add_argument(
+        "--resume", metavar="RUN_ID",
+        help="Continue an interrupted run from its checkpoint, skipping "
+             "documents it already finished",
+    )
+    parser.add_argument(
+        "--workers", type=int,
+        help="Documents processed concurrently (default: PIPELINE_WORKERS or 1)",
+    )
+    parser.add_argument(
+        "--upload-workers", type=int,
+        help="Threads each for logo downloads, uploads and Processing Log "
+             "writes, overlapping with rendering (default: UPLOAD_WORKERS, "
+             "else --workers)",
+    )
+    parser.add_argument(
+        "--schedule", choices=STRATEGIES,
+        help="Work ordering: lpt = most expensive templates first, "
+             "fixed = school then template (default: SCHEDULING or lpt)",
+    )
+    parser.add_argument(
+        "--time-limit", type=float, metavar="SECONDS",
+        help="Stop starting documents in time to finish within this many "
+             "seconds; the rest can be continued with --resume",
+    )
+    parser.add_argument(
+        "--plan", action="store_true",
+        help="Estimate run time and Graph request counts without rendering "
+             "or uploading anything",
+    )
     parser.add_argument(
         "--share", action="store_true",
         help="Create sharing links for output folders after processing",
     )
+    parser.add_argument(
+        "--record", type=Path, metavar="CASSETTE",
+        help="Record all Graph traffic (secrets scrubbed) to a cassette zip "
+             "for offline replay with scripts/bench_replay.py",
+    )
+    parser.add_argument(
+        "--events", type=Path, metavar="PATH",
+        help="Append structured progress events (JSON Lines) to this file",
+    )
+    parser.add_argument(
+        "--metrics-file", type=Path, metavar="PATH",
+        help="Write Prometheus metrics (documents, stage latencies, Graph "
+             "requests, bytes, retries) to this file when the run ends",
+    )
     parser.add_argument(
         "--env-file", type=Path, default=Path(".env"),
         help="Path to .env file (default: .env)",
@@ -61,23 +128,64 @@ def main():
         sys.exit(1)
 
     auth = GraphAuth(config.tenant_id, config.client_id, config.client_secret)
-    client = GraphClient(auth)
+    session = None
+    if args.record:
+        session = RecordingSession(
+            args.record,
+            metadata={
+                "site_id": config.sharepoint_site_id,
+                "base_url": GraphClient.BASE_URL,
+            },
+        )
+    client = GraphClient(auth, session=session, **config.graph_options())
     sp_lists = SharePointLists(client, config.sharepoint_site_id)
     sp_files = SharePointFiles(client, config.sharepoint_site_id)
 
     # Run the pipeline
-    pipeline = SharePointPipeline(sp_lists, sp_files)
-    results = pipeline.run(
-        school_filter=args.school,
-        template_filter=args.policy,
+    history = RunHistory(config.history_db_path)
+    sinks = [CallbackSink(console_progress())]
+    if args.events:
+        sinks.append(JsonLinesSink(args.events))
+    progress = ProgressEmitter(sinks)
+    pipeline = SharePointPipeline(
+        sp_lists,
+        sp_files,
+        checkpoint_dir=config.checkpoint_dir,
+        history=history,
+        workers=args.workers or config.pipeline_workers,
+        scheduling=args.schedule or config.scheduling,
+        progress=progress,
+        upload_workers=args.upload_workers or config.upload_workers,
     )
+    if args.plan:
+        plan = pipeline.plan(
+            school_filter=args.school,
+            template_filter=args.policy,
+            resume=args.resume,
+        )
+        print("\n".join(plan.lines()))
+        history.close()
+        client.close()
+        sys.exit(1 if plan.blocking else 0)
+    deadline = Deadline(args.time_limit) if args.time_limit else None
+    if args.incremental:
+        results = pipeline.run_incremental(
+            config.delta_state_path, template_filter=args.policy, deadline=deadline
+        )
+    else:
+        results = pipeline.run(
+            school_filter=args.school,
+            template_filter=args.policy,
+            resume=args.resume,
+            deadline=deadline,
+        )
 
     # Print results table
     print("\n" + "=" * 70)
     print(f"{'Status':<8} {'School':<8} {'Policy':<35} {'Time':>6}")
     print("-" * 70)
     for r in results:
-        icon = "OK" if r.status == ProcessingStatus.SUCCESS else "FAIL"
+        icon = STATUS_ICONS[r.status]
         print(
             f"{icon:<8} {r.school_code:<8} {r.policy_name:<35} "
             f"{r.duration_seconds:>5.2f}s"
@@ -88,21 +196,63 @@ def main():
 
     success = sum(1 for r in results if r.status == ProcessingStatus.SUCCESS)
     failed = sum(1 for r in results if r.status == ProcessingStatus.ERROR)
-    print(f"\nTotal: {len(results)} | Success: {success} | Failed: {failed}")
+    skipped = sum(1 for r in results if r.status == ProcessingStatus.SKIPPED)
+    if pipeline.run_id:
+        print(f"\nRun ID: {pipeline.run_id}")
+    if pipeline.schedule_report:
+        print(pipeline.schedule_report.summary())
+    print(
+        f"\nTotal: {len(results)} | Success: {success} | "
+        f"Unchanged: {skipped} | Failed: {failed}"
+    )
+    if pipeline.deferred:
+        print(f"Deferred (time limit): {len(pipeline.deferred)}")
+        if pipeline.continuation:
+            print(f"Continue with: --resume {pipeline.continuation}")
+
+    stats = client.throttle_stats()
+    print(
+        f"Graph: {stats.requests} request(s) | Throttled: {stats.throttled} | "
+        f"503: {stats.unavailable} | Retries: {stats.retries} "
+        f"({stats.wait_seconds:.1f}s waiting) | Hedged: {stats.hedges} | "
+        f"Gave up: {stats.gave_up} | "
+        f"Final limits: {stats.concurrency_limit} concurrent, "
+        f"{stats.rate_limit} req/s"
+    )
+    cache = client.response_cache
+    print(
+        f"Graph cache: {cache.hits} hit(s) | {cache.misses} miss(es) | "
+        f"{cache.coalesced} coalesced"
+    )
+    print("\n" + "\n".join(client.tracer.summary_lines()))
 
     # Share folders if requested
     if args.share:
         print("\nCreating sharing links...")
         sharing = FolderSharing(client)
+        # Drive ID and the (filtered) School Directory come from the run, so
+        # every school is shared even when only some had work
         output_drive = sp_files.get_drive_id(SharePointPipeline.OUTPUT_LIBRARY)
-        schools = sp_lists.get_schools()
+        schools = pipeline.schools
         if args.school:
             schools = [s for s in schools if s.SchoolCode in args.school]
-        links = sharing.share_all_school_folders(sp_files, output_drive, schools)
+        links = sharing.share_all_school_folders(
+            sp_files,
+            output_drive,
+            schools,
+            folder_ids=pipeline.folder_ids,
+            links_path=config.sharing_links_path,
+        )
         print("\nSharing links:")
         for code, url in links.items():
             print(f"  {code}: {url}")
 
+    if args.metrics_file:
+        REGISTRY.write(args.metrics_file)
+    progress.close()
+    history.close()
+    client.close()
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,67 @@
+"""Report on past runs from the local run-history database.
+
+Examples:
+    python scripts/show_history.py                  # recent runs
+    python scripts/show_history.py --run a1b2c3d4   # one run, slowest first
+    python scripts/show_history.py --school STM --policy "Enrolment Policy"
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from dotenv import load_dotenv
+
+from policy_localiser.config import Config
+from policy_localiser.orchestrator.history import RunHistory
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show local run history")
+    parser.add_argument("--run", help="Show the documents of one run")
+    parser.add_argument("--school", help="School code, with --policy for one document")
+    parser.add_argument("--policy", help="Policy name, with --school")
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument(
+        "--env-file", type=Path, default=Path(".env"),
+        help="Path to .env file (default: .env)",
+    )
+    args = parser.parse_args()
+
+    load_dotenv(args.env_file)
+    history = RunHistory(Config.from_env().history_db_path)
+
+    if args.run:
+        results = sorted(
+            history.run_results(args.run),
+            key=lambda r: sum(r.timings.values()),
+            reverse=True,
+        )
+        print(f"{'Status':<8} {'School':<8} {'Policy':<35} {'Render':>7} {'Upload':>7}")
+        for r in results[:args.limit]:
+            print(
+                f"{r.status.value:<8} {r.school_code:<8} {r.policy_name:<35} "
+                f"{r.timings.get('render', 0):>6.2f}s {r.timings.get('upload', 0):>6.2f}s"
+            )
+    elif args.school and args.policy:
+        print(f"{'Run':<10} {'Date':<20} {'Status':<8} {'Output hash'}")
+        for r in history.pair_history(args.school, args.policy, args.limit):
+            print(
+                f"{r.run_id:<10} {r.run_date:%Y-%m-%d %H:%M:%S}  "
+                f"{r.status.value:<8} {r.output_hash}"
+            )
+    else:
+        print(f"{'Run':<10} {'Started':<20} {'Total':>6} {'OK':>5} {'Same':>5} {'Fail':>5}")
+        for run in history.recent_runs(args.limit):
+            print(
+                f"{run['run_id']:<10} {run['started'][:19]:<20} "
+                f"{run['total'] or 0:>6} {run['success'] or 0:>5} "
+                f"{run['skipped'] or 0:>5} {run['failed'] or 0:>5}"
+            )
+    history.close()
+
+
+if __name__ == "__main__":
+    main()
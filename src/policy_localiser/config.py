@@ -1,6 +1,20 @@
 import os
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from pathlib import Path
+from typing import Dict, List
+
+
+def parse_sites(value: str) -> Dict[str, str]:
+    """Parse "name=site-id;name=site-id" (site IDs contain commas)."""
+    sites: Dict[str, str] = {}
+    for entry in value.split(";"):
+        if not entry.strip():
+            continue
+        name, sep, site_id = entry.partition("=")
+        if not sep or not name.strip() or not site_id.strip():
+            raise ValueError(f"Invalid SHAREPOINT_SITES entry '{entry}'")
+        sites[name.strip()] = site_id.strip()
+    return sites
 
 
 @dataclass
@@ -12,12 +26,50 @@ class Config:
 
     # SharePoint site
     sharepoint_site_id: str = ""
+    # Several sites for multi-site runs: {name: site ID}
+    sharepoint_sites: Dict[str, str] = field(default_factory=dict)
 
     # Local paths for Layer 1 testing
     local_template_dir: Path = field(default_factory=lambda: Path("./data/templates"))
     local_logo_dir: Path = field(default_factory=lambda: Path("./data/logos"))
     local_output_dir: Path = field(default_factory=lambda: Path("./data/output"))
 
+    # School Directory snapshot + delta link for incremental runs
+    delta_state_path: Path = field(
+        default_factory=lambda: Path("./data/state/school_directory.json")
+    )
+
+    # SchoolCode -> sharing link cache, so repeat sharing passes are instant
+    sharing_links_path: Path = field(
+        default_factory=lambda: Path("./data/state/sharing_links.json")
+    )
+
+    # Per-run checkpoints for resuming interrupted SharePoint runs
+    checkpoint_dir: Path = field(default_factory=lambda: Path("./data/checkpoints"))
+
+    # Local SQLite history of runs and per-document results
+    history_db_path: Path = field(
+        default_factory=lambda: Path("./data/state/run_history.db")
+    )
+
+    # Documents rendered/uploaded concurrently, and the order they start in
+    pipeline_workers: int = 1
+    scheduling: str = "lpt"
+    # Threads for logo downloads, uploads and log writes; 0 = pipeline_workers
+    upload_workers: int = 0
+
+    # Graph request timeouts in seconds, and hedging of slow downloads
+    graph_connect_timeout: float = 10.0
+    graph_read_timeout: float = 60.0
+    hedge_downloads: bool = True
+    # Graph calls taking at least this many seconds are logged (0 = never)
+    slow_call_seconds: float = 2.0
+
+    # Shared record of sharded runs (a file share when running in Azure)
+    run_record_dir: Path = field(default_factory=lambda: Path("./data/runs"))
+    # Schools per queued shard for scheduled runs; 0 runs in one invocation
+    schools_per_shard: int = 0
+
     @classmethod
     def from_env(cls) -> "Config":
         return cls(
@@ -25,7 +77,96 @@ class Config:
             client_id=os.environ.get("AZURE_CLIENT_ID", ""),
             client_secret=os.environ.get("AZURE_CLIENT_SECRET", ""),
             sharepoint_site_id=os.environ.get("SHAREPOINT_SITE_ID", ""),
+            sharepoint_sites=parse_sites(os.environ.get("SHAREPOINT_SITES", "")),
             local_template_dir=Path(os.environ.get("LOCAL_TEMPLATE_DIR", "./data/templates")),
             local_logo_dir=Path(os.environ.get("LOCAL_LOGO_DIR", "./data/logos")),
             local_output_dir=Path(os.environ.get("LOCAL_OUTPUT_DIR", "./data/output")),
+            delta_state_path=Path(
+                os.environ.get(
+                    "DELTA_STATE_PATH", "./data/state/school_directory.json"
+                )
+            ),
+            sharing_links_path=Path(
+                os.environ.get(
+                    "SHARING_LINKS_PATH", "./data/state/sharing_links.json"
+                )
+            ),
+            checkpoint_dir=Path(os.environ.get("CHECKPOINT_DIR", "./data/checkpoints")),
+            history_db_path=Path(
+                os.environ.get("RUN_HISTORY_DB", "./data/state/run_history.db")
+            ),
+            pipeline_workers=int(os.environ.get("PIPELINE_WORKERS", "1")),
+            scheduling=os.environ.get("SCHEDULING", "lpt"),
+            upload_workers=int(os.environ.get("UPLOAD_WORKERS", "0")),
+            graph_connect_timeout=float(os.environ.get("GRAPH_CONNECT_TIMEOUT", "10")),
+            graph_read_timeout=float(os.environ.get("GRAPH_READ_TIMEOUT", "60")),
+            hedge_downloads=os.environ.get("HEDGE_DOWNLOADS", "true").lower()
+            not in ("0", "false", "no"),
+            slow_call_seconds=float(os.environ.get("GRAPH_SLOW_CALL_SECONDS", "2")),
+            run_record_dir=Path(os.environ.get("RUN_RECORD_DIR", "./data/runs")),
+            schools_per_shard=int(os.environ.get("SCHOOLS_PER_SHARD", "0")),
+        )
+
+    def check_shared_storage(self) -> None:
+        """Raise ValueError unless run state lives at absolute paths.
+
+        A Function App's working directory is read-only when run from a
+        package and is not shared between instances, so checkpoints, run
+        records, the delta state and the history must be on a mounted
+        file share that every instance sees.
+        """
+        paths = {
+            "CHECKPOINT_DIR": self.checkpoint_dir,
+            "RUN_RECORD_DIR": self.run_record_dir,
+            "RUN_HISTORY_DB": self.history_db_path,
+            "DELTA_STATE_PATH": self.delta_state_path,
+        }
+        relative: List[str] = [
+            f"{name}={path}" for name, path in paths.items() if not path.is_absolute()
+        ]
+        if relative:
+            raise ValueError(
+                "Run state must be on a file share mounted by every instance; "
+                f"set these to absolute paths on the mount: {', '.join(relative)}"
+            )
+
+    def graph_options(self) -> dict:
+        """GraphClient keyword arguments for these settings."""
+        return {
+            "timeout": (self.graph_connect_timeout, self.graph_read_timeout),
+            "hedge_downloads": self.hedge_downloads,
+            "slow_call_seconds": self.slow_call_seconds,
+        }
+
+    def sites(self) -> Dict[str, str]:
+        """{name: site ID} for every configured site."""
+        if self.sharepoint_sites:
+            return dict(self.sharepoint_sites)
+        return {"default": self.sharepoint_site_id}
+
+    def for_site(self, name: str) -> "Config":
+        """This config narrowed to one of sites().
+
+        Each site gets its own checkpoints, history, run records and delta
+        state under a subdirectory named after it, so results stay separate.
+        """
+        if not self.sharepoint_sites and name == "default":
+            return self
+        if name not in self.sharepoint_sites:
+            raise ValueError(f"Unknown site '{name}'")
+        return replace(
+            self,
+            sharepoint_site_id=self.sharepoint_sites[name],
+            sharepoint_sites={},
+            delta_state_path=(
+                self.delta_state_path.parent / name / self.delta_state_path.name
+            ),
+            sharing_links_path=(
+                self.sharing_links_path.parent / name / self.sharing_links_path.name
+            ),
+            checkpoint_dir=self.checkpoint_dir / name,
+            history_db_path=(
+                self.history_db_path.parent / name / self.history_db_path.name
+            ),
+            run_record_dir=self.run_record_dir / name,
         )
@@ -1,7 +1,9 @@
-from dataclasses import dataclass
+import hashlib
+import json
+from dataclasses import dataclass, field, fields
 from datetime import datetime
 from enum import Enum
-from typing import Optional
+from typing import Dict, Optional
 
 
 class ProcessingStatus(Enum):
@@ -32,6 +34,17 @@ class SchoolRecord:
     ABN: str
     EstablishedYear: str
 
+    @classmethod
+    def from_fields(cls, item_fields: dict) -> "SchoolRecord":
+        """Build from a list item's `fields`; missing columns become ""."""
+        return cls(**{f.name: item_fields.get(f.name, "") or "" for f in fields(cls)})
+
+    @property
+    def content_hash(self) -> str:
+        """Stable hash of the school's field values (a render input)."""
+        data = json.dumps(self.to_context(), sort_keys=True).encode("utf-8")
+        return hashlib.sha256(data).hexdigest()[:16]
+
     @property
     def folder_name(self) -> str:
         return f"{self.SchoolCode} - {self.Title}"
@@ -71,3 +84,10 @@ class ProcessingResult:
     status: ProcessingStatus
     error_message: Optional[str] = None
     duration_seconds: float = 0.0
+    # Seconds per pipeline stage, e.g. {"render": 0.8, "upload": 0.3}
+    timings: Dict[str, float] = field(default_factory=dict)
+    # Input and output fingerprints (quickXorHash for files)
+    template_hash: str = ""
+    logo_hash: str = ""
+    school_hash: str = ""
+    output_hash: str = ""
@@ -1,21 +1,140 @@
+import io
+import threading
 import time
+import zipfile
 from datetime import datetime, timezone
 from pathlib import Path
+from typing import Dict, List, Optional, Tuple
 
-from docxtpl import DocxTemplate
-
+from ..metrics import STAGE_SECONDS
+from .logo_slots import LOGO_PLACEHOLDER_NAME, LogoSlot, find_logo_slots
 from .models import ProcessingResult, ProcessingStatus, SchoolRecord
 
-LOGO_PLACEHOLDER_NAME = "logo_placeholder.png"
+# Fixed zip entry timestamp so identical content gives identical bytes
+_ZIP_EPOCH = (1980, 1, 1, 0, 0, 0)
+
+
+def normalise_docx(data: bytes, media: Optional[Dict[str, bytes]] = None) -> bytes:
+    """Rewrite a .docx with fixed zip timestamps.
+
+    python-docx stamps every zip entry with the save time, so re-rendering
+    unchanged content would otherwise never produce the same bytes (and the
+    same quickXorHash) twice. Parts named in media get that content instead
+    (e.g. the school logo over the placeholder); each must exist.
+    """
+    media = media or {}
+    out = io.BytesIO()
+    with zipfile.ZipFile(io.BytesIO(data)) as src, zipfile.ZipFile(
+        out, "w", zipfile.ZIP_DEFLATED
+    ) as dst:
+        for info in src.infolist():
+            entry = zipfile.ZipInfo(info.filename, date_time=_ZIP_EPOCH)
+            entry.compress_type = zipfile.ZIP_DEFLATED
+            entry.external_attr = info.external_attr
+            content = media.get(info.filename)
+            dst.writestr(entry, content if content is not None else src.read(info))
+        missing = set(media) - set(src.namelist())
+    if missing:
+        raise RuntimeError(f"Media part(s) missing from document: {sorted(missing)}")
+    return out.getvalue()
+
+
+class PreparedTemplate:
+    """A template's content and, worked out on first use, its logo slots."""
+
+    def __init__(self, content: bytes):
+        self.content = content
+        self._slots: Optional[List[LogoSlot]] = None
+        self._lock = threading.Lock()
+
+    @property
+    def logo_slots(self) -> List[LogoSlot]:
+        with self._lock:
+            if self._slots is None:
+                self._slots = find_logo_slots(self.content)
+            return self._slots
+
+
+class TemplateCache:
+    """Template files kept in memory, read again only when they change.
+
+    Keyed by path and checked against the file's size and mtime on every
+    load, so an edited template is picked up on its next render. Logo slots
+    are found once per version of a template. Safe to share between threads.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # path -> ((mtime_ns, size), template)
+        self._entries: Dict[Path, Tuple[Tuple[int, int], PreparedTemplate]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def prepare(self, path: Path) -> PreparedTemplate:
+        stat = path.stat()
+        version = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry[0] == version:
+                self.hits += 1
+                return entry[1]
+        template = PreparedTemplate(path.read_bytes())
+        with self._lock:
+            self._entries[path] = (version, template)
+            self.misses += 1
+        return template
+
+    def load(self, path: Path) -> bytes:
+        return self.prepare(path).content
 
 
 class PolicyRenderer:
     """Renders a single policy template for a single school.
 
     Stateless per call — a new DocxTemplate is created each time to
-    avoid cross-contamination between schools.
+    avoid cross-contamination between schools — but templates are read
+    through a TemplateCache (pass one to share it). The logo is written
+    straight over the media parts of the template's logo slots as the
+    output is saved, rather than through docxtpl's replace_pic.
     """
 
+    def __init__(self, template_cache: Optional[TemplateCache] = None):
+        self._templates = template_cache or TemplateCache()
+
+    def render_bytes(
+        self, template_path: Path, logo_path: Path, school: SchoolRecord
+    ) -> bytes:
+        """Render in memory and return the .docx content; raises on failure."""
+        # Imported on first render: docxtpl (lxml, jinja2, python-docx) is
+        # the slowest import in the package and plans never need it
+        from docxtpl import DocxTemplate
+
+        start = time.monotonic()
+        template = self._templates.prepare(template_path)
+        if not template.logo_slots:
+            raise RuntimeError(
+                f"Template {template_path.name} has no logo slot "
+                f"(a picture named {LOGO_PLACEHOLDER_NAME})"
+            )
+        logo = logo_path.read_bytes()
+        doc = DocxTemplate(io.BytesIO(template.content))
+
+        # Render text placeholders
+        context = school.to_context()
+        doc.render(context)
+        rendered = time.monotonic()
+        STAGE_SECONDS.observe(rendered - start, stage="render")
+
+        buffer = io.BytesIO()
+        doc.save(buffer)
+        # python-docx keeps part names, so the slots' media parts are where
+        # the template had them
+        data = normalise_docx(
+            buffer.getvalue(), {slot.media: logo for slot in template.logo_slots}
+        )
+        STAGE_SECONDS.observe(time.monotonic() - rendered, stage="save")
+        return data
+
     def render(
         self,
         template_path: Path,
@@ -27,20 +146,10 @@ class PolicyRenderer:
         start = time.monotonic()
         policy_name = template_path.stem
         try:
-            doc = DocxTemplate(str(template_path))
-
-            # Replace placeholder image with school logo.
-            # replace_pic matches on the *basename* of the image inside the docx.
-            # Must happen BEFORE render() which processes the XML via Jinja2.
-            doc.replace_pic(LOGO_PLACEHOLDER_NAME, str(logo_path))
-
-            # Render text placeholders
-            context = school.to_context()
-            doc.render(context)
-
+            data = self.render_bytes(template_path, logo_path, school)
             # Ensure output directory exists
             output_path.parent.mkdir(parents=True, exist_ok=True)
-            doc.save(str(output_path))
+            output_path.write_bytes(data)
 
             elapsed = time.monotonic() - start
             return ProcessingResult(
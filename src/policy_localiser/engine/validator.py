@@ -1,8 +1,12 @@
+import xml.etree.ElementTree as ET
+import zipfile
 from dataclasses import dataclass
 from pathlib import Path
-from typing import List
+from typing import Callable, Iterable, List, Optional
 
+from .logo_slots import LOGO_PLACEHOLDER_NAME
 from .models import SchoolRecord
+from .renderer import TemplateCache
 
 
 @dataclass
@@ -19,29 +23,87 @@ class TemplateValidator:
 
     REQUIRED_FIELDS = ["Title", "SchoolCode", "ShortName", "PrincipalName"]
 
+    def __init__(self, template_cache: Optional[TemplateCache] = None):
+        # Share the renderer's cache so each template's slots are found once
+        self._templates = template_cache or TemplateCache()
+
     def validate(
         self,
         template_paths: List[Path],
         logo_dir: Path,
         schools: List[SchoolRecord],
     ) -> List[ValidationError]:
-        errors: List[ValidationError] = []
+        errors = self.validate_templates(template_paths)
+        errors.extend(
+            self._check_schools(
+                schools,
+                lambda code: (logo_dir / f"{code}.png").exists(),
+                lambda code: str(logo_dir / f"{code}.png"),
+            )
+        )
+        return errors
 
-        # Check templates exist and are .docx
+    def validate_templates(self, template_paths: List[Path]) -> List[ValidationError]:
+        """Check templates exist, are .docx and have a logo slot."""
+        errors: List[ValidationError] = []
         for tp in template_paths:
             if not tp.exists():
                 errors.append(ValidationError("error", f"Template not found: {tp}"))
             elif tp.suffix.lower() != ".docx":
                 errors.append(ValidationError("error", f"Template is not .docx: {tp}"))
+            else:
+                try:
+                    slots = self._templates.prepare(tp).logo_slots
+                except (zipfile.BadZipFile, KeyError, ValueError, ET.ParseError):
+                    errors.append(
+                        ValidationError("error", f"Template is not a valid .docx: {tp}")
+                    )
+                    continue
+                if not slots:
+                    errors.append(ValidationError(
+                        "error",
+                        f"Template has no logo slot (a picture named "
+                        f"{LOGO_PLACEHOLDER_NAME}): {tp}",
+                    ))
+        return errors
+
+    def validate_names(
+        self,
+        template_names: Iterable[str],
+        logo_names: Iterable[str],
+        schools: List[SchoolRecord],
+    ) -> List[ValidationError]:
+        """Same checks against library listings, without downloading files."""
+        errors: List[ValidationError] = []
+        for name in template_names:
+            if not name.lower().endswith(".docx"):
+                errors.append(ValidationError("error", f"Template is not .docx: {name}"))
+        logos = set(logo_names)
+        errors.extend(
+            self._check_schools(
+                schools,
+                lambda code: f"{code}.png" in logos,
+                lambda code: f"School Logos/{code}.png",
+            )
+        )
+        return errors
+
+    def _check_schools(
+        self,
+        schools: List[SchoolRecord],
+        has_logo: Callable[[str], bool],
+        logo_location: Callable[[str], str],
+    ) -> List[ValidationError]:
+        errors: List[ValidationError] = []
 
         # Check each school has a logo
         for school in schools:
-            logo_path = logo_dir / f"{school.SchoolCode}.png"
-            if not logo_path.exists():
+            if not has_logo(school.SchoolCode):
                 errors.append(
                     ValidationError(
                         "error",
-                        f"Logo not found for {school.SchoolCode}: {logo_path}",
+                        f"Logo not found for {school.SchoolCode}: "
+                        f"{logo_location(school.SchoolCode)}",
                     )
                 )
 
@@ -1,6 +1,3 @@
-import msal
-
-
 class GraphAuth:
     """Acquires access tokens using MSAL client credentials flow.
 
@@ -11,6 +8,10 @@ class GraphAuth:
     SCOPES = ["https://graph.microsoft.com/.default"]
 
     def __init__(self, tenant_id: str, client_id: str, client_secret: str):
+        # Imported here so importing the package (or using FakeAuth) does
+        # not pay for msal and its crypto dependencies
+        import msal
+
         self._app = msal.ConfidentialClientApplication(
             client_id,
             authority=f"https://login.microsoftonline.com/{tenant_id}",
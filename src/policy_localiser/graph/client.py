@@ -1,21 +1,122 @@
+import json
 import logging
+import queue
+import threading
 import time
+import uuid
+from typing import List, Optional, Tuple
 
 import requests
 
+from ..metrics import (
+    GRAPH_BYTES,
+    GRAPH_HEDGES,
+    GRAPH_REQUESTS,
+    GRAPH_RETRIES,
+    GRAPH_THROTTLES,
+    STAGE_SECONDS,
+)
 from .auth import GraphAuth
+from .response_cache import ResponseCache
+from .throttle import (
+    HedgePolicy,
+    LatencyWindow,
+    RateController,
+    RetryPolicy,
+    ThrottleStats,
+    parse_retry_after,
+)
+from .tracing import CallTrace, CallTracer, endpoint_template
 
 logger = logging.getLogger(__name__)
 
 
+def _succeeded(answer) -> bool:
+    """Whether a hedged copy's answer (a response or an exception) can win."""
+    return not isinstance(answer, Exception) and answer.ok
+
+
 class GraphClient:
-    """Low-level HTTP client for Microsoft Graph API with retry logic."""
+    """Low-level HTTP client for Microsoft Graph API with retry logic.
+
+    All requests go through a RateController. Pass the same controller to
+    several clients to make them share throttling state. Identical GETs in
+    flight at the same time are sent once; GETs made with a ttl are also
+    answered from a response cache of cache_size entries.
+
+    Every request has a (connect, read) timeout in seconds, and slow
+    downloads are hedged under hedge_policy unless hedge_downloads is off.
+    A hedge is only sent while the rate controller has a slot and token to
+    spare, and counts against the limits like any other request.
+
+    Every request is traced (see tracing.py); calls taking slow_call_seconds
+    or more are logged. Pass a tracer to share one between clients.
+    """
 
     BASE_URL = "https://graph.microsoft.com/v1.0"
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
+    IDEMPOTENT_METHODS = ("GET", "HEAD", "PUT", "DELETE")
+    BATCH_LIMIT = 20  # Graph JSON batching maximum per $batch request
+    DEFAULT_TIMEOUT = (10.0, 60.0)
 
-    def __init__(self, auth: GraphAuth):
+    def __init__(
+        self,
+        auth: GraphAuth,
+        rate_controller: Optional[RateController] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        base_url: str = BASE_URL,
+        session: Optional[requests.Session] = None,
+        pool_size: Optional[int] = None,
+        cache_size: int = 256,
+        timeout: Tuple[float, float] = DEFAULT_TIMEOUT,
+        hedge_downloads: bool = True,
+        hedge_policy: Optional[HedgePolicy] = None,
+        slow_call_seconds: float = 2.0,
+        tracer: Optional[CallTracer] = None,
+    ):
         self._auth = auth
-        self._session = requests.Session()
+        self._base_url = base_url
+        # Swap in a RecordingSession/ReplaySession to capture or replay traffic
+        if session is None:
+            session = requests.Session()
+            if pool_size:
+                # Keep-alive connections for this many concurrent threads
+                # (requests keeps 10 per host by default)
+                adapter = requests.adapters.HTTPAdapter(
+                    pool_connections=pool_size, pool_maxsize=pool_size
+                )
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+        self._session = session
+        self._limiter = rate_controller or RateController()
+        self._retry = retry_policy or RetryPolicy()
+        self._cache = ResponseCache(cache_size)
+        self._timeout = timeout
+        self._hedge = (hedge_policy or HedgePolicy()) if hedge_downloads else None
+        self._download_times = LatencyWindow(self._hedge.window if self._hedge else 1)
+        self._hedge_lock = threading.Lock()
+        self._downloads = 0
+        self._hedged = 0
+        self._tracer = tracer or CallTracer(slow_call_seconds)
+
+    @property
+    def rate_controller(self) -> RateController:
+        return self._limiter
+
+    def throttle_stats(self) -> ThrottleStats:
+        return self._limiter.stats()
+
+    @property
+    def tracer(self) -> CallTracer:
+        return self._tracer
+
+    @property
+    def response_cache(self) -> ResponseCache:
+        return self._cache
+
+    def close(self) -> None:
+        """Close the HTTP session (and write the cassette when recording)."""
+        self._session.close()
 
     def _headers(self, content_type: str = "application/json") -> dict:
         return {
@@ -23,48 +124,252 @@ class GraphClient:
             "Content-Type": content_type,
         }
 
-    def get(self, path: str, params: dict = None) -> requests.Response:
-        return self._request("GET", path, params=params)
+    def get(
+        self, path: str, params: dict = None, ttl: Optional[float] = None
+    ) -> requests.Response:
+        """GET, shared with any identical GET already in flight.
+
+        ttl opts the endpoint into the response cache: a successful
+        response is reused for that many seconds. Use it only for metadata
+        that changes rarely (drive and list IDs, folder probes).
+        """
+        return self._cache.fetch(
+            ResponseCache.key(path, params),
+            lambda: self._request("GET", path, params=params),
+            ttl,
+        )
 
     def get_binary(self, path: str) -> bytes:
         """GET request that returns raw bytes (for file downloads)."""
-        resp = self._request("GET", path)
+        start = time.monotonic()
+        if self._hedge is not None:
+            resp = self._hedged_get(path)
+        else:
+            resp = self._request("GET", path)
+        elapsed = time.monotonic() - start
+        self._download_times.observe(elapsed)
+        STAGE_SECONDS.observe(elapsed, stage="download")
         return resp.content
 
+    def _hedge_delay(self) -> Optional[float]:
+        """Seconds to wait before hedging the next download, or None."""
+        policy = self._hedge
+        if len(self._download_times) < policy.min_samples:
+            return None
+        with self._hedge_lock:
+            self._downloads += 1
+            if self._hedged >= policy.max_fraction * self._downloads:
+                return None
+        return max(policy.min_delay, self._download_times.percentile(policy.percentile))
+
+    def _hedged_get(self, path: str) -> requests.Response:
+        """GET, sent again if it is slower than recent downloads; the first
+        successful answer wins and the other is discarded."""
+        delay = self._hedge_delay()
+        if delay is None:
+            return self._request("GET", path)
+
+        answers: queue.Queue = queue.Queue()
+
+        def send(copy: str) -> None:
+            try:
+                answers.put((copy, self._request("GET", path)))
+            except Exception as e:
+                answers.put((copy, e))
+
+        threading.Thread(target=send, args=("first",), daemon=True).start()
+        try:
+            copy, answer = answers.get(timeout=delay)
+        except queue.Empty:
+            if not self._limiter.has_capacity():
+                copy, answer = answers.get()
+            else:
+                with self._hedge_lock:
+                    self._hedged += 1
+                self._limiter.record_hedge()
+                logger.debug(f"Hedging GET {path} after {delay:.2f}s")
+                threading.Thread(target=send, args=("hedge",), daemon=True).start()
+                copy, answer = answers.get()
+                if not _succeeded(answer):
+                    # The other copy may still succeed
+                    copy, answer = answers.get()
+                if _succeeded(answer):
+                    GRAPH_HEDGES.inc(result="won" if copy == "hedge" else "lost")
+                else:
+                    GRAPH_HEDGES.inc(result="failed")
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+
     def post(self, path: str, json: dict = None) -> requests.Response:
         return self._request("POST", path, json=json)
 
     def put_binary(
         self, path: str, data: bytes, content_type: str
     ) -> requests.Response:
-        return self._request(
-            "PUT", path, data=data, headers=self._headers(content_type)
-        )
+        start = time.monotonic()
+        resp = self._request("PUT", path, data=data, content_type=content_type)
+        STAGE_SECONDS.observe(time.monotonic() - start, stage="upload")
+        return resp
+
+    def batch(self, requests_: List[dict]) -> List[dict]:
+        """Send sub-requests through JSON batching, 20 per $batch call.
+
+        Each sub-request is {"method", "url"[, "body"]} with a URL relative to
+        the API root. Returns one {"status", "headers", "body"} dict per
+        sub-request, in order. Throttled sub-requests are retried under the
+        client's retry policy; other failures are returned for the caller.
+        """
+        responses: List[Optional[dict]] = [None] * len(requests_)
+        pending = list(range(len(requests_)))
+        waited = 0.0
+        attempt = 0
+
+        while True:
+            retry: List[int] = []
+            retry_after = None
+            for start in range(0, len(pending), self.BATCH_LIMIT):
+                chunk = pending[start:start + self.BATCH_LIMIT]
+                resp = self.post(
+                    "/$batch",
+                    json={
+                        "requests": [self._batch_entry(i, requests_[i]) for i in chunk]
+                    },
+                )
+                for sub in resp.json().get("responses", []):
+                    index = int(sub["id"])
+                    responses[index] = sub
+                    status = sub.get("status", 0)
+                    self._limiter.on_response(status, sub.get("headers") or {})
+                    if status in RateController.THROTTLE_STATUSES:
+                        GRAPH_THROTTLES.inc()
+                    if status in self.RETRY_STATUSES:
+                        retry.append(index)
+                        after = parse_retry_after(sub.get("headers") or {})
+                        if after is not None:
+                            retry_after = max(retry_after or 0.0, after)
+
+            if not retry:
+                break
+            delay = self._retry.backoff(attempt, retry_after)
+            if not self._retry.allows(attempt, waited, delay):
+                self._limiter.record_give_up()
+                break
+            logger.warning(
+                f"{len(retry)} batched request(s) throttled, retrying in {delay:.1f}s"
+            )
+            self._limiter.record_retry(delay)
+            GRAPH_RETRIES.inc(len(retry))
+            time.sleep(delay)
+            waited += delay
+            attempt += 1
+            pending = sorted(retry)
+
+        return [r or {"status": 0, "headers": {}, "body": {}} for r in responses]
+
+    @staticmethod
+    def _batch_entry(index: int, sub: dict) -> dict:
+        entry = {"id": str(index), "method": sub["method"], "url": sub["url"]}
+        if "body" in sub:
+            entry["body"] = sub["body"]
+            entry["headers"] = {"Content-Type": "application/json"}
+        return entry
 
     def _request(
-        self, method: str, path: str, max_retries: int = 3, **kwargs
+        self,
+        method: str,
+        path: str,
+        content_type: str = "application/json",
+        **kwargs,
     ) -> requests.Response:
-        url = f"{self.BASE_URL}{path}" if path.startswith("/") else path
-        if "headers" not in kwargs:
-            kwargs["headers"] = self._headers()
-
-        for attempt in range(max_retries):
-            resp = self._session.request(method, url, **kwargs)
+        if kwargs.get("data") is not None:
+            sent = len(kwargs["data"])
+        elif kwargs.get("json") is not None:
+            sent = len(json.dumps(kwargs["json"]))
+        else:
+            sent = 0
+        trace = CallTrace(
+            method, endpoint_template(path), client_request_id=str(uuid.uuid4())
+        )
+        start = time.monotonic()
+        try:
+            return self._send(method, path, content_type, sent, trace, **kwargs)
+        finally:
+            trace.seconds = time.monotonic() - start
+            self._tracer.record(trace)
 
-            if resp.status_code == 429:  # Throttled
-                retry_after = int(resp.headers.get("Retry-After", 5))
-                logger.warning(f"Throttled by Graph API, retrying in {retry_after}s")
-                time.sleep(retry_after)
-                continue
+    def _send(
+        self,
+        method: str,
+        path: str,
+        content_type: str,
+        sent: int,
+        trace: CallTrace,
+        **kwargs,
+    ) -> requests.Response:
+        url = f"{self._base_url}{path}" if path.startswith("/") else path
+        waited = 0.0
+        attempt = 0
 
-            if resp.status_code >= 500 and attempt < max_retries - 1:
-                wait = 2**attempt
-                logger.warning(f"Server error {resp.status_code}, retrying in {wait}s")
-                time.sleep(wait)
-                continue
+        while True:
+            # Rebuilt per attempt so a long backoff can't outlive the token
+            kwargs["headers"] = self._headers(content_type)
+            # Graph echoes it back; the same ID on every retry of the call
+            kwargs["headers"]["client-request-id"] = trace.client_request_id
+            kwargs["timeout"] = self._timeout
+            self._limiter.acquire()
+            try:
+                resp = self._session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                GRAPH_REQUESTS.inc(method=method, status="0")
+                trace.status = 0
+                is_timeout = isinstance(e, requests.Timeout)
+                self._limiter.on_connection_error(timeout=is_timeout)
+                # A read timeout on a POST may mean the request was applied
+                safe = (
+                    method in self.IDEMPOTENT_METHODS
+                    or isinstance(e, requests.ConnectTimeout)
+                    or not is_timeout
+                )
+                delay = self._retry.backoff(attempt)
+                if not safe or not self._retry.allows(attempt, waited, delay):
+                    self._limiter.record_give_up()
+                    raise
+                logger.warning(
+                    f"{type(e).__name__} on {method} {path}, retrying in {delay:.1f}s"
+                )
+            else:
+                self._limiter.on_response(resp.status_code, resp.headers)
+                GRAPH_REQUESTS.inc(method=method, status=str(resp.status_code))
+                GRAPH_BYTES.inc(sent, direction="out")
+                GRAPH_BYTES.inc(len(resp.content), direction="in")
+                trace.status = resp.status_code
+                trace.bytes_sent += sent
+                trace.bytes_received += len(resp.content)
+                trace.request_id = resp.headers.get("request-id", "")
+                if resp.status_code in RateController.THROTTLE_STATUSES:
+                    GRAPH_THROTTLES.inc()
+                if resp.status_code not in self.RETRY_STATUSES:
+                    resp.raise_for_status()
+                    return resp
 
-            resp.raise_for_status()
-            return resp
+                delay = self._retry.backoff(attempt, parse_retry_after(resp.headers))
+                if not self._retry.allows(attempt, waited, delay):
+                    self._limiter.record_give_up()
+                    resp.raise_for_status()
+                    return resp
+                if resp.status_code == 429:
+                    logger.warning(f"Throttled by Graph API, retrying in {delay:.1f}s")
+                else:
+                    logger.warning(
+                        f"Server error {resp.status_code}, retrying in {delay:.1f}s"
+                    )
+            finally:
+                self._limiter.release()
 
-        resp.raise_for_status()
-        return resp
+            self._limiter.record_retry(delay)
+            GRAPH_RETRIES.inc()
+            time.sleep(delay)
+            waited += delay
+            attempt += 1
+            trace.retries = attempt
@@ -0,0 +1,36 @@
+"""OneDrive/SharePoint quickXorHash.
+
+The hash Graph reports in `file.hashes.quickXorHash` for SharePoint files.
+Each input byte is XORed into a 160-bit circular register, shifted 11 bits
+further than the previous byte; the data length is then XORed into the last
+64 bits and the 20-byte result is base64-encoded.
+"""
+
+import base64
+
+WIDTH_IN_BITS = 160
+SHIFT = 11
+_WIDTH_IN_BYTES = WIDTH_IN_BITS // 8
+_MASK = (1 << WIDTH_IN_BITS) - 1
+
+
+def quick_xor_hash(data: bytes) -> str:
+    """Base64 quickXorHash of data."""
+    # Byte i lands at bit offset (i * 11) % 160, which repeats every 160
+    # bytes, so XOR-fold the input into a single 160-byte block first.
+    folded = 0
+    full = len(data) - len(data) % WIDTH_IN_BITS
+    for start in range(0, full, WIDTH_IN_BITS):
+        folded ^= int.from_bytes(data[start:start + WIDTH_IN_BITS], "little")
+    if full < len(data):
+        folded ^= int.from_bytes(data[full:], "little")
+
+    register = 0
+    for index, value in enumerate(folded.to_bytes(WIDTH_IN_BITS, "little")):
+        if not value:
+            continue
+        shifted = value << ((index * SHIFT) % WIDTH_IN_BITS)
+        register ^= (shifted & _MASK) | (shifted >> WIDTH_IN_BITS)
+
+    register ^= (len(data) & 0xFFFFFFFFFFFFFFFF) << (WIDTH_IN_BITS - 64)
+    return base64.b64encode(register.to_bytes(_WIDTH_IN_BYTES, "little")).decode("ascii")
@@ -0,0 +1,248 @@
+"""Record and replay Graph HTTP traffic for offline, repeatable benchmarks.
+
+A cassette is a single zip file:
+
+    meta.json           caller-supplied metadata (e.g. the site ID)
+    interactions.json   request/response metadata, in recorded order
+    bodies/<sha256>     request and response bodies, stored once each
+
+Secrets are scrubbed before anything is written: the Authorization header
+is never recorded, only an allowlist of response headers is kept, and
+signed-URL parameters (tempauth, sig, ...) and pre-authenticated download
+URLs are redacted from URLs and JSON bodies.
+
+Record with `GraphClient(auth, session=RecordingSession(path))` and call
+`client.close()` to write the cassette; replay with
+`GraphClient(auth, session=ReplaySession(path, latency_scale=1.0))`.
+"""
+
+import hashlib
+import json
+import logging
+import re
+import threading
+import time
+import zipfile
+from collections import defaultdict, deque
+from pathlib import Path
+from typing import Deque, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+logger = logging.getLogger(__name__)
+
+SECRET_PARAMS = {"tempauth", "access_token", "sig", "code", "client_secret"}
+KEPT_RESPONSE_HEADERS = (
+    "Content-Type",
+    "Retry-After",
+    "RateLimit-Limit",
+    "RateLimit-Remaining",
+    "RateLimit-Reset",
+    "request-id",
+    "client-request-id",
+)
+SECRET_JSON_KEYS = {"@microsoft.graph.downloadUrl", "@content.downloadUrl"}
+REDACTED = "REDACTED"
+
+_SECRET_IN_TEXT = re.compile(
+    r"((?:%s)=)[^&\"'\s]+" % "|".join(sorted(SECRET_PARAMS)), re.IGNORECASE
+)
+
+
+def scrub_url(url: str) -> str:
+    """Redact secret query parameters, keeping parameter order."""
+    parts = urlsplit(url)
+    if not parts.query:
+        return url
+    query = [
+        (k, REDACTED if k.lower() in SECRET_PARAMS else v)
+        for k, v in parse_qsl(parts.query, keep_blank_values=True)
+    ]
+    return urlunsplit(parts._replace(query=urlencode(query, safe="$,'() ")))
+
+
+def scrub_body(body: bytes, content_type: str) -> bytes:
+    """Redact download URLs and signed parameters from JSON bodies."""
+    if "json" not in content_type.lower() or not body:
+        return body
+    try:
+        data = json.loads(body)
+    except ValueError:
+        return body
+    text = json.dumps(_scrub_json(data))
+    return _SECRET_IN_TEXT.sub(r"\1" + REDACTED, text).encode("utf-8")
+
+
+def _scrub_json(value):
+    if isinstance(value, dict):
+        return {
+            k: (REDACTED if k in SECRET_JSON_KEYS else _scrub_json(v))
+            for k, v in value.items()
+        }
+    if isinstance(value, list):
+        return [_scrub_json(v) for v in value]
+    return value
+
+
+class ReplayMissError(RuntimeError):
+    """A request had no recorded counterpart in the cassette."""
+
+
+class Cassette:
+    """In-memory cassette contents with zip load/save."""
+
+    def __init__(self, metadata: Optional[dict] = None):
+        self.metadata: dict = dict(metadata or {})
+        self.interactions: List[dict] = []
+        self.bodies: Dict[str, bytes] = {}
+
+    def add_body(self, data: bytes) -> Optional[str]:
+        if not data:
+            return None
+        digest = hashlib.sha256(data).hexdigest()
+        self.bodies.setdefault(digest, data)
+        return digest
+
+    def body(self, digest: Optional[str]) -> bytes:
+        return self.bodies[digest] if digest else b""
+
+    def save(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+            zf.writestr("meta.json", json.dumps(self.metadata, indent=1))
+            zf.writestr("interactions.json", json.dumps(self.interactions, indent=1))
+            for digest, data in self.bodies.items():
+                zf.writestr(f"bodies/{digest}", data)
+
+    @classmethod
+    def load(cls, path: Path) -> "Cassette":
+        cassette = cls()
+        with zipfile.ZipFile(path) as zf:
+            cassette.interactions = json.loads(zf.read("interactions.json"))
+            if "meta.json" in zf.namelist():
+                cassette.metadata = json.loads(zf.read("meta.json"))
+            for name in zf.namelist():
+                if name.startswith("bodies/"):
+                    cassette.bodies[name[len("bodies/"):]] = zf.read(name)
+        return cassette
+
+
+def _request_body(kwargs: dict) -> bytes:
+    if kwargs.get("data") is not None:
+        data = kwargs["data"]
+        return data if isinstance(data, bytes) else str(data).encode("utf-8")
+    if kwargs.get("json") is not None:
+        return json.dumps(kwargs["json"]).encode("utf-8")
+    return b""
+
+
+def _full_url(url: str, params: Optional[dict]) -> str:
+    """The URL requests will actually send, including params."""
+    if not params:
+        return url
+    return requests.Request("GET", url, params=params).prepare().url
+
+
+class RecordingSession(requests.Session):
+    """requests.Session that records every exchange into a cassette.
+
+    The cassette is written when the session is closed.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        record_request_bodies: bool = True,
+        metadata: Optional[dict] = None,
+    ):
+        super().__init__()
+        self._path = Path(path)
+        self._record_request_bodies = record_request_bodies
+        self._cassette = Cassette(metadata)
+        self._lock = threading.Lock()
+
+    def request(self, method, url, **kwargs) -> requests.Response:
+        start = time.perf_counter()
+        resp = super().request(method, url, **kwargs)
+        elapsed = time.perf_counter() - start
+
+        content_type = resp.headers.get("Content-Type", "")
+        headers = {
+            name: resp.headers[name]
+            for name in KEPT_RESPONSE_HEADERS
+            if name in resp.headers
+        }
+        request_body = _request_body(kwargs) if self._record_request_bodies else b""
+        with self._lock:
+            self._cassette.interactions.append({
+                "method": method.upper(),
+                "url": scrub_url(_full_url(url, kwargs.get("params"))),
+                "request_body": self._cassette.add_body(request_body),
+                "status": resp.status_code,
+                "reason": resp.reason,
+                "headers": headers,
+                "body": self._cassette.add_body(scrub_body(resp.content, content_type)),
+                "elapsed": round(elapsed, 4),
+            })
+        return resp
+
+    def close(self) -> None:
+        super().close()
+        with self._lock:
+            self._cassette.save(self._path)
+        logger.info(
+            f"Recorded {len(self._cassette.interactions)} Graph call(s) "
+            f"to {self._path}"
+        )
+
+
+class ReplaySession(requests.Session):
+    """requests.Session that answers from a cassette instead of the network.
+
+    Requests are matched on method and scrubbed URL; repeated identical
+    requests get the recorded responses in order, then the last one again.
+    latency_scale multiplies the recorded latencies (0 disables sleeping).
+    """
+
+    def __init__(self, path: Path, latency_scale: float = 1.0):
+        super().__init__()
+        self._cassette = Cassette.load(Path(path))
+        self._latency_scale = latency_scale
+        self._lock = threading.Lock()
+        self._queues: Dict[Tuple[str, str], Deque[dict]] = defaultdict(deque)
+        self._last: Dict[Tuple[str, str], dict] = {}
+        for interaction in self._cassette.interactions:
+            key = (interaction["method"], interaction["url"])
+            self._queues[key].append(interaction)
+        self.misses = 0
+
+    @property
+    def metadata(self) -> dict:
+        return self._cassette.metadata
+
+    def request(self, method, url, **kwargs) -> requests.Response:
+        key = (method.upper(), scrub_url(_full_url(url, kwargs.get("params"))))
+        with self._lock:
+            queue = self._queues.get(key)
+            if queue:
+                interaction = queue.popleft()
+                self._last[key] = interaction
+            else:
+                interaction = self._last.get(key)
+            if interaction is None:
+                self.misses += 1
+                raise ReplayMissError(f"No recorded interaction for {key[0]} {key[1]}")
+
+        if self._latency_scale > 0:
+            time.sleep(interaction["elapsed"] * self._latency_scale)
+
+        resp = requests.Response()
+        resp.status_code = interaction["status"]
+        resp.reason = interaction.get("reason", "")
+        resp.headers = CaseInsensitiveDict(interaction["headers"])
+        resp._content = self._cassette.body(interaction["body"])
+        resp.url = url
+        resp.encoding = "utf-8"
+        return resp
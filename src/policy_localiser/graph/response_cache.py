@@ -0,0 +1,91 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Callable, Dict, Hashable, Optional, Tuple
+
+import requests
+
+from ..metrics import GRAPH_CACHE
+
+
+class ResponseCache:
+    """Single-flight and a small TTL/LRU cache for Graph GET responses.
+
+    Concurrent identical GETs share one in-flight call (and its result or
+    exception). Responses of calls made with a ttl are also kept for that
+    many seconds, up to max_entries (least recently used dropped first);
+    only successful responses are cached. Safe to share between threads.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._max_entries = max_entries
+        self._clock = clock
+        self._lock = threading.Lock()
+        # key -> (expiry time, response), least recently used first
+        self._entries: "OrderedDict[Hashable, Tuple[float, requests.Response]]" = (
+            OrderedDict()
+        )
+        self._in_flight: Dict[Hashable, Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    @staticmethod
+    def key(path: str, params: Optional[dict] = None) -> Hashable:
+        return (path, tuple(sorted((params or {}).items())))
+
+    def fetch(
+        self,
+        key: Hashable,
+        call: Callable[[], requests.Response],
+        ttl: Optional[float] = None,
+    ) -> requests.Response:
+        """The cached response for key, else the result of call()."""
+        with self._lock:
+            if ttl:
+                entry = self._entries.get(key)
+                if entry is not None and entry[0] > self._clock():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    GRAPH_CACHE.inc(result="hit")
+                    return entry[1]
+            future = self._in_flight.get(key)
+            owner = future is None
+            if owner:
+                future = self._in_flight[key] = Future()
+                if ttl:
+                    self.misses += 1
+                    GRAPH_CACHE.inc(result="miss")
+            else:
+                self.coalesced += 1
+                GRAPH_CACHE.inc(result="coalesced")
+        if not owner:
+            return future.result()
+
+        try:
+            response = call()
+        except BaseException as e:
+            with self._lock:
+                del self._in_flight[key]
+            future.set_exception(e)
+            raise
+        with self._lock:
+            del self._in_flight[key]
+            if ttl and self._max_entries > 0:
+                self._entries[key] = (self._clock() + ttl, response)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self._max_entries:
+                    self._entries.popitem(last=False)
+        future.set_result(response)
+        return response
+
+    def invalidate(self, prefix: str = "") -> None:
+        """Drop cached responses whose path starts with prefix (all by default)."""
+        with self._lock:
+            for key in [k for k in self._entries if k[0].startswith(prefix)]:
+                del self._entries[key]
@@ -1,6 +1,8 @@
 import logging
 from pathlib import Path
-from typing import List
+from typing import Dict, Iterable, List, Optional
+
+import requests
 
 from .client import GraphClient
 
@@ -10,23 +12,60 @@ logger = logging.getLogger(__name__)
 class SharePointFiles:
     """Download files from and upload files to SharePoint document libraries."""
 
+    # Seconds the client may reuse drive listings and folder probes for
+    METADATA_TTL = 300.0
+
     def __init__(self, client: GraphClient, site_id: str):
         self._client = client
         self._site_id = site_id
+        # Drive IDs never change for a library, so one lookup serves every run
+        self._drive_ids: Dict[str, str] = {}
 
     def get_drive_id(self, library_name: str) -> str:
         """Look up the drive ID for a named document library."""
-        resp = self._client.get(f"/sites/{self._site_id}/drives")
-        drives = resp.json().get("value", [])
-        for drive in drives:
-            if drive.get("name") == library_name:
-                return drive["id"]
-        raise RuntimeError(f"Document library '{library_name}' not found")
+        if library_name not in self._drive_ids:
+            resp = self._client.get(
+                f"/sites/{self._site_id}/drives", ttl=self.METADATA_TTL
+            )
+            for drive in resp.json().get("value", []):
+                self._drive_ids[drive.get("name")] = drive["id"]
+        if library_name not in self._drive_ids:
+            raise RuntimeError(f"Document library '{library_name}' not found")
+        return self._drive_ids[library_name]
 
     def list_files(self, drive_id: str) -> List[dict]:
         """List files in the root of a drive. Returns list of {name, id, ...}."""
-        resp = self._client.get(f"/drives/{drive_id}/root/children")
-        return resp.json().get("value", [])
+        return self._list_all(f"/drives/{drive_id}/root/children?$top=999")
+
+    def get_file(self, drive_id: str, file_name: str) -> Optional[dict]:
+        """A file's driveItem from the root of a drive, or None if missing."""
+        try:
+            return self._client.get(f"/drives/{drive_id}/root:/{file_name}").json()
+        except requests.HTTPError as e:
+            if e.response is None or e.response.status_code != 404:
+                raise
+            return None
+
+    def _list_all(self, url: str) -> List[dict]:
+        """Follow @odata.nextLink paging and return every item."""
+        items: List[dict] = []
+        while url:
+            data = self._client.get(url).json()
+            items.extend(data.get("value", []))
+            url = data.get("@odata.nextLink")
+        return items
+
+    def list_folder_hashes(self, drive_id: str, folder_id: str) -> Dict[str, str]:
+        """{file name: quickXorHash} for the files in a folder."""
+        items = self._list_all(
+            f"/drives/{drive_id}/items/{folder_id}/children"
+            f"?$select=name,file&$top=999"
+        )
+        return {
+            item["name"]: item["file"].get("hashes", {}).get("quickXorHash", "")
+            for item in items
+            if "file" in item
+        }
 
     def download_file(self, drive_id: str, item_id: str, local_path: Path) -> None:
         """Download a file by item ID to local disk."""
@@ -49,11 +88,15 @@ class SharePointFiles:
     def ensure_folder(self, drive_id: str, folder_name: str) -> str:
         """Create a folder if it doesn't exist. Returns the folder's item ID."""
         try:
-            resp = self._client.get(f"/drives/{drive_id}/root:/{folder_name}")
+            resp = self._client.get(
+                f"/drives/{drive_id}/root:/{folder_name}", ttl=self.METADATA_TTL
+            )
             folder_id = resp.json()["id"]
             logger.debug(f"Folder '{folder_name}' already exists")
             return folder_id
-        except Exception:
+        except requests.HTTPError as e:
+            if e.response is None or e.response.status_code != 404:
+                raise
             resp = self._client.post(
                 f"/drives/{drive_id}/root/children",
                 json={
@@ -66,19 +109,82 @@ class SharePointFiles:
             logger.info(f"Created folder '{folder_name}'")
             return folder_id
 
+    def reconcile_folders(
+        self, drive_id: str, folder_names: Iterable[str]
+    ) -> Dict[str, str]:
+        """Make sure every named folder exists in the drive root.
+
+        Lists the root once (with paging) and creates only the missing
+        folders, batched. Returns {folder name: item ID}; folders that could
+        not be created are logged and left out.
+        """
+        wanted = list(dict.fromkeys(folder_names))
+        # SharePoint names are case-insensitive
+        existing = {
+            item["name"].casefold(): item["id"]
+            for item in self._list_all(
+                f"/drives/{drive_id}/root/children"
+                f"?$select=id,name,folder&$top=999"
+            )
+            if "folder" in item
+        }
+        folder_ids = {
+            name: existing[name.casefold()]
+            for name in wanted
+            if name.casefold() in existing
+        }
+        missing = [n for n in wanted if n not in folder_ids]
+        if not missing:
+            return folder_ids
+
+        responses = self._client.batch([
+            {
+                "method": "POST",
+                "url": f"/drives/{drive_id}/root/children",
+                "body": {
+                    "name": name,
+                    "folder": {},
+                    "@microsoft.graph.conflictBehavior": "fail",
+                },
+            }
+            for name in missing
+        ])
+        for name, resp in zip(missing, responses):
+            status = resp.get("status")
+            if status in (200, 201):
+                folder_ids[name] = resp["body"]["id"]
+            elif status == 409:
+                # Created by someone else since the listing
+                folder_ids[name] = self.ensure_folder(drive_id, name)
+            else:
+                error = (resp.get("body") or {}).get("error", {}).get("message", "")
+                logger.error(f"Failed to create folder '{name}': {status} {error}")
+        logger.info(
+            f"Reconciled {len(wanted)} folder(s): {len(missing)} missing, "
+            f"{len(folder_ids)} available"
+        )
+        return folder_ids
+
     def upload_file(
         self,
         drive_id: str,
         folder_name: str,
         file_name: str,
         file_bytes: bytes,
+        folder_id: Optional[str] = None,
     ) -> dict:
         """Upload a file to a folder, overwriting if it exists.
 
         Uses the simple upload API (PUT to path). Supports files up to 250 MB.
+        Pass folder_id (e.g. from reconcile_folders) to address the folder
+        by ID instead of by path.
         """
+        if folder_id:
+            path = f"/drives/{drive_id}/items/{folder_id}:/{file_name}:/content"
+        else:
+            path = f"/drives/{drive_id}/root:/{folder_name}/{file_name}:/content"
         resp = self._client.put_binary(
-            f"/drives/{drive_id}/root:/{folder_name}/{file_name}:/content",
+            path,
             data=file_bytes,
             content_type=(
                 "application/vnd.openxmlformats-officedocument"
@@ -1,5 +1,8 @@
 import logging
-from typing import List
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import requests
 
 from ..engine.models import ProcessingResult, SchoolRecord
 from .client import GraphClient
@@ -7,24 +10,45 @@ from .client import GraphClient
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class SchoolDirectoryDelta:
+    """Changes to the School Directory since a previous delta link."""
+
+    changed: Dict[str, dict] = field(default_factory=dict)  # item ID -> fields
+    removed: List[str] = field(default_factory=list)  # item IDs
+    delta_link: Optional[str] = None
+    full_resync: bool = False
+
+
 class SharePointLists:
     """Read from School Directory list, write to Processing Log list."""
 
+    # Seconds the client may reuse list ID lookups for
+    METADATA_TTL = 300.0
+    # Short, so a directory edit shows up in the next run but a run and its
+    # --share pass (or overlapping triggers) read the directory once
+    SCHOOLS_TTL = 30.0
+
     def __init__(self, client: GraphClient, site_id: str):
         self._client = client
         self._site_id = site_id
+        self._list_ids: Dict[str, str] = {}
 
     def _get_list_id(self, list_name: str) -> str:
+        if list_name in self._list_ids:
+            return self._list_ids[list_name]
         resp = self._client.get(
             f"/sites/{self._site_id}/lists",
             params={
                 "$filter": f"displayName eq '{list_name}'",
                 "$select": "id",
             },
+            ttl=self.METADATA_TTL,
         )
         lists = resp.json().get("value", [])
         if not lists:
             raise RuntimeError(f"List '{list_name}' not found in site")
+        self._list_ids[list_name] = lists[0]["id"]
         return lists[0]["id"]
 
     def get_schools(self) -> List[SchoolRecord]:
@@ -37,56 +61,85 @@ class SharePointLists:
         )
 
         while url:
-            resp = self._client.get(url)
+            resp = self._client.get(url, ttl=self.SCHOOLS_TTL)
             data = resp.json()
             items.extend(data.get("value", []))
             url = data.get("@odata.nextLink")
 
-        schools = []
-        for item in items:
-            fields = item.get("fields", {})
-            schools.append(
-                SchoolRecord(
-                    Title=fields.get("Title", ""),
-                    SchoolCode=fields.get("SchoolCode", ""),
-                    ShortName=fields.get("ShortName", ""),
-                    PrincipalName=fields.get("PrincipalName", ""),
-                    PrincipalTitle=fields.get("PrincipalTitle", ""),
-                    SchoolAddress=fields.get("SchoolAddress", ""),
-                    Suburb=fields.get("Suburb", ""),
-                    State=fields.get("State", ""),
-                    PostCode=fields.get("PostCode", ""),
-                    SchoolPhone=fields.get("SchoolPhone", ""),
-                    SchoolEmail=fields.get("SchoolEmail", ""),
-                    SchoolWebsite=fields.get("SchoolWebsite", ""),
-                    SchoolType=fields.get("SchoolType", ""),
-                    Parish=fields.get("Parish", ""),
-                    DiocesanRegion=fields.get("DiocesanRegion", ""),
-                    ABN=fields.get("ABN", ""),
-                    EstablishedYear=fields.get("EstablishedYear", ""),
-                )
-            )
+        schools = [
+            SchoolRecord.from_fields(item.get("fields", {})) for item in items
+        ]
 
         logger.info(f"Loaded {len(schools)} school(s) from School Directory")
         return schools
 
+    def get_school_changes(
+        self, delta_link: Optional[str] = None
+    ) -> SchoolDirectoryDelta:
+        """Read School Directory changes via the list items delta API.
+
+        With no delta_link (or an expired one) every item is returned and
+        full_resync is set; callers diff against their own snapshot either way.
+        Store the returned delta_link for the next call.
+        """
+        delta = SchoolDirectoryDelta(full_resync=delta_link is None)
+        if delta_link is None:
+            list_id = self._get_list_id("School Directory")
+            url = (
+                f"/sites/{self._site_id}/lists/{list_id}/items/delta"
+                f"?$expand=fields"
+            )
+        else:
+            url = delta_link
+
+        while url:
+            try:
+                resp = self._client.get(url)
+            except requests.HTTPError as e:
+                expired = e.response is not None and e.response.status_code == 410
+                if delta_link is None or not expired:
+                    raise
+                # Delta token expired: start again from a full enumeration
+                logger.warning("School Directory delta token expired, resyncing")
+                return self.get_school_changes(None)
+            data = resp.json()
+            for item in data.get("value", []):
+                if "deleted" in item or "@removed" in item:
+                    delta.removed.append(item["id"])
+                    delta.changed.pop(item["id"], None)
+                else:
+                    delta.changed[item["id"]] = item.get("fields", {})
+            url = data.get("@odata.nextLink")
+            if not url:
+                delta.delta_link = data.get("@odata.deltaLink")
+
+        logger.info(
+            f"School Directory delta: {len(delta.changed)} changed, "
+            f"{len(delta.removed)} removed"
+        )
+        return delta
+
     def write_processing_log(self, results: List[ProcessingResult]) -> None:
         """Write processing results to the 'Processing Log' list."""
-        list_id = self._get_list_id("Processing Log")
         for result in results:
-            self._client.post(
-                f"/sites/{self._site_id}/lists/{list_id}/items",
-                json={
-                    "fields": {
-                        "Title": f"{result.school_code}-{result.policy_name}",
-                        "RunId": result.run_id,
-                        "RunDate": result.run_date.isoformat(),
-                        "SchoolCode": result.school_code,
-                        "PolicyName": result.policy_name,
-                        "Status": result.status.value,
-                        "ErrorMessage": result.error_message or "",
-                        "Duration": result.duration_seconds,
-                    }
-                },
-            )
+            self.write_processing_log_entry(result)
         logger.info(f"Wrote {len(results)} entries to Processing Log")
+
+    def write_processing_log_entry(self, result: ProcessingResult) -> None:
+        """Write one processing result to the 'Processing Log' list."""
+        list_id = self._get_list_id("Processing Log")
+        self._client.post(
+            f"/sites/{self._site_id}/lists/{list_id}/items",
+            json={
+                "fields": {
+                    "Title": f"{result.school_code}-{result.policy_name}",
+                    "RunId": result.run_id,
+                    "RunDate": result.run_date.isoformat(),
+                    "SchoolCode": result.school_code,
+                    "PolicyName": result.policy_name,
+                    "Status": result.status.value,
+                    "ErrorMessage": result.error_message or "",
+                    "Duration": result.duration_seconds,
+                }
+            },
+        )
@@ -0,0 +1,318 @@
+import asyncio
+import math
+import random
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, replace
+from typing import Callable, Deque, Mapping, Optional
+
+
+@dataclass
+class RetryPolicy:
+    """Jittered exponential backoff bounded by attempts and total wait time.
+
+    total_budget caps the seconds one request may spend sleeping between
+    attempts, so a persistently throttled call fails in bounded time.
+    """
+
+    max_attempts: int = 6
+    base_delay: float = 1.0
+    max_delay: float = 60.0
+    total_budget: float = 300.0
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Delay before retry number `attempt` (0-based), using full jitter.
+
+        A server-supplied Retry-After is treated as a floor, with a little
+        jitter on top so parallel callers don't retry in lockstep.
+        """
+        ceiling = min(self.max_delay, self.base_delay * (2**attempt))
+        delay = random.uniform(0, ceiling)
+        if retry_after is not None:
+            delay = max(delay, retry_after + random.uniform(0, self.base_delay))
+        return delay
+
+    def allows(self, attempt: int, waited: float, delay: float) -> bool:
+        """Whether another attempt fits within the attempt and time budgets."""
+        return attempt + 1 < self.max_attempts and waited + delay <= self.total_budget
+
+
+@dataclass
+class HedgePolicy:
+    """When to send a second copy of a slow download.
+
+    A download still running after the given percentile of recent download
+    times (at least min_delay seconds) is requested again, and whichever
+    copy answers first is used. Hedging starts once min_samples downloads
+    have been timed, and at most max_fraction of downloads are hedged.
+    """
+
+    percentile: float = 0.95
+    min_samples: int = 20
+    min_delay: float = 0.05
+    max_fraction: float = 0.1
+    window: int = 200
+
+
+class LatencyWindow:
+    """The last `size` latencies, for percentile estimates; thread-safe."""
+
+    def __init__(self, size: int = 200):
+        self._samples: Deque[float] = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._samples)
+
+    def observe(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        """Nearest-rank percentile, or None with no samples."""
+        with self._lock:
+            ordered = sorted(self._samples)
+        if not ordered:
+            return None
+        rank = max(1, math.ceil(fraction * len(ordered)))
+        return ordered[rank - 1]
+
+
+@dataclass
+class ThrottleStats:
+    """Counters for tuning the rate controller."""
+
+    requests: int = 0
+    throttled: int = 0  # 429 responses
+    unavailable: int = 0  # 503 responses
+    server_errors: int = 0  # other 5xx responses
+    connection_errors: int = 0
+    timeouts: int = 0
+    retries: int = 0
+    hedges: int = 0
+    gave_up: int = 0
+    decreases: int = 0
+    rate_limit_pauses: int = 0
+    wait_seconds: float = 0.0
+    concurrency_limit: float = 0.0
+    rate_limit: float = 0.0
+
+
+class RateController:
+    """AIMD rate and concurrency controller shared by all Graph calls.
+
+    Every request takes a concurrency slot and a token from a token bucket.
+    Successful responses grow both limits additively; 429/503 responses
+    shrink them multiplicatively (at most once per cooldown window, so a
+    burst of throttled in-flight calls counts as one congestion signal).
+    Retry-After and Graph's RateLimit-* headers pause admission for everyone.
+
+    Thread-safe; use acquire_async() from asyncio code.
+    """
+
+    THROTTLE_STATUSES = (429, 503)
+    # Graph emits RateLimit-* headers once 80% of the quota is used; start
+    # slowing down when less than this fraction remains.
+    LOW_REMAINING_FRACTION = 0.1
+
+    def __init__(
+        self,
+        initial_concurrency: float = 4,
+        min_concurrency: float = 1,
+        max_concurrency: float = 16,
+        initial_rate: float = 10.0,
+        min_rate: float = 0.5,
+        max_rate: float = 50.0,
+        decrease_factor: float = 0.5,
+        cooldown: float = 1.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._lock = threading.Lock()
+        self._released = threading.Condition(self._lock)
+        self._clock = clock
+
+        self._concurrency = float(initial_concurrency)
+        self._min_concurrency = float(min_concurrency)
+        self._max_concurrency = float(max_concurrency)
+        self._rate = float(initial_rate)
+        self._min_rate = float(min_rate)
+        self._max_rate = float(max_rate)
+        self._decrease_factor = decrease_factor
+        self._cooldown = cooldown
+
+        self._in_flight = 0
+        self._tokens = 1.0
+        self._last_refill = clock()
+        self._paused_until = 0.0
+        self._last_decrease = float("-inf")
+        self._stats = ThrottleStats()
+
+    # -- admission --------------------------------------------------------
+
+    def _try_acquire(self) -> Optional[float]:
+        """Take a slot and token if possible. Returns 0 on success, seconds
+        to wait if rate-limited, or None if waiting on a concurrency slot.
+        Caller must hold the lock."""
+        now = self._clock()
+        if now < self._paused_until:
+            return self._paused_until - now
+
+        if self._in_flight >= max(1, int(self._concurrency)):
+            return None
+
+        elapsed = now - self._last_refill
+        self._last_refill = now
+        self._tokens = min(max(1.0, self._rate), self._tokens + elapsed * self._rate)
+        if self._tokens < 1.0:
+            return (1.0 - self._tokens) / self._rate
+
+        self._tokens -= 1.0
+        self._in_flight += 1
+        self._stats.requests += 1
+        return 0.0
+
+    def acquire(self) -> None:
+        """Block until a request may be sent."""
+        with self._lock:
+            while True:
+                wait = self._try_acquire()
+                if wait == 0.0:
+                    return
+                self._released.wait(timeout=wait)
+
+    async def acquire_async(self) -> None:
+        """Asyncio equivalent of acquire(); never blocks the event loop."""
+        while True:
+            with self._lock:
+                wait = self._try_acquire()
+            if wait == 0.0:
+                return
+            await asyncio.sleep(wait if wait is not None else 0.01)
+
+    def has_capacity(self) -> bool:
+        """Whether a request could start now without waiting.
+
+        For optional extra requests (hedges), which are skipped rather than
+        queued when the limits are already in use.
+        """
+        with self._lock:
+            now = self._clock()
+            tokens = self._tokens + (now - self._last_refill) * self._rate
+            return (
+                now >= self._paused_until
+                and self._in_flight < max(1, int(self._concurrency))
+                and tokens >= 1.0
+            )
+
+    def release(self) -> None:
+        with self._lock:
+            self._in_flight = max(0, self._in_flight - 1)
+            self._released.notify()
+
+    # -- feedback ---------------------------------------------------------
+
+    def on_response(self, status_code: int, headers: Mapping[str, str]) -> None:
+        """Adjust limits from a response's status and rate-limit headers."""
+        with self._lock:
+            now = self._clock()
+            if status_code in self.THROTTLE_STATUSES:
+                if status_code == 429:
+                    self._stats.throttled += 1
+                else:
+                    self._stats.unavailable += 1
+                self._decrease(now)
+                retry_after = parse_retry_after(headers)
+                if retry_after:
+                    self._pause(now + retry_after)
+            elif status_code >= 500:
+                # Not a throttle, so no decrease, but no reward either
+                self._stats.server_errors += 1
+            else:
+                self._increase()
+
+            self._apply_rate_limit_headers(now, headers)
+            self._released.notify_all()
+
+    def on_connection_error(self, timeout: bool) -> None:
+        with self._lock:
+            if timeout:
+                self._stats.timeouts += 1
+            else:
+                self._stats.connection_errors += 1
+
+    def record_retry(self, delay: float) -> None:
+        with self._lock:
+            self._stats.retries += 1
+            self._stats.wait_seconds += delay
+
+    def record_hedge(self) -> None:
+        with self._lock:
+            self._stats.hedges += 1
+
+    def record_give_up(self) -> None:
+        with self._lock:
+            self._stats.gave_up += 1
+
+    def stats(self) -> ThrottleStats:
+        """Snapshot of the counters and current limits."""
+        with self._lock:
+            return replace(
+                self._stats,
+                concurrency_limit=round(self._concurrency, 2),
+                rate_limit=round(self._rate, 2),
+            )
+
+    def _increase(self) -> None:
+        # +1 per "window" of successes, as in TCP congestion avoidance
+        self._concurrency = min(
+            self._max_concurrency, self._concurrency + 1.0 / self._concurrency
+        )
+        self._rate = min(self._max_rate, self._rate + 1.0 / self._rate)
+
+    def _decrease(self, now: float) -> None:
+        if now - self._last_decrease < self._cooldown:
+            return
+        self._last_decrease = now
+        self._stats.decreases += 1
+        self._concurrency = max(
+            self._min_concurrency, self._concurrency * self._decrease_factor
+        )
+        self._rate = max(self._min_rate, self._rate * self._decrease_factor)
+        self._tokens = min(self._tokens, 0.0)
+
+    def _pause(self, until: float) -> None:
+        if until > self._paused_until:
+            self._paused_until = until
+            self._stats.rate_limit_pauses += 1
+
+    def _apply_rate_limit_headers(self, now: float, headers: Mapping[str, str]) -> None:
+        remaining = _header_number(headers, "RateLimit-Remaining")
+        reset = _header_number(headers, "RateLimit-Reset")
+        if remaining is None or reset is None:
+            return
+        limit = _header_number(headers, "RateLimit-Limit")
+        if remaining <= 0:
+            self._pause(now + reset)
+            return
+        if limit and remaining / limit > self.LOW_REMAINING_FRACTION:
+            return
+        # Spread what's left of the quota over the rest of the window
+        if reset > 0:
+            self._rate = max(self._min_rate, min(self._rate, remaining / reset))
+
+
+def parse_retry_after(headers: Mapping[str, str]) -> Optional[float]:
+    """Retry-After in seconds, or None if absent or not a number."""
+    return _header_number(headers, "Retry-After")
+
+
+def _header_number(headers: Mapping[str, str], name: str) -> Optional[float]:
+    value = headers.get(name)
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
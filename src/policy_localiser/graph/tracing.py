@@ -0,0 +1,150 @@
+"""Per-call tracing of Graph HTTP requests.
+
+Every GraphClient request is recorded as a CallTrace: the endpoint with
+its IDs replaced by placeholders, the final status, the time the caller
+waited (retries and backoff included), bytes each way, the number of
+retries and Graph's request-id. A CallTracer aggregates the traces per
+endpoint, logs calls slower than a threshold and prints a summary table.
+"""
+
+import logging
+import re
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, List, Tuple
+from urllib.parse import urlsplit
+
+from ..metrics import GRAPH_LATENCY
+from .throttle import LatencyWindow
+
+logger = logging.getLogger(__name__)
+
+# Drive-item paths (root:/School/Policy.docx:/content) name files
+_ITEM_PATH = re.compile(r":/[^:]+(:|$)")
+# The segment after a collection name is an ID: /drives/b!x -> /drives/{drive},
+# unless it is a Graph keyword (/items/delta, /items/root:, /sites/root)
+_KEYWORDS = ("delta", "root", "children", "content", "createLink", "permissions")
+_ID_SEGMENT = re.compile(
+    r"/(sites|drives|items|lists|permissions)/"
+    rf"(?!(?:{'|'.join(_KEYWORDS)})(?:[/:(]|$))[^/:]+"
+)
+_API_VERSION = re.compile(r"^/(v1\.0|beta)(?=/)")
+
+
+def endpoint_template(path: str) -> str:
+    """The endpoint of a Graph path or URL with IDs and names normalised.
+
+    e.g. /drives/b!x/items/01AB:/Policy.docx:/content becomes
+    /drives/{drive}/items/{item}:/{path}:/content. The query is dropped.
+    """
+    path = _API_VERSION.sub("", urlsplit(path).path)
+    path = _ITEM_PATH.sub(r":/{path}\1", path)
+    return _ID_SEGMENT.sub(lambda m: f"/{m.group(1)}/{{{m.group(1)[:-1]}}}", path)
+
+
+@dataclass
+class CallTrace:
+    """One GraphClient request, from the first attempt to the last."""
+
+    method: str
+    endpoint: str
+    status: int = 0  # of the last attempt; 0 = connection error
+    seconds: float = 0.0
+    bytes_sent: int = 0
+    bytes_received: int = 0
+    retries: int = 0
+    request_id: str = ""  # Graph's request-id for the last attempt
+    client_request_id: str = ""  # sent with every attempt
+
+    @property
+    def failed(self) -> bool:
+        return not 200 <= self.status < 400
+
+    def describe(self) -> str:
+        return (
+            f"{self.method} {self.endpoint} -> {self.status or 'no response'} "
+            f"in {self.seconds:.2f}s ({self.retries} retries, "
+            f"{self.bytes_sent}B out, {self.bytes_received}B in, "
+            f"request-id {self.request_id or '-'}, "
+            f"client-request-id {self.client_request_id})"
+        )
+
+
+@dataclass
+class EndpointStats:
+    """Totals for one method and endpoint template."""
+
+    calls: int = 0
+    failed: int = 0
+    retries: int = 0
+    slow: int = 0
+    seconds: float = 0.0
+    max_seconds: float = 0.0
+    bytes_sent: int = 0
+    bytes_received: int = 0
+    latencies: LatencyWindow = field(default_factory=lambda: LatencyWindow(500))
+
+
+class CallTracer:
+    """Aggregates CallTraces per endpoint; thread-safe.
+
+    Latencies also go to the policy_graph_request_seconds histogram,
+    labelled by method and endpoint. Calls taking at least slow_seconds
+    are logged with their request IDs (quote them to Microsoft support)
+    and the last keep_slow of them are kept in slow_calls.
+    """
+
+    def __init__(self, slow_seconds: float = 2.0, keep_slow: int = 50):
+        self.slow_seconds = slow_seconds
+        self.slow_calls: Deque[CallTrace] = deque(maxlen=keep_slow)
+        self._endpoints: Dict[Tuple[str, str], EndpointStats] = {}
+        self._lock = threading.Lock()
+
+    def record(self, trace: CallTrace) -> None:
+        slow = self.slow_seconds > 0 and trace.seconds >= self.slow_seconds
+        with self._lock:
+            stats = self._endpoints.setdefault(
+                (trace.method, trace.endpoint), EndpointStats()
+            )
+            stats.calls += 1
+            stats.failed += trace.failed
+            stats.retries += trace.retries
+            stats.slow += slow
+            stats.seconds += trace.seconds
+            stats.max_seconds = max(stats.max_seconds, trace.seconds)
+            stats.bytes_sent += trace.bytes_sent
+            stats.bytes_received += trace.bytes_received
+            if slow:
+                self.slow_calls.append(trace)
+        stats.latencies.observe(trace.seconds)
+        GRAPH_LATENCY.observe(trace.seconds, method=trace.method, endpoint=trace.endpoint)
+        if slow:
+            logger.warning(f"Slow Graph call: {trace.describe()}")
+
+    def endpoints(self) -> Dict[Tuple[str, str], EndpointStats]:
+        """{(method, endpoint): stats}, most total time first."""
+        with self._lock:
+            items = list(self._endpoints.items())
+        return dict(sorted(items, key=lambda kv: kv[1].seconds, reverse=True))
+
+    def summary_lines(self) -> List[str]:
+        """A table of calls and latencies per endpoint, for the end of a run."""
+        endpoints = self.endpoints()
+        if not endpoints:
+            return ["Graph calls: none"]
+        width = max(len(f"{m} {e}") for m, e in endpoints)
+        lines = [
+            f"{'Endpoint':<{width}} {'Calls':>6} {'Fail':>5} {'Retry':>5} "
+            f"{'Slow':>5} {'p50':>7} {'p95':>7} {'Max':>7} {'Total':>8} {'KB in':>8}",
+        ]
+        for (method, endpoint), s in endpoints.items():
+            p50 = s.latencies.percentile(0.5) or 0.0
+            p95 = s.latencies.percentile(0.95) or 0.0
+            lines.append(
+                f"{method + ' ' + endpoint:<{width}} {s.calls:>6} {s.failed:>5} "
+                f"{s.retries:>5} {s.slow:>5} {p50:>6.2f}s {p95:>6.2f}s "
+                f"{s.max_seconds:>6.2f}s {s.seconds:>7.1f}s "
+                f"{s.bytes_received / 1024:>8.0f}"
+            )
+        return lines
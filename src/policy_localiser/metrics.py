@@ -0,0 +1,270 @@
+"""Process-wide metrics in the Prometheus text exposition format.
+
+Counters, gauges and histograms are updated by the renderer, the pipelines
+and the Graph client, and read out by GET /api/metrics or written to a
+file by the CLI runners (--metrics-file), e.g. for node_exporter's textfile
+collector. Values are cumulative for the life of the process, so a warm
+Function host reports totals across invocations, as Prometheus expects.
+
+Stdlib only; every metric is thread-safe.
+"""
+
+import math
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Seconds; spans a fast cache copy to a stalled upload
+DEFAULT_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if value == int(value):
+        return str(int(value))
+    return repr(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, description: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.description = description
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if set(labels) != set(self.label_names):
+            raise ValueError(
+                f"{self.name} takes labels {list(self.label_names)}, got {sorted(labels)}"
+            )
+        return tuple(str(labels[n]) for n in self.label_names)
+
+    def samples(self) -> List[Tuple[str, str, float]]:
+        """(name suffix, formatted labels, value) for every series."""
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.description}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        for suffix, labels, value in self.samples():
+            lines.append(f"{self.name}{suffix}{labels} {_format_value(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    """A value that only goes up."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, description: str, labels: Sequence[str] = ()):
+        super().__init__(name, description, labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        if amount < 0:
+            raise ValueError("Counters cannot decrease")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> List[Tuple[str, str, float]]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [("", _format_labels(self.label_names, k), v) for k, v in items]
+
+
+class Gauge(Counter):
+    """A value that goes up and down (queue depth, workers busy)."""
+
+    kind = "gauge"
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    """Observations counted into cumulative le buckets, with sum and count."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, description, labels)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # label values -> (per-bucket counts, sum)
+        self._series: Dict[Tuple[str, ...], Tuple[List[int], float]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            counts, total = self._series.get(key) or ([0] * len(self.buckets), 0.0)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            self._series[key] = (counts, total + value)
+
+    def count(self, **labels: str) -> int:
+        with self._lock:
+            series = self._series.get(self._key(labels))
+        return sum(series[0]) if series else 0
+
+    def samples(self) -> List[Tuple[str, str, float]]:
+        with self._lock:
+            items = sorted((k, (list(c), s)) for k, (c, s) in self._series.items())
+        samples = []
+        names = self.label_names + ("le",)
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets, counts):
+                cumulative += n
+                le = _format_value(bound)
+                samples.append(("_bucket", _format_labels(names, key + (le,)), cumulative))
+            labels = _format_labels(self.label_names, key)
+            samples.append(("_sum", labels, round(total, 6)))
+            samples.append(("_count", labels, cumulative))
+        return samples
+
+
+class MetricsRegistry:
+    """Named metrics, rendered together as one exposition."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} is already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(
+        self, name: str, description: str, labels: Sequence[str] = ()
+    ) -> Counter:
+        return self._register(Counter(name, description, labels))
+
+    def gauge(
+        self, name: str, description: str, labels: Sequence[str] = ()
+    ) -> Gauge:
+        return self._register(Gauge(name, description, labels))
+
+    def histogram(
+        self,
+        name: str,
+        description: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, description, labels, buckets))
+
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda m: m.name)
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: Path) -> None:
+        """Write the exposition atomically, as textfile collectors require."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        tmp.write_text(self.render(), encoding="utf-8")
+        tmp.replace(path)
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+REGISTRY = MetricsRegistry()
+
+DOCUMENTS = REGISTRY.counter(
+    "policy_documents_total", "Documents finished, by status", ["status"]
+)
+STAGE_SECONDS = REGISTRY.histogram(
+    "policy_stage_seconds",
+    "Seconds per document stage: render, save, download, upload",
+    ["stage"],
+)
+QUEUE_DEPTH = REGISTRY.gauge(
+    "policy_queue_depth", "Documents waiting to start in running pipelines"
+)
+ACTIVE_WORKERS = REGISTRY.gauge(
+    "policy_active_workers", "Documents being processed right now"
+)
+GRAPH_REQUESTS = REGISTRY.counter(
+    "policy_graph_requests_total",
+    "Graph HTTP responses, by method and status (0 = connection error)",
+    ["method", "status"],
+)
+GRAPH_BYTES = REGISTRY.counter(
+    "policy_graph_bytes_total",
+    "Bytes sent to (out) and received from (in) Graph",
+    ["direction"],
+)
+GRAPH_LATENCY = REGISTRY.histogram(
+    "policy_graph_request_seconds",
+    "Seconds per Graph call, retries included, by method and endpoint template",
+    ["method", "endpoint"],
+)
+GRAPH_RETRIES = REGISTRY.counter(
+    "policy_graph_retries_total", "Graph requests retried after a backoff"
+)
+GRAPH_CACHE = REGISTRY.counter(
+    "policy_graph_cache_total",
+    "Graph GETs answered from the response cache (hit), sent for it (miss) "
+    "or joined to an identical call in flight (coalesced)",
+    ["result"],
+)
+GRAPH_HEDGES = REGISTRY.counter(
+    "policy_graph_hedges_total",
+    "Second copies of slow downloads: won or lost the race, or failed when "
+    "neither copy succeeded",
+    ["result"],
+)
+GRAPH_THROTTLES = REGISTRY.counter(
+    "policy_graph_throttles_total",
+    "Graph 429/503 responses, including batched sub-requests",
+)
@@ -0,0 +1,125 @@
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+
+from ..graph.sharepoint_files import SharePointFiles
+
+logger = logging.getLogger(__name__)
+
+
+def item_version(item: dict) -> str:
+    """Content version of a driveItem: its quickXorHash, else cTag/eTag."""
+    return (
+        item.get("file", {}).get("hashes", {}).get("quickXorHash")
+        or item.get("cTag")
+        or item.get("eTag")
+        or ""
+    )
+
+
+class AssetCache:
+    """Keeps downloaded templates and logos on local disk between runs.
+
+    A warm worker that processes many shards downloads each template and
+    logo once; later runs copy the cached file unless the item's version
+    changed in SharePoint. Items with the same content hash (e.g. the same
+    template in several sites' libraries) are downloaded once, even when
+    requested concurrently. Safe to share between threads.
+
+    Each version of an item gets its own file, downloaded under a temporary
+    name and renamed into place, so a reader never sees a partial file and
+    a file it was handed never changes underneath it.
+    """
+
+    def __init__(self, root: Optional[Path] = None):
+        self._root = Path(root) if root else Path(
+            tempfile.mkdtemp(prefix="policy_loc_cache_")
+        )
+        self._root.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        # item version key -> cache file name holding that version
+        self._files: Dict[str, str] = {}
+        # quickXorHash -> cache file name holding that content
+        self._contents: Dict[str, str] = {}
+        # quickXorHash -> set when the download in progress finishes
+        self._downloading: Dict[str, threading.Event] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def fetch(
+        self,
+        sp_files: SharePointFiles,
+        drive_id: str,
+        item: dict,
+        local_path: Path,
+    ) -> None:
+        """Place the item's content at local_path, downloading only if stale."""
+        cached = self.cached_path(sp_files, drive_id, item)
+        local_path.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(cached, local_path)
+
+    def cached_path(self, sp_files: SharePointFiles, drive_id: str, item: dict) -> Path:
+        """The cache's own file for the item's current version.
+
+        Read it, don't change it. Items with no version are downloaded
+        again on every call.
+        """
+        version = item_version(item)
+        key = hashlib.sha256(f"{drive_id}/{item['id']}/{version}".encode()).hexdigest()
+        content = item.get("file", {}).get("hashes", {}).get("quickXorHash")
+
+        while True:
+            name = None
+            waiting = None
+            with self._lock:
+                if version:
+                    name = self._files.get(key)
+                if name is None and content:
+                    name = self._contents.get(content)
+                    if name is not None:
+                        self._files[key] = name
+                    elif content in self._downloading:
+                        waiting = self._downloading[content]
+                    else:
+                        self._downloading[content] = threading.Event()
+                if waiting is None:
+                    if name is not None:
+                        self.hits += 1
+                    else:
+                        self.misses += 1
+            if waiting is None:
+                break
+            # Another thread is downloading the same content; use its copy
+            waiting.wait()
+
+        if name is not None:
+            return self._root / name
+        try:
+            self._download(sp_files, drive_id, item, self._root / key)
+            with self._lock:
+                self._files[key] = key
+                if content:
+                    self._contents[content] = key
+        finally:
+            if content:
+                with self._lock:
+                    self._downloading.pop(content).set()
+        logger.debug(f"Cached {item['name']} ({version})")
+        return self._root / key
+
+    def _download(
+        self, sp_files: SharePointFiles, drive_id: str, item: dict, target: Path
+    ) -> None:
+        fd, partial = tempfile.mkstemp(dir=self._root, prefix=".partial-")
+        os.close(fd)
+        try:
+            sp_files.download_file(drive_id, item["id"], Path(partial))
+            os.replace(partial, target)
+        except BaseException:
+            Path(partial).unlink(missing_ok=True)
+            raise
@@ -0,0 +1,170 @@
+"""Durable per-run checkpoints so interrupted SharePoint runs can resume.
+
+Each run appends to `<checkpoint_dir>/<run_id>.jsonl`: a header line with
+the run's filters, then one line per finished (school, template) pair as
+soon as it is done. A run narrowed to specific pairs (e.g. an incremental
+run) also records them, so a resume covers those pairs and no others.
+Lines are flushed immediately, so a host recycle loses at most the pair
+in flight, and that pair's re-upload is skipped by hash.
+"""
+
+import json
+import logging
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+from ..engine.models import ProcessingResult, ProcessingStatus
+
+logger = logging.getLogger(__name__)
+
+
+def result_to_dict(result: ProcessingResult) -> dict:
+    return {
+        "run_id": result.run_id,
+        "run_date": result.run_date.isoformat(),
+        "school_code": result.school_code,
+        "policy_name": result.policy_name,
+        "status": result.status.value,
+        "error_message": result.error_message,
+        "duration_seconds": result.duration_seconds,
+        "timings": result.timings,
+        "template_hash": result.template_hash,
+        "logo_hash": result.logo_hash,
+        "school_hash": result.school_hash,
+        "output_hash": result.output_hash,
+    }
+
+
+def result_from_dict(data: dict) -> ProcessingResult:
+    return ProcessingResult(
+        run_id=data["run_id"],
+        run_date=datetime.fromisoformat(data["run_date"]),
+        school_code=data["school_code"],
+        policy_name=data["policy_name"],
+        status=ProcessingStatus(data["status"]),
+        error_message=data.get("error_message"),
+        duration_seconds=data.get("duration_seconds", 0.0),
+        timings=data.get("timings", {}),
+        template_hash=data.get("template_hash", ""),
+        logo_hash=data.get("logo_hash", ""),
+        school_hash=data.get("school_hash", ""),
+        output_hash=data.get("output_hash", ""),
+    )
+
+
+class RunCheckpoint:
+    """Append-only record of the pairs a run has finished."""
+
+    def __init__(self, path: Path, run_id: str):
+        self.path = path
+        self.run_id = run_id
+        self.school_filter: Optional[List[str]] = None
+        self.template_filter: Optional[List[str]] = None
+        # (school_code, policy_name) pairs the run is limited to, if any
+        self.pairs: Optional[Set[Tuple[str, str]]] = None
+        # (school_code, policy_name) -> latest result for that pair
+        self._results: Dict[Tuple[str, str], ProcessingResult] = {}
+        self._file = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def create(
+        cls,
+        checkpoint_dir: Path,
+        run_id: str,
+        school_filter: Optional[List[str]] = None,
+        template_filter: Optional[List[str]] = None,
+    ) -> "RunCheckpoint":
+        checkpoint = cls(Path(checkpoint_dir) / f"{run_id}.jsonl", run_id)
+        checkpoint.school_filter = school_filter
+        checkpoint.template_filter = template_filter
+        checkpoint.path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            # Never add a second header to an existing run's checkpoint
+            checkpoint._file = open(checkpoint.path, "x", encoding="utf-8")
+        except FileExistsError:
+            raise RuntimeError(
+                f"Checkpoint for run {run_id} already exists; resume it instead"
+            ) from None
+        checkpoint._append({
+            "run_id": run_id,
+            "started": datetime.now().isoformat(),
+            "school_filter": school_filter,
+            "template_filter": template_filter,
+        })
+        return checkpoint
+
+    @staticmethod
+    def exists(checkpoint_dir: Path, run_id: str) -> bool:
+        return (Path(checkpoint_dir) / f"{run_id}.jsonl").exists()
+
+    @classmethod
+    def load(cls, checkpoint_dir: Path, run_id: str) -> "RunCheckpoint":
+        path = Path(checkpoint_dir) / f"{run_id}.jsonl"
+        if not path.exists():
+            raise RuntimeError(f"No checkpoint found for run {run_id} in {checkpoint_dir}")
+
+        checkpoint = cls(path, run_id)
+        text = path.read_text(encoding="utf-8")
+        if text and not text.endswith("\n"):
+            # Terminate a torn final line so new records start cleanly
+            with open(path, "a", encoding="utf-8") as f:
+                f.write("\n")
+        for number, line in enumerate(text.splitlines()):
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # A torn final line from a crash mid-write; that pair is redone
+                logger.warning(f"Ignoring unreadable checkpoint line {number + 1}")
+                continue
+            if number == 0:
+                checkpoint.school_filter = record.get("school_filter")
+                checkpoint.template_filter = record.get("template_filter")
+                continue
+            if "pairs" in record:
+                checkpoint.pairs = {tuple(pair) for pair in record["pairs"]}
+                continue
+            if "school_code" not in record:
+                logger.warning(f"Ignoring checkpoint line {number + 1}: not a result")
+                continue
+            result = result_from_dict(record)
+            checkpoint._results[(result.school_code, result.policy_name)] = result
+
+        done = len(checkpoint.completed_pairs())
+        logger.info(f"Resuming run {run_id}: {done} document(s) already finished")
+        return checkpoint
+
+    def completed_pairs(self) -> Set[Tuple[str, str]]:
+        """Pairs that need no more work; failed pairs are retried on resume."""
+        return {
+            pair for pair, result in self._results.items()
+            if result.status != ProcessingStatus.ERROR
+        }
+
+    def completed_results(self) -> List[ProcessingResult]:
+        completed = self.completed_pairs()
+        return [r for pair, r in self._results.items() if pair in completed]
+
+    def record_pairs(self, pairs: Set[Tuple[str, str]]) -> None:
+        """Limit the run, and any resume of it, to these pairs."""
+        with self._lock:
+            self.pairs = set(pairs)
+            self._append({"pairs": sorted(list(pair) for pair in self.pairs)})
+
+    def record(self, result: ProcessingResult) -> None:
+        with self._lock:
+            self._results[(result.school_code, result.policy_name)] = result
+            self._append(result_to_dict(result))
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _append(self, record: dict) -> None:
+        if self._file is None:
+            self._file = open(self.path, "a", encoding="utf-8")
+        self._file.write(json.dumps(record) + "\n")
+        self._file.flush()
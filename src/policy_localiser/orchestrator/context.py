@@ -0,0 +1,204 @@
+"""Process-wide state reused across Function invocations on a warm host.
+
+Building a GraphClient per request throws away the MSAL token cache, the
+HTTP keep-alive connections, the drive and list ID caches and the
+template/logo cache. The context keeps them for as long as the process
+lives; every invocation still gets its own SharePointPipeline, since a
+pipeline holds the state of one run. The context is rebuilt when the
+configuration (as read from the environment) changes.
+
+Run state (checkpoints, run records, the history) must be on a file share
+that every instance mounts; the context refuses relative paths, which
+would resolve to the read-only, per-instance app directory.
+"""
+
+import dataclasses
+import hashlib
+import json
+import logging
+import threading
+import uuid
+from pathlib import Path
+from typing import Callable, Optional
+
+from ..config import Config
+from ..graph.auth import GraphAuth
+from ..graph.client import GraphClient
+from ..graph.sharepoint_files import SharePointFiles
+from ..graph.sharepoint_lists import SharePointLists
+from .asset_cache import AssetCache
+from .checkpoint import RunCheckpoint
+from .deadline import Deadline
+from .history import RunHistory
+from .preview import PreviewService
+from .run_status import QUEUED, RUNNING, RunStatus, RunStatusStore, RunTracker
+from .sharepoint_pipeline import SharePointPipeline
+
+logger = logging.getLogger(__name__)
+
+
+def config_fingerprint(config: Config) -> str:
+    """Digest of every setting, so any change is noticed (secrets included)."""
+    data = json.dumps(dataclasses.asdict(config), sort_keys=True, default=str)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+class AppContext:
+    """Graph client, caches and run history for one configuration."""
+
+    def __init__(
+        self,
+        config: Config,
+        auth=None,
+        base_url: str = GraphClient.BASE_URL,
+    ):
+        config.check_shared_storage()
+        self.config = config
+        self.fingerprint = config_fingerprint(config)
+        if auth is None:
+            auth = GraphAuth(config.tenant_id, config.client_id, config.client_secret)
+        # Logo fetches, uploads and log writes each run on upload_workers
+        uploads = config.upload_workers or config.pipeline_workers
+        self.client = GraphClient(
+            auth,
+            base_url=base_url,
+            pool_size=3 * uploads + 4,
+            **config.graph_options(),
+        )
+        self.sp_lists = SharePointLists(self.client, config.sharepoint_site_id)
+        self.sp_files = SharePointFiles(self.client, config.sharepoint_site_id)
+        self.asset_cache = AssetCache()
+        self.preview = PreviewService(self.sp_lists, self.sp_files, self.asset_cache)
+        self._history: Optional[RunHistory] = None
+        self._history_lock = threading.Lock()
+
+    @property
+    def history(self) -> RunHistory:
+        """The run history, opened by the first run (previews never need it)."""
+        with self._history_lock:
+            if self._history is None:
+                # On an Azure Files (SMB) mount, so no WAL
+                self._history = RunHistory(self.config.history_db_path, wal=False)
+            return self._history
+
+    def pipeline(self, checkpoints: bool = True) -> SharePointPipeline:
+        """A pipeline for one run, sharing this context's client and caches."""
+        return SharePointPipeline(
+            self.sp_lists,
+            self.sp_files,
+            checkpoint_dir=self.config.checkpoint_dir if checkpoints else None,
+            asset_cache=self.asset_cache,
+            history=self.history,
+            workers=self.config.pipeline_workers,
+            scheduling=self.config.scheduling,
+            upload_workers=self.config.upload_workers,
+        )
+
+    @property
+    def status_store(self) -> RunStatusStore:
+        return RunStatusStore(self.config.run_record_dir)
+
+    def submit_run(self, request: dict, stale_after: Optional[float] = None) -> str:
+        """Record a run request as queued and return its run ID.
+
+        request is the POST /api/localise body; a "resume" run keeps its
+        original ID. Raises RuntimeError if that run is still queued or
+        running, ValueError for a malformed run ID. A queued or running
+        run whose status has not changed for stale_after seconds (the
+        function timeout and a margin) is taken to be dead and resumed.
+        """
+        run_id = request.get("resume") or str(uuid.uuid4())[:8]
+        if not isinstance(run_id, str) or Path(run_id).name != run_id:
+            raise ValueError(f"Invalid run ID '{run_id}'")
+        store = self.status_store
+        existing = store.load(run_id)
+        if existing is not None and existing.state in (QUEUED, RUNNING):
+            if stale_after is None or not existing.is_stale(stale_after):
+                raise RuntimeError(f"Run {run_id} is already {existing.state}")
+            logger.warning(
+                f"Run {run_id} was {existing.state} but its status has not "
+                f"changed since {existing.updated}; resuming it"
+            )
+        tracker = RunTracker(store, run_id)
+        tracker.submit(request)
+        return run_id
+
+    def execute_run(
+        self,
+        run_id: str,
+        request: dict,
+        deadline: Optional[Deadline] = None,
+    ) -> RunStatus:
+        """Run a submitted request, keeping its status current.
+
+        A failed run is recorded in its status rather than raised, so a
+        queue does not redeliver it; it can be resumed instead. A run that
+        already has a checkpoint (a redelivered message) is resumed.
+        """
+        tracker = RunTracker(self.status_store, run_id, request)
+        tracker.start()
+        pipeline = self.pipeline()
+        resume = request.get("resume")
+        if not resume and RunCheckpoint.exists(self.config.checkpoint_dir, run_id):
+            logger.warning(f"Run {run_id} already has a checkpoint; resuming it")
+            resume = run_id
+        try:
+            if request.get("incremental") and not resume:
+                pipeline.run_incremental(
+                    self.config.delta_state_path,
+                    template_filter=request.get("templates"),
+                    deadline=deadline,
+                    run_id=run_id,
+                    tracker=tracker,
+                )
+            else:
+                pipeline.run(
+                    school_filter=request.get("schools"),
+                    template_filter=request.get("templates"),
+                    resume=resume,
+                    run_id=run_id,
+                    deadline=deadline,
+                    tracker=tracker,
+                )
+        except Exception as e:
+            logger.exception(f"Run {run_id} failed")
+            tracker.fail(str(e))
+        else:
+            tracker.finish(len(pipeline.deferred), pipeline.continuation)
+        # The client, and so its tracer, lives as long as the host
+        logger.info(
+            "Graph calls since the host started:\n"
+            + "\n".join(self.client.tracer.summary_lines())
+        )
+        return tracker.status
+
+
+_lock = threading.Lock()
+_context: Optional[AppContext] = None
+
+
+def get_context(
+    config: Optional[Config] = None,
+    factory: Callable[[Config], AppContext] = AppContext,
+) -> AppContext:
+    """The shared context for the current configuration, built on first use.
+
+    Thread-safe. A context whose configuration no longer matches is
+    replaced, not closed: invocations still running keep using it.
+    """
+    global _context
+    config = config or Config.from_env()
+    fingerprint = config_fingerprint(config)
+    with _lock:
+        if _context is None or _context.fingerprint != fingerprint:
+            if _context is not None:
+                logger.info("Configuration changed; rebuilding the shared context")
+            _context = factory(config)
+        return _context
+
+
+def reset_context() -> None:
+    """Forget the shared context (the next get_context() builds a new one)."""
+    global _context
+    with _lock:
+        _context = None
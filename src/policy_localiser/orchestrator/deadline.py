@@ -0,0 +1,96 @@
+"""Wall-clock budgets for runs that must finish before a host time limit.
+
+A pipeline given a Deadline checks each document's estimated time against
+the remaining budget before starting it; work already started is always
+finished (render, upload, checkpoint, log entry). Documents that no longer
+fit are left for a resumed run.
+"""
+
+import json
+import logging
+import time
+from pathlib import Path
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Azure Functions defaults when host.json sets no functionTimeout
+# (Consumption plan; Premium and Dedicated default to 30 minutes)
+DEFAULT_FUNCTION_TIMEOUT = 5 * 60
+
+# HTTP-triggered functions must respond within this, whatever the timeout
+HTTP_RESPONSE_LIMIT = 230
+
+# Kept back for finishing the run (history, cleanup, response)
+DEFAULT_MARGIN = 20.0
+
+
+def parse_timespan(value: str) -> Optional[float]:
+    """Seconds in an "hh:mm:ss" (or "d.hh:mm:ss") timespan; None for "-1"."""
+    value = value.strip()
+    if value == "-1":
+        return None
+    days = 0
+    if "." in value.split(":")[0]:
+        day_part, value = value.split(".", 1)
+        days = int(day_part)
+    hours, minutes, seconds = value.split(":")
+    return days * 86400 + int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+
+def function_timeout(host_json: Path) -> Optional[float]:
+    """The functionTimeout configured in host.json, in seconds.
+
+    None means unbounded ("-1"); a missing file or setting gives the
+    Consumption plan default.
+    """
+    try:
+        host = json.loads(Path(host_json).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        logger.warning(f"Could not read {host_json}; assuming default timeout")
+        return DEFAULT_FUNCTION_TIMEOUT
+    value = host.get("functionTimeout")
+    if value is None:
+        return DEFAULT_FUNCTION_TIMEOUT
+    return parse_timespan(value)
+
+
+class Deadline:
+    """A point in (monotonic) time by which a run must have stopped."""
+
+    def __init__(
+        self, seconds: float, clock: Callable[[], float] = time.monotonic
+    ):
+        self._clock = clock
+        self.seconds = seconds
+        self._expires = clock() + seconds
+
+    @classmethod
+    def from_host_json(
+        cls,
+        host_json: Path,
+        margin: float = DEFAULT_MARGIN,
+        limit: Optional[float] = None,
+    ) -> Optional["Deadline"]:
+        """Deadline from the Function's configured timeout, less a margin.
+
+        limit caps the budget (e.g. HTTP_RESPONSE_LIMIT); returns None when
+        the timeout is unbounded and no limit is given.
+        """
+        timeout = function_timeout(host_json)
+        if limit is not None:
+            timeout = min(timeout, limit) if timeout is not None else limit
+        if timeout is None:
+            return None
+        return cls(max(0.0, timeout - margin))
+
+    def remaining(self) -> float:
+        return max(0.0, self._expires - self._clock())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def admits(self, estimate: float) -> bool:
+        """True if work estimated to take this long can finish in time."""
+        return estimate <= self.remaining()
@@ -0,0 +1,238 @@
+"""Embedded SQLite history of runs and per-document results.
+
+Written as documents finish, so it is complete up to the moment a run is
+interrupted, and indexed by run, school and template so reporting and
+planning queries take milliseconds instead of paging the Processing Log
+through Graph.
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from ..engine.models import ProcessingResult, ProcessingStatus
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    started TEXT NOT NULL,
+    finished TEXT,
+    school_filter TEXT,
+    template_filter TEXT,
+    total INTEGER,
+    success INTEGER,
+    skipped INTEGER,
+    failed INTEGER
+);
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id TEXT NOT NULL,
+    run_date TEXT NOT NULL,
+    school_code TEXT NOT NULL,
+    policy_name TEXT NOT NULL,
+    status TEXT NOT NULL,
+    error_message TEXT,
+    duration_seconds REAL,
+    timings TEXT,
+    template_hash TEXT,
+    logo_hash TEXT,
+    school_hash TEXT,
+    output_hash TEXT
+);
+CREATE INDEX IF NOT EXISTS results_run ON results (run_id);
+CREATE INDEX IF NOT EXISTS results_pair ON results (school_code, policy_name, run_date);
+CREATE INDEX IF NOT EXISTS results_policy ON results (policy_name);
+"""
+
+_RESULT_COLUMNS = (
+    "run_id, run_date, school_code, policy_name, status, error_message, "
+    "duration_seconds, timings, template_hash, logo_hash, school_hash, output_hash"
+)
+
+
+def _row_to_result(row: tuple) -> ProcessingResult:
+    return ProcessingResult(
+        run_id=row[0],
+        run_date=datetime.fromisoformat(row[1]),
+        school_code=row[2],
+        policy_name=row[3],
+        status=ProcessingStatus(row[4]),
+        error_message=row[5],
+        duration_seconds=row[6] or 0.0,
+        timings=json.loads(row[7]) if row[7] else {},
+        template_hash=row[8] or "",
+        logo_hash=row[9] or "",
+        school_hash=row[10] or "",
+        output_hash=row[11] or "",
+    )
+
+
+class RunHistory:
+    """Runs and per-document results in a local SQLite database.
+
+    One connection is shared behind a lock, so a pipeline's worker threads
+    can record concurrently; WAL mode lets other processes read meanwhile.
+    Pass wal=False for a database on a network share (SMB, Azure Files),
+    where the shared memory WAL relies on is not available.
+    """
+
+    def __init__(self, path: Path, wal: bool = True):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            str(self.path), timeout=30, check_same_thread=False
+        )
+        if wal:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # -- writing -----------------------------------------------------------
+
+    def start_run(
+        self,
+        run_id: str,
+        school_filter: Optional[List[str]] = None,
+        template_filter: Optional[List[str]] = None,
+    ) -> None:
+        """Register a run; a resumed run or another shard keeps the original row."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO runs "
+                "(run_id, started, school_filter, template_filter) VALUES (?, ?, ?, ?)",
+                (
+                    run_id,
+                    datetime.now().isoformat(),
+                    json.dumps(school_filter) if school_filter else None,
+                    json.dumps(template_filter) if template_filter else None,
+                ),
+            )
+            self._conn.commit()
+
+    def record(self, result: ProcessingResult) -> None:
+        with self._lock:
+            self._conn.execute(
+                f"INSERT INTO results ({_RESULT_COLUMNS}) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    result.run_id,
+                    result.run_date.isoformat(),
+                    result.school_code,
+                    result.policy_name,
+                    result.status.value,
+                    result.error_message,
+                    result.duration_seconds,
+                    json.dumps(result.timings),
+                    result.template_hash,
+                    result.logo_hash,
+                    result.school_hash,
+                    result.output_hash,
+                ),
+            )
+            self._conn.commit()
+
+    def finish_run(self, run_id: str) -> None:
+        """Stamp the run finished with counts over its latest result per pair."""
+        results = self.run_results(run_id)
+        counts = {status: 0 for status in ProcessingStatus}
+        for result in results:
+            counts[result.status] += 1
+        with self._lock:
+            self._conn.execute(
+                "UPDATE runs SET finished = ?, total = ?, success = ?, "
+                "skipped = ?, failed = ? WHERE run_id = ?",
+                (
+                    datetime.now().isoformat(),
+                    len(results),
+                    counts[ProcessingStatus.SUCCESS],
+                    counts[ProcessingStatus.SKIPPED],
+                    counts[ProcessingStatus.ERROR],
+                    run_id,
+                ),
+            )
+            self._conn.commit()
+
+    # -- queries -----------------------------------------------------------
+
+    def _query(self, sql: str, params: tuple = ()) -> List[tuple]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def run_results(self, run_id: str) -> List[ProcessingResult]:
+        """The latest result per (school, template) pair in a run."""
+        rows = self._query(
+            f"SELECT {_RESULT_COLUMNS} FROM results WHERE id IN ("
+            "SELECT MAX(id) FROM results WHERE run_id = ? "
+            "GROUP BY school_code, policy_name) ORDER BY id",
+            (run_id,),
+        )
+        return [_row_to_result(row) for row in rows]
+
+    def pair_history(
+        self, school_code: str, policy_name: str, limit: int = 10
+    ) -> List[ProcessingResult]:
+        """Most recent results for one document, newest first."""
+        rows = self._query(
+            f"SELECT {_RESULT_COLUMNS} FROM results "
+            "WHERE school_code = ? AND policy_name = ? "
+            "ORDER BY run_date DESC, id DESC LIMIT ?",
+            (school_code, policy_name, limit),
+        )
+        return [_row_to_result(row) for row in rows]
+
+    def last_success(
+        self, school_code: str, policy_name: str
+    ) -> Optional[ProcessingResult]:
+        """Latest result that left the document current in SharePoint."""
+        rows = self._query(
+            f"SELECT {_RESULT_COLUMNS} FROM results "
+            "WHERE school_code = ? AND policy_name = ? AND status != ? "
+            "ORDER BY run_date DESC, id DESC LIMIT 1",
+            (school_code, policy_name, ProcessingStatus.ERROR.value),
+        )
+        return _row_to_result(rows[0]) if rows else None
+
+    def template_durations(self, per_template: int = 50) -> Dict[str, float]:
+        """{template: mean render seconds} over its most recent renders."""
+        rows = self._query(
+            "SELECT policy_name, AVG(duration_seconds) FROM ("
+            "SELECT policy_name, duration_seconds, ROW_NUMBER() OVER ("
+            "PARTITION BY policy_name ORDER BY id DESC) AS n "
+            "FROM results WHERE status != ? AND duration_seconds > 0"
+            ") WHERE n <= ? GROUP BY policy_name",
+            (ProcessingStatus.ERROR.value, per_template),
+        )
+        return {name: mean for name, mean in rows}
+
+    def stage_means(self, recent: int = 500) -> Dict[str, float]:
+        """{stage: mean seconds} over the most recent results' timings."""
+        rows = self._query(
+            "SELECT timings FROM results WHERE timings IS NOT NULL "
+            "ORDER BY id DESC LIMIT ?",
+            (recent,),
+        )
+        totals: Dict[str, List[float]] = {}
+        for (timings,) in rows:
+            for stage, seconds in json.loads(timings).items():
+                totals.setdefault(stage, []).append(seconds)
+        return {stage: sum(v) / len(v) for stage, v in totals.items()}
+
+    def recent_runs(self, limit: int = 10) -> List[dict]:
+        rows = self._query(
+            "SELECT run_id, started, finished, total, success, skipped, failed "
+            "FROM runs ORDER BY started DESC LIMIT ?",
+            (limit,),
+        )
+        keys = ("run_id", "started", "finished", "total", "success", "skipped", "failed")
+        return [dict(zip(keys, row)) for row in rows]
@@ -0,0 +1,158 @@
+import json
+import logging
+import re
+import zipfile
+from dataclasses import dataclass, field, fields
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+from ..engine.models import SchoolRecord
+from ..graph.sharepoint_lists import SchoolDirectoryDelta
+
+logger = logging.getLogger(__name__)
+
+SCHOOL_FIELDS = [f.name for f in fields(SchoolRecord)]
+
+# Fields that appear in the output folder name or identify the school,
+# so a change means every document for that school is affected.
+ALL_TEMPLATE_FIELDS = {"Title", "SchoolCode"}
+
+_TAG_RE = re.compile(r"<[^>]+>")
+_JINJA_RE = re.compile(r"\{\{(.*?)\}\}|\{%(.*?)%\}", re.DOTALL)
+_IDENT_RE = re.compile(r"[A-Za-z_]\w*")
+
+
+@dataclass
+class DirectoryState:
+    """Snapshot of the School Directory as of the last incremental run.
+
+    Persisted as JSON between runs. snapshot maps list item ID to the item's
+    school fields; logo_tags maps SchoolCode to the logo file's cTag.
+    """
+
+    delta_link: Optional[str] = None
+    snapshot: Dict[str, dict] = field(default_factory=dict)
+    logo_tags: Dict[str, str] = field(default_factory=dict)
+
+    @classmethod
+    def load(cls, path: Path) -> "DirectoryState":
+        if not path.exists():
+            return cls()
+        data = json.loads(path.read_text(encoding="utf-8"))
+        return cls(
+            delta_link=data.get("delta_link"),
+            snapshot=data.get("snapshot", {}),
+            logo_tags=data.get("logo_tags", {}),
+        )
+
+    def save(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        tmp.write_text(
+            json.dumps(
+                {
+                    "delta_link": self.delta_link,
+                    "snapshot": self.snapshot,
+                    "logo_tags": self.logo_tags,
+                },
+                indent=2,
+            ),
+            encoding="utf-8",
+        )
+        tmp.replace(path)
+
+    def schools(self) -> List[SchoolRecord]:
+        return [SchoolRecord.from_fields(f) for f in self.snapshot.values()]
+
+
+def school_fields(item_fields: dict) -> dict:
+    """Reduce a list item's fields to the SchoolRecord columns."""
+    record = SchoolRecord.from_fields(item_fields)
+    return {name: getattr(record, name) for name in SCHOOL_FIELDS}
+
+
+def diff_fields(old: Optional[dict], new: dict) -> Set[str]:
+    """Names of school fields that differ. A new school differs in all."""
+    if old is None:
+        return set(SCHOOL_FIELDS)
+    return {name for name in SCHOOL_FIELDS if old.get(name) != new.get(name)}
+
+
+def apply_delta(
+    state: DirectoryState, delta: SchoolDirectoryDelta
+) -> Dict[str, Set[str]]:
+    """Merge a delta into the state's snapshot.
+
+    Returns {SchoolCode: changed field names} for schools that still exist.
+    """
+    changes: Dict[str, Set[str]] = {}
+    removed_ids = list(delta.removed)
+    if delta.full_resync:
+        # A full enumeration omits deleted items rather than flagging them
+        removed_ids += [i for i in state.snapshot if i not in delta.changed]
+    for item_id in removed_ids:
+        removed = state.snapshot.pop(item_id, None)
+        if removed:
+            logger.info(f"School {removed.get('SchoolCode')} removed from directory")
+
+    for item_id, item_fields in delta.changed.items():
+        old = state.snapshot.get(item_id)
+        # Delta responses may carry only some columns; fill from the snapshot
+        new = school_fields({**(old or {}), **item_fields})
+        changed = diff_fields(old, new)
+        state.snapshot[item_id] = new
+        if changed:
+            changes.setdefault(new["SchoolCode"], set()).update(changed)
+
+    state.delta_link = delta.delta_link
+    return changes
+
+
+def template_fields(template_path: Path) -> Set[str]:
+    """School fields referenced by a template's Jinja tags.
+
+    Reads the body, headers and footers straight from the .docx zip. XML
+    tags are stripped first because Word often splits a placeholder across
+    several runs.
+    """
+    referenced: Set[str] = set()
+    with zipfile.ZipFile(template_path) as zf:
+        for name in zf.namelist():
+            if not (name.startswith("word/") and name.endswith(".xml")):
+                continue
+            text = _TAG_RE.sub("", zf.read(name).decode("utf-8", errors="ignore"))
+            for match in _JINJA_RE.finditer(text):
+                expr = match.group(1) or match.group(2) or ""
+                referenced.update(_IDENT_RE.findall(expr))
+    return referenced & set(SCHOOL_FIELDS)
+
+
+class RenderPlanner:
+    """Decides which (school, template) pairs need re-rendering after a
+    School Directory change."""
+
+    def __init__(
+        self,
+        changed_fields: Dict[str, Set[str]],
+        logo_changed: Iterable[str] = (),
+    ):
+        self._changed = changed_fields
+        self._logo_changed = set(logo_changed)
+        self._template_fields: Dict[Path, Set[str]] = {}
+
+    @property
+    def school_codes(self) -> Set[str]:
+        return set(self._changed) | self._logo_changed
+
+    def needs_render(self, school: SchoolRecord, template_path: Path) -> bool:
+        code = school.SchoolCode
+        if code in self._logo_changed:
+            return True
+        changed = self._changed.get(code)
+        if not changed:
+            return False
+        if changed & ALL_TEMPLATE_FIELDS:
+            return True
+        if template_path not in self._template_fields:
+            self._template_fields[template_path] = template_fields(template_path)
+        return bool(changed & self._template_fields[template_path])
@@ -0,0 +1,142 @@
+"""Run several SharePoint sites concurrently in one process.
+
+Every site gets its own SharePointPipeline (and so its own run ID,
+checkpoints, history and results) but all of them share one GraphClient
+(token, connection pool and rate controller) and one AssetCache, so a
+template published to several sites is downloaded once and Graph
+throttling is handled across the whole process.
+"""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from ..config import Config
+from ..engine.models import ProcessingResult, ProcessingStatus
+from ..graph.client import GraphClient
+from ..graph.sharepoint_files import SharePointFiles
+from ..graph.sharepoint_lists import SharePointLists
+from .asset_cache import AssetCache
+from .deadline import Deadline
+from .history import RunHistory
+from .progress import ProgressEmitter
+from .sharepoint_pipeline import SharePointPipeline
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SiteRun:
+    """Outcome of one site's run."""
+
+    site: str
+    site_id: str
+    run_id: Optional[str] = None
+    results: List[ProcessingResult] = field(default_factory=list)
+    # Set when the site's run failed as a whole
+    error: Optional[str] = None
+    deferred: int = 0
+    continuation: Optional[str] = None
+
+    def count(self, status: ProcessingStatus) -> int:
+        return sum(1 for r in self.results if r.status == status)
+
+
+class MultiSiteRunner:
+    """Runs the pipeline for each configured site on its own thread."""
+
+    def __init__(
+        self,
+        client: GraphClient,
+        config: Config,
+        asset_cache: Optional[AssetCache] = None,
+        max_concurrent_sites: Optional[int] = None,
+        progress: Optional[ProgressEmitter] = None,
+    ):
+        self._client = client
+        self._config = config
+        self.asset_cache = asset_cache or AssetCache()
+        self._max_concurrent_sites = max_concurrent_sites
+        # Shared by every site's pipeline; events carry each site's run ID
+        self._progress = progress
+        # {site name: pipeline} from the last run, e.g. for sharing folders
+        self.pipelines: Dict[str, SharePointPipeline] = {}
+
+    def run(
+        self,
+        sites: Optional[List[str]] = None,
+        school_filter: Optional[List[str]] = None,
+        template_filter: Optional[List[str]] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> Dict[str, SiteRun]:
+        """Run the named sites (default: all) and return {site: SiteRun}.
+
+        A site that fails does not stop the others; its SiteRun carries
+        the error.
+        """
+        configured = self._config.sites()
+        names = sites or list(configured)
+        unknown = [n for n in names if n not in configured]
+        if unknown:
+            raise ValueError(f"Unknown site(s): {', '.join(unknown)}")
+
+        self.pipelines = {}
+        workers = self._max_concurrent_sites or len(names)
+        with ThreadPoolExecutor(workers, thread_name_prefix="site") as pool:
+            futures = {
+                name: pool.submit(
+                    self._run_site, name, school_filter, template_filter, deadline
+                )
+                for name in names
+            }
+            runs = {name: future.result() for name, future in futures.items()}
+
+        for run in runs.values():
+            if run.error:
+                logger.error(f"Site {run.site}: failed: {run.error}")
+            else:
+                logger.info(
+                    f"Site {run.site}: run {run.run_id}, {len(run.results)} "
+                    f"document(s), {run.count(ProcessingStatus.ERROR)} failed"
+                )
+        return runs
+
+    def _run_site(
+        self,
+        name: str,
+        school_filter: Optional[List[str]],
+        template_filter: Optional[List[str]],
+        deadline: Optional[Deadline],
+    ) -> SiteRun:
+        config = self._config.for_site(name)
+        run = SiteRun(site=name, site_id=config.sharepoint_site_id)
+        history = RunHistory(config.history_db_path)
+        pipeline = SharePointPipeline(
+            SharePointLists(self._client, config.sharepoint_site_id),
+            SharePointFiles(self._client, config.sharepoint_site_id),
+            checkpoint_dir=config.checkpoint_dir,
+            asset_cache=self.asset_cache,
+            history=history,
+            workers=config.pipeline_workers,
+            scheduling=config.scheduling,
+            progress=self._progress,
+            upload_workers=config.upload_workers,
+        )
+        self.pipelines[name] = pipeline
+        logger.info(f"Site {name}: starting")
+        try:
+            run.results = pipeline.run(
+                school_filter=school_filter,
+                template_filter=template_filter,
+                deadline=deadline,
+            )
+        except Exception as e:
+            logger.exception(f"Site {name}: run failed")
+            run.error = str(e)
+        finally:
+            history.close()
+        run.run_id = pipeline.run_id
+        run.deferred = len(pipeline.deferred)
+        run.continuation = pipeline.continuation
+        return run
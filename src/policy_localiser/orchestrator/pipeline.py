@@ -1,11 +1,19 @@
 import logging
 import uuid
+from collections import Counter
 from pathlib import Path
-from typing import List, Optional
+from typing import Collection, List, Optional, Tuple
 
-from ..engine.models import ProcessingResult, ProcessingStatus, SchoolRecord
-from ..engine.renderer import PolicyRenderer
+from ..engine.models import ProcessingResult, SchoolRecord
+from ..engine.renderer import PolicyRenderer, TemplateCache
 from ..engine.validator import TemplateValidator
+from .deadline import Deadline
+from .history import RunHistory
+from .planning import RENDER, PlannedItem, RunPlan
+from .progress import RUN_FINISHED, RUN_STARTED, ProgressEmitter
+from .scheduling import STRATEGIES, CostModel, order_work
+from .sinks import DocumentSink, LocalDirectorySink
+from .stages import StagedPipeline, WorkItem, check_validation, log_summary
 
 logger = logging.getLogger(__name__)
 
@@ -13,23 +21,87 @@ logger = logging.getLogger(__name__)
 class LocalPipeline:
     """Layer 1 pipeline: processes documents using only local files.
 
-    Use this for testing without any SharePoint dependency.
+    Use this for testing without any SharePoint dependency. Templates are
+    read once per pipeline (and again when they change), not per document.
+    With a history, runs are recorded in it and its timings drive the
+    schedule and deadline estimates, as in SharePointPipeline.
     """
 
-    def __init__(self):
-        self._renderer = PolicyRenderer()
+    def __init__(
+        self,
+        progress: Optional[ProgressEmitter] = None,
+        workers: int = 1,
+        history: Optional[RunHistory] = None,
+        scheduling: str = "lpt",
+    ):
+        self.template_cache = TemplateCache()
+        self._renderer = PolicyRenderer(self.template_cache)
+        self._progress = progress or ProgressEmitter()
+        # Documents rendered concurrently
+        self._workers = max(1, workers)
+        self._history = history
+        if scheduling not in STRATEGIES:
+            raise ValueError(f"Unknown scheduling strategy '{scheduling}'")
+        self._scheduling = scheduling
+        # (school code, template) pairs the last run left for lack of time
+        self.deferred: List[Tuple[str, str]] = []
+
+    def plan(
+        self,
+        template_dir: Path,
+        logo_dir: Path,
+        schools: List[SchoolRecord],
+        template_filter: Optional[List[str]] = None,
+        school_filter: Optional[List[str]] = None,
+    ) -> RunPlan:
+        """Dry run: resolve filters and validate without rendering anything."""
+        templates = sorted(template_dir.glob("*.docx"))
+        if template_filter:
+            templates = [t for t in templates if t.stem in template_filter]
+
+        if school_filter:
+            schools = [s for s in schools if s.SchoolCode in school_filter]
+
+        validator = TemplateValidator(self.template_cache)
+        validation = validator.validate(templates, logo_dir, schools)
+        costs = CostModel(self._history).estimate(templates)
+        work = [(school, template) for school in schools for template in templates]
+        _, schedule = order_work(work, costs, self._scheduling, self._workers)
+
+        return RunPlan(
+            schools=len(schools),
+            templates=len(templates),
+            items=[
+                PlannedItem(
+                    school.SchoolCode, template.stem, RENDER,
+                    round(costs[template.stem][0], 3),
+                )
+                for school, template in work
+            ],
+            estimated_seconds=schedule.estimated_makespan,
+            schedule=schedule if work else None,
+            validation=validation,
+        )
 
     def process_all(
         self,
         template_dir: Path,
         logo_dir: Path,
-        output_dir: Path,
+        output_dir: Optional[Path],
         schools: List[SchoolRecord],
         template_filter: Optional[List[str]] = None,
         school_filter: Optional[List[str]] = None,
+        deadline: Optional[Deadline] = None,
+        sink: Optional[DocumentSink] = None,
+        only: Optional[Collection[Tuple[str, str]]] = None,
     ) -> List[ProcessingResult]:
+        """Render every (school, template) pair into output_dir, or into
+        sink (e.g. a ZipBundleSink) when one is given.
+
+        only limits the run to these (school code, template name) pairs;
+        other documents are left as they are.
+        """
         run_id = str(uuid.uuid4())[:8]
-        results: List[ProcessingResult] = []
 
         templates = sorted(template_dir.glob("*.docx"))
         if template_filter:
@@ -38,54 +110,96 @@ class LocalPipeline:
         if school_filter:
             schools = [s for s in schools if s.SchoolCode in school_filter]
 
+        if only is not None:
+            only = set(only)
+            templates = [t for t in templates if any(t.stem == n for _, n in only)]
+            schools = [s for s in schools if any(s.SchoolCode == c for c, _ in only)]
+
         # Pre-flight validation
-        validator = TemplateValidator()
-        errors = validator.validate(templates, logo_dir, schools)
-        blocking = [e for e in errors if e.severity == "error"]
-        if blocking:
-            for err in blocking:
-                logger.error(str(err))
-            raise RuntimeError(
-                f"Validation failed with {len(blocking)} error(s). "
-                "Fix them before proceeding."
-            )
-        for warn in [e for e in errors if e.severity == "warning"]:
-            logger.warning(str(warn))
+        check_validation(
+            TemplateValidator(self.template_cache).validate(templates, logo_dir, schools)
+        )
 
-        total = len(schools) * len(templates)
-        processed = 0
+        work = [
+            (school, template)
+            for school in schools
+            for template in templates
+            if only is None or (school.SchoolCode, template.stem) in only
+        ]
+        total = len(work)
+        self.deferred = []
+        costs = CostModel(self._history).estimate(templates)
 
         logger.info(
             f"Starting run {run_id}: {len(schools)} school(s) x "
             f"{len(templates)} template(s) = {total} document(s)"
         )
+        progress = self._progress
+        if progress.enabled:
+            progress.emit(
+                RUN_STARTED, run_id, total=total, done=0,
+                schools=len(schools), templates=len(templates),
+                workers=self._workers,
+            )
 
-        for school in schools:
-            school_output_dir = output_dir / school.folder_name
-            logo_path = logo_dir / f"{school.SchoolCode}.png"
-
-            for template_path in templates:
-                processed += 1
-                output_file = school_output_dir / template_path.name
-                logger.info(
-                    f"[{processed}/{total}] {school.SchoolCode} / {template_path.stem}"
-                )
-
-                result = self._renderer.render(
-                    template_path=template_path,
-                    logo_path=logo_path,
-                    school=school,
-                    output_path=output_file,
-                    run_id=run_id,
+        # Results stay in school-then-template order whatever the schedule
+        ordered, report = order_work(
+            [
+                (
+                    WorkItem(
+                        index, school, template, logo_dir / f"{school.SchoolCode}.png"
+                    ),
+                    template,
                 )
-                results.append(result)
-
-                if result.status == ProcessingStatus.ERROR:
-                    logger.error(f"  FAILED: {result.error_message}")
+                for index, (school, template) in enumerate(work)
+            ],
+            costs, self._scheduling, self._workers,
+        )
+        if work:
+            logger.info(report.summary())
+        history = self._history
+        if history is not None:
+            history.start_run(run_id, school_filter, template_filter)
+        # Ours to close only if we create it
+        own_sink = sink is None
+        sink = sink or LocalDirectorySink(output_dir)
+        stages = StagedPipeline(
+            self._renderer,
+            sink,
+            run_id,
+            admit=(
+                (lambda item: deadline.admits(costs[item.template_path.stem][0]))
+                if deadline is not None
+                else None
+            ),
+            record=history.record if history is not None else None,
+            progress=progress,
+            render_workers=self._workers,
+        )
+        try:
+            results = stages.run([item for item, _ in ordered])
+        finally:
+            if own_sink:
+                sink.close()
+        if history is not None:
+            history.finish_run(run_id)
+        self.deferred = [
+            (item.school.SchoolCode, item.template_path.stem) for item in stages.deferred
+        ]
 
         # Summary
-        success = sum(1 for r in results if r.status == ProcessingStatus.SUCCESS)
-        failed = sum(1 for r in results if r.status == ProcessingStatus.ERROR)
-        logger.info(f"Run {run_id} complete: {success} succeeded, {failed} failed out of {total}")
+        log_summary(run_id, results)
+        if self.deferred:
+            logger.warning(
+                f"Run {run_id} stopped at its deadline: "
+                f"{len(self.deferred)} document(s) not rendered"
+            )
+        if progress.enabled:
+            progress.emit(
+                RUN_FINISHED, run_id,
+                counts=dict(Counter(r.status.value for r in results)),
+                deferred=len(self.deferred),
+                continuation=None,
+            )
 
         return results
@@ -0,0 +1,99 @@
+"""Dry-run plans: what a run would do, how long and how many Graph calls.
+
+A plan resolves filters and validates inputs like a real run, then
+predicts an action per document without rendering or uploading anything.
+Times come from the run history's stage timings (falling back to the
+defaults below) and are scheduled over the configured workers.
+"""
+
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from ..engine.validator import ValidationError
+from .scheduling import ScheduleReport
+
+# Assumed when the run history has no timings yet
+DEFAULT_UPLOAD_SECONDS = 0.5
+DEFAULT_REQUEST_SECONDS = 0.15
+
+RENDER = "render"
+UPLOAD = "upload"
+SKIP = "skip"
+
+
+@dataclass
+class PlannedItem:
+    """Predicted handling of one (school, template) document."""
+
+    school_code: str
+    policy_name: str
+    action: str  # RENDER (local only), UPLOAD or SKIP (unchanged in SharePoint)
+    estimated_seconds: float = 0.0
+
+
+@dataclass
+class RunPlan:
+    schools: int
+    templates: int
+    items: List[PlannedItem] = field(default_factory=list)
+    # "METHOD endpoint" -> calls a real run would make
+    request_counts: Dict[str, int] = field(default_factory=dict)
+    estimated_seconds: float = 0.0
+    schedule: Optional[ScheduleReport] = None
+    validation: List[ValidationError] = field(default_factory=list)
+    # Documents a resumed run has already finished
+    already_done: int = 0
+
+    @property
+    def blocking(self) -> List[ValidationError]:
+        return [e for e in self.validation if e.severity == "error"]
+
+    def action_counts(self) -> Dict[str, int]:
+        return dict(Counter(item.action for item in self.items))
+
+    def lines(self) -> List[str]:
+        """Human-readable plan summary."""
+        actions = self.action_counts()
+        lines = [
+            f"Plan: {self.schools} school(s) x {self.templates} template(s), "
+            f"{len(self.items)} document(s)"
+            + (f", {self.already_done} already done" if self.already_done else ""),
+            "  " + ", ".join(
+                f"{actions.get(a, 0)} {label}"
+                for a, label in (
+                    (RENDER, "render only"),
+                    (UPLOAD, "render + upload"),
+                    (SKIP, "render, upload skipped (unchanged)"),
+                )
+                if actions.get(a) or a != RENDER
+            ),
+            f"  Estimated wall time: {self.estimated_seconds:.0f}s "
+            f"({self.estimated_seconds / 60:.1f} min)",
+        ]
+        if self.schedule:
+            lines.append(f"  {self.schedule.summary()}")
+        if self.request_counts:
+            lines.append(f"  Graph requests: {sum(self.request_counts.values())}")
+            for endpoint, count in sorted(
+                self.request_counts.items(), key=lambda kv: -kv[1]
+            ):
+                lines.append(f"    {count:>6}  {endpoint}")
+        for error in self.validation:
+            lines.append(f"  {error!r}")
+        return lines
+
+    def to_dict(self) -> dict:
+        return {
+            "schools": self.schools,
+            "templates": self.templates,
+            "documents": len(self.items),
+            "already_done": self.already_done,
+            "actions": self.action_counts(),
+            "estimated_seconds": round(self.estimated_seconds, 1),
+            "schedule": self.schedule.summary() if self.schedule else None,
+            "requests": self.request_counts,
+            "validation": [
+                {"severity": e.severity, "message": e.message} for e in self.validation
+            ],
+        }
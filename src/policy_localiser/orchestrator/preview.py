@@ -0,0 +1,101 @@
+"""Single-document previews: one school, one template, rendered in memory.
+
+Nothing is uploaded or written to the Processing Log. On a warm host a
+preview costs two driveItem lookups and a render: drive IDs and the
+School Directory come from the client's response cache, the template and
+logo from the AssetCache (downloaded again only when SharePoint has a
+newer version) and the template bytes from a TemplateCache. The AssetCache
+hands out one file per version, so a preview never reads a file that a
+concurrent download is replacing.
+"""
+
+import logging
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from ..engine.models import SchoolRecord
+from ..engine.renderer import PolicyRenderer, TemplateCache
+from ..graph.sharepoint_files import SharePointFiles
+from ..graph.sharepoint_lists import SharePointLists
+from .asset_cache import AssetCache
+from .sharepoint_pipeline import SharePointPipeline
+
+logger = logging.getLogger(__name__)
+
+DOCX_CONTENT_TYPE = (
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+)
+
+
+class MissingAssetError(RuntimeError):
+    """The school has no logo, or the template no logo slot to put it in."""
+
+
+@dataclass
+class Preview:
+    school: SchoolRecord
+    policy_name: str
+    content: bytes
+    seconds: float
+
+    @property
+    def file_name(self) -> str:
+        return f"{self.school.SchoolCode} - {self.policy_name}.docx"
+
+
+class PreviewService:
+    """Renders single documents for previews; safe to share between threads."""
+
+    def __init__(
+        self,
+        sp_lists: SharePointLists,
+        sp_files: SharePointFiles,
+        asset_cache: Optional[AssetCache] = None,
+        template_cache: Optional[TemplateCache] = None,
+    ):
+        self._sp_lists = sp_lists
+        self._sp_files = sp_files
+        self._asset_cache = asset_cache or AssetCache()
+        self._templates = template_cache or TemplateCache()
+        self._renderer = PolicyRenderer(self._templates)
+
+    def render(self, school_code: str, template_name: str) -> Preview:
+        """Render one document. Raises ValueError for an unknown school or
+        template, MissingAssetError if the school has no logo or the
+        template no logo slot."""
+        start = time.monotonic()
+        school = next(
+            (s for s in self._sp_lists.get_schools() if s.SchoolCode == school_code),
+            None,
+        )
+        if school is None:
+            raise ValueError(f"School '{school_code}' not found")
+
+        if not template_name.lower().endswith(".docx"):
+            template_name += ".docx"
+        template = self._fetch(SharePointPipeline.TEMPLATES_LIBRARY, template_name)
+        if template is None:
+            raise ValueError(f"Template '{template_name}' not found")
+        if not self._templates.prepare(template).logo_slots:
+            raise MissingAssetError(f"Template '{template_name}' has no logo slot")
+        logo = self._fetch(SharePointPipeline.LOGOS_LIBRARY, f"{school_code}.png")
+        if logo is None:
+            raise MissingAssetError(f"No logo for school '{school_code}'")
+
+        content = self._renderer.render_bytes(template, logo, school)
+        preview = Preview(
+            school, Path(template_name).stem, content, time.monotonic() - start
+        )
+        logger.info(
+            f"Preview of {preview.file_name} rendered in {preview.seconds:.2f}s"
+        )
+        return preview
+
+    def _fetch(self, library: str, file_name: str) -> Optional[Path]:
+        drive_id = self._sp_files.get_drive_id(library)
+        item = self._sp_files.get_file(drive_id, file_name)
+        if item is None:
+            return None
+        return self._asset_cache.cached_path(self._sp_files, drive_id, item)
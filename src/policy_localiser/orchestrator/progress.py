@@ -0,0 +1,197 @@
+"""Structured progress events from the pipelines, for dashboards and CLIs.
+
+A pipeline emits run_started, item_started, upload_done, item_finished and
+run_finished events through a ProgressEmitter to any number of sinks
+(JSON Lines file, callback, in-memory ring buffer). With no sinks the
+emitter is disabled and the pipelines skip building events at all.
+
+Per-document events are rate-limited (max_per_second, as a token bucket);
+run events and failed documents are always delivered, and run_finished
+reports how many events were dropped alongside the run's totals, so a
+sampled stream still adds up.
+"""
+
+import json
+import sys
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Callable, Deque, Dict, List, Optional, TextIO
+
+RUN_STARTED = "run_started"
+ITEM_STARTED = "item_started"
+UPLOAD_DONE = "upload_done"
+ITEM_FINISHED = "item_finished"
+RUN_FINISHED = "run_finished"
+
+# Never dropped by the rate limit
+_ALWAYS = (RUN_STARTED, RUN_FINISHED)
+
+
+@dataclass
+class ProgressEvent:
+    type: str
+    run_id: str
+    time: float
+    school: Optional[str] = None
+    template: Optional[str] = None
+    data: dict = field(default_factory=dict)
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+class JsonLinesSink:
+    """Appends one JSON object per event to a file.
+
+    Lines are flushed when a run finishes (and on close), not per event.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def emit(self, event: ProgressEvent) -> None:
+        line = json.dumps(event.to_dict(), separators=(",", ":"))
+        with self._lock:
+            self._file.write(line + "\n")
+            if event.type == RUN_FINISHED:
+                self._file.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+class CallbackSink:
+    """Calls a function with each event."""
+
+    def __init__(self, callback: Callable[[ProgressEvent], None]):
+        self._callback = callback
+
+    def emit(self, event: ProgressEvent) -> None:
+        self._callback(event)
+
+    def close(self) -> None:
+        pass
+
+
+class RingBufferSink:
+    """Keeps the last capacity events in memory, e.g. for a status page."""
+
+    def __init__(self, capacity: int = 1000):
+        self._events: Deque[ProgressEvent] = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+
+    def emit(self, event: ProgressEvent) -> None:
+        with self._lock:
+            self._events.append(event)
+
+    def events(self) -> List[ProgressEvent]:
+        with self._lock:
+            return list(self._events)
+
+    def close(self) -> None:
+        pass
+
+
+class ProgressEmitter:
+    """Delivers events to sinks; thread-safe.
+
+    Call sites check enabled before building an event, so a pipeline with
+    no sinks pays one attribute read per document.
+    """
+
+    def __init__(self, sinks: Optional[list] = None, max_per_second: float = 50.0):
+        self._sinks = list(sinks or [])
+        self._rate = max_per_second
+        self._tokens = max_per_second
+        self._refilled = time.monotonic()
+        self._lock = threading.Lock()
+        # run ID -> events dropped by the rate limit
+        self._dropped: Dict[str, int] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self._sinks)
+
+    def add_sink(self, sink) -> None:
+        with self._lock:
+            self._sinks.append(sink)
+
+    def dropped(self, run_id: str) -> int:
+        with self._lock:
+            return self._dropped.get(run_id, 0)
+
+    def _admit(self, event_type: str, run_id: str, always: bool) -> bool:
+        if always or event_type in _ALWAYS or not self._rate:
+            return True
+        now = time.monotonic()
+        self._tokens = min(
+            self._rate, self._tokens + (now - self._refilled) * self._rate
+        )
+        self._refilled = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return True
+        self._dropped[run_id] = self._dropped.get(run_id, 0) + 1
+        return False
+
+    def emit(
+        self,
+        event_type: str,
+        run_id: str,
+        school: Optional[str] = None,
+        template: Optional[str] = None,
+        always: bool = False,
+        **data,
+    ) -> None:
+        """Send an event to every sink, unless the rate limit drops it.
+
+        always=True exempts an event (e.g. a failed document) from the limit.
+        """
+        if not self._sinks:
+            return
+        with self._lock:
+            if not self._admit(event_type, run_id, always):
+                return
+            if event_type == RUN_FINISHED:
+                data["dropped"] = self._dropped.pop(run_id, 0)
+            sinks = list(self._sinks)
+        event = ProgressEvent(event_type, run_id, time.time(), school, template, data)
+        for sink in sinks:
+            sink.emit(event)
+
+    def close(self) -> None:
+        for sink in self._sinks:
+            sink.close()
+
+
+def console_progress(
+    stream: Optional[TextIO] = None,
+) -> Callable[[ProgressEvent], None]:
+    """Callback printing a line per finished document (to stderr by default)
+    for the CLI runners."""
+
+    def show(event: ProgressEvent) -> None:
+        out = stream or sys.stderr
+        if event.type == ITEM_FINISHED:
+            d = event.data
+            line = (
+                f"[{d['completed']}/{d['total']}] {event.school} / {event.template}"
+                f"  {d['status']} {d.get('seconds', 0.0):.2f}s"
+            )
+            if d.get("error"):
+                line += f"  {d['error']}"
+            print(line, file=out, flush=True)
+        elif event.type == RUN_STARTED:
+            print(
+                f"Run {event.run_id}: {event.data['total']} document(s)",
+                file=out, flush=True,
+            )
+
+    return show
@@ -0,0 +1,208 @@
+"""Live status of runs started in the background (202 Accepted + polling).
+
+A run's status is one JSON file, `<run_root>/<run_id>/status.json`, next to
+the sharded run record, so any instance sharing the mount can answer a
+status request. Only the worker running the run writes it.
+"""
+
+import json
+import logging
+import socket
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from ..engine.models import ProcessingResult, ProcessingStatus
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+
+# Failures listed in full; the counts still cover every document
+MAX_FAILURES = 100
+
+# Added to the function timeout before a queued or running run whose status
+# has stopped updating is taken to be dead
+STALE_MARGIN = 60.0
+
+
+@dataclass
+class RunStatus:
+    """Progress of one run as reported by GET /api/localise/{run_id}."""
+
+    run_id: str
+    state: str = QUEUED
+    request: dict = field(default_factory=dict)
+    submitted: Optional[str] = None
+    started: Optional[str] = None
+    finished: Optional[str] = None
+    updated: Optional[str] = None
+    worker: Optional[str] = None
+    total: int = 0
+    processed: int = 0
+    # ProcessingStatus value -> documents
+    counts: Dict[str, int] = field(default_factory=dict)
+    # Stage name -> {"count", "total_seconds", "mean_seconds"}
+    stages: Dict[str, dict] = field(default_factory=dict)
+    failures: List[dict] = field(default_factory=list)
+    deferred: int = 0
+    continuation: Optional[str] = None
+    error: Optional[str] = None
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "RunStatus":
+        return cls(**data)
+
+    def is_stale(self, after: float, now: Optional[datetime] = None) -> bool:
+        """Queued or running, but not updated for after seconds: its host
+        was recycled or its queue message lost, so it will never finish."""
+        if self.state not in (QUEUED, RUNNING):
+            return False
+        updated = self.updated or self.submitted
+        if updated is None:
+            return True
+        now = now or datetime.now()
+        return now - datetime.fromisoformat(updated) > timedelta(seconds=after)
+
+    def add_result(self, result: ProcessingResult) -> None:
+        self.processed += 1
+        status = result.status.value
+        self.counts[status] = self.counts.get(status, 0) + 1
+        for stage, seconds in result.timings.items():
+            entry = self.stages.setdefault(
+                stage, {"count": 0, "total_seconds": 0.0, "mean_seconds": 0.0}
+            )
+            entry["count"] += 1
+            entry["total_seconds"] = round(entry["total_seconds"] + seconds, 3)
+            entry["mean_seconds"] = round(entry["total_seconds"] / entry["count"], 3)
+        if result.status == ProcessingStatus.ERROR and len(self.failures) < MAX_FAILURES:
+            self.failures.append({
+                "school": result.school_code,
+                "template": result.policy_name,
+                "error": result.error_message,
+            })
+
+
+class RunStatusStore:
+    """Reads and writes run status files under the run record directory."""
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+
+    def path(self, run_id: str) -> Path:
+        return self.root / run_id / "status.json"
+
+    def save(self, status: RunStatus) -> None:
+        path = self.path(status.run_id)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        tmp.write_text(json.dumps(status.to_dict(), indent=1), encoding="utf-8")
+        tmp.replace(path)
+
+    def load(self, run_id: str) -> Optional[RunStatus]:
+        """The run's status, or None if no run with that ID was submitted."""
+        # Run IDs come from URLs; anything with a path in it is not one
+        if not run_id or Path(run_id).name != run_id:
+            return None
+        path = self.path(run_id)
+        if not path.exists():
+            return None
+        return RunStatus.from_dict(json.loads(path.read_text(encoding="utf-8")))
+
+
+class RunTracker:
+    """Keeps a run's status file current while the run works.
+
+    The pipeline calls begin() once the work is known and record() per
+    finished document, from any worker thread; the file is rewritten at
+    most every interval seconds, and always on state changes.
+    """
+
+    def __init__(
+        self,
+        store: RunStatusStore,
+        run_id: str,
+        request: Optional[dict] = None,
+        interval: float = 2.0,
+    ):
+        self._store = store
+        self._interval = interval
+        self._lock = threading.Lock()
+        self._saved_at = 0.0
+        self.status = store.load(run_id) or RunStatus(run_id, request=request or {})
+
+    def _save(self, force: bool = False) -> None:
+        now = time.monotonic()
+        if not force and now - self._saved_at < self._interval:
+            return
+        self.status.updated = datetime.now().isoformat()
+        try:
+            self._store.save(self.status)
+        except OSError as e:
+            # Status is informational; never fail the run over it
+            logger.warning(f"Could not save status of run {self.status.run_id}: {e}")
+        self._saved_at = now
+
+    def submit(self, request: Optional[dict] = None) -> None:
+        """Mark the run queued; a resubmitted run keeps its counts until begin()."""
+        with self._lock:
+            if request is not None:
+                self.status.request = request
+            self.status.state = QUEUED
+            self.status.submitted = datetime.now().isoformat()
+            self.status.started = self.status.finished = None
+            self.status.deferred = 0
+            self.status.continuation = self.status.error = None
+            self._save(force=True)
+
+    def start(self) -> None:
+        with self._lock:
+            self.status.state = RUNNING
+            self.status.started = datetime.now().isoformat()
+            self.status.worker = socket.gethostname()
+            self._save(force=True)
+
+    def begin(self, total: int, completed: List[ProcessingResult]) -> None:
+        """The run's document count, and results already finished (on resume)."""
+        with self._lock:
+            self.status.total = total
+            self.status.processed = 0
+            self.status.counts = {}
+            self.status.stages = {}
+            self.status.failures = []
+            for result in completed:
+                self.status.add_result(result)
+            self._save(force=True)
+
+    def record(self, result: ProcessingResult) -> None:
+        with self._lock:
+            self.status.add_result(result)
+            self._save()
+
+    def finish(
+        self,
+        deferred: int = 0,
+        continuation: Optional[str] = None,
+    ) -> None:
+        with self._lock:
+            self.status.state = COMPLETED
+            self.status.finished = datetime.now().isoformat()
+            self.status.deferred = deferred
+            self.status.continuation = continuation
+            self._save(force=True)
+
+    def fail(self, error: str) -> None:
+        with self._lock:
+            self.status.state = FAILED
+            self.status.finished = datetime.now().isoformat()
+            self.status.error = error
+            self._save(force=True)
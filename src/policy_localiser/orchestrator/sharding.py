@@ -0,0 +1,268 @@
+"""Coordinator/worker fan-out of a run across many worker invocations.
+
+The coordinator reads the School Directory once, splits the schools into
+shards and records the plan in a shared run record; each shard becomes a
+queue message. Workers (queue-triggered Functions, or local processes via
+ShardQueue) run one shard each with a warm pipeline and write their results
+to the run record, which shows when the whole run is complete.
+
+The run record is a directory per run: `manifest.json` with the plan plus
+one `shard-NNNN.json` per finished shard. Every file is written by exactly
+one party, so a shared file mount needs no locking.
+"""
+
+import json
+import logging
+import socket
+import sqlite3
+import time
+import uuid
+from contextlib import closing
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
+
+from ..engine.models import ProcessingResult
+from ..graph.sharepoint_lists import SharePointLists
+from .checkpoint import result_from_dict, result_to_dict
+from .sharepoint_pipeline import SharePointPipeline
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Shard:
+    """One unit of work: a block of schools for a run."""
+
+    run_id: str
+    index: int
+    school_codes: List[str]
+    template_names: Optional[List[str]] = None
+
+    def to_message(self) -> str:
+        return json.dumps(asdict(self))
+
+    @classmethod
+    def from_message(cls, body: str) -> "Shard":
+        return cls(**json.loads(body))
+
+
+def plan_shards(
+    run_id: str,
+    school_codes: List[str],
+    template_names: Optional[List[str]] = None,
+    schools_per_shard: int = 1,
+) -> List[Shard]:
+    """Split schools into shards of schools_per_shard, keeping order."""
+    size = max(1, schools_per_shard)
+    return [
+        Shard(run_id, index, school_codes[start:start + size], template_names)
+        for index, start in enumerate(range(0, len(school_codes), size))
+    ]
+
+
+def _write_json(path: Path, data: dict) -> None:
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(json.dumps(data, indent=1), encoding="utf-8")
+    tmp.replace(path)
+
+
+class RunRecord:
+    """Shared record of a sharded run's plan and per-shard results."""
+
+    def __init__(self, root: Path, run_id: str):
+        self.run_id = run_id
+        self.path = Path(root) / run_id
+
+    def create(self, shards: List[Shard]) -> None:
+        self.path.mkdir(parents=True, exist_ok=True)
+        _write_json(self.path / "manifest.json", {
+            "run_id": self.run_id,
+            "created": datetime.now().isoformat(),
+            "shards": [asdict(s) for s in shards],
+        })
+
+    def shards(self) -> List[Shard]:
+        manifest = json.loads((self.path / "manifest.json").read_text(encoding="utf-8"))
+        return [Shard(**s) for s in manifest["shards"]]
+
+    def record_shard(self, shard: Shard, results: List[ProcessingResult]) -> None:
+        """Store a shard's results; a redelivered shard overwrites its file."""
+        _write_json(self.path / f"shard-{shard.index:04d}.json", {
+            "index": shard.index,
+            "worker": socket.gethostname(),
+            "finished": datetime.now().isoformat(),
+            "results": [result_to_dict(r) for r in results],
+        })
+
+    def finished_shards(self) -> List[int]:
+        return sorted(
+            int(p.stem.split("-")[1]) for p in self.path.glob("shard-*.json")
+        )
+
+    def pending_shards(self) -> List[int]:
+        finished = set(self.finished_shards())
+        return [s.index for s in self.shards() if s.index not in finished]
+
+    def is_complete(self) -> bool:
+        return not self.pending_shards()
+
+    def results(self) -> List[ProcessingResult]:
+        results: List[ProcessingResult] = []
+        for index in self.finished_shards():
+            data = json.loads(
+                (self.path / f"shard-{index:04d}.json").read_text(encoding="utf-8")
+            )
+            results.extend(result_from_dict(r) for r in data["results"])
+        return results
+
+
+def start_run(
+    sp_lists: SharePointLists,
+    run_root: Path,
+    school_filter: Optional[List[str]] = None,
+    template_filter: Optional[List[str]] = None,
+    schools_per_shard: int = 1,
+) -> List[Shard]:
+    """Coordinator: plan a run and record it. Returns the shards to enqueue."""
+    run_id = str(uuid.uuid4())[:8]
+    codes = [s.SchoolCode for s in sp_lists.get_schools()]
+    if school_filter:
+        codes = [c for c in codes if c in school_filter]
+    shards = plan_shards(run_id, codes, template_filter, schools_per_shard)
+    RunRecord(run_root, run_id).create(shards)
+    logger.info(
+        f"Run {run_id}: {len(codes)} school(s) in {len(shards)} shard(s)"
+    )
+    return shards
+
+
+def process_shard(
+    pipeline: SharePointPipeline, run_root: Path, shard: Shard
+) -> List[ProcessingResult]:
+    """Worker: run one shard under the shared run ID and record the results."""
+    logger.info(
+        f"Run {shard.run_id} shard {shard.index}: {', '.join(shard.school_codes)}"
+    )
+    results = pipeline.run(
+        school_filter=shard.school_codes,
+        template_filter=shard.template_names,
+        run_id=shard.run_id,
+    )
+    record = RunRecord(run_root, shard.run_id)
+    record.record_shard(shard, results)
+    pending = record.pending_shards()
+    if pending:
+        logger.info(f"Run {shard.run_id}: {len(pending)} shard(s) still pending")
+    else:
+        logger.info(f"Run {shard.run_id}: all shards complete")
+    return results
+
+
+@dataclass
+class QueueMessage:
+    id: int
+    body: str
+    dequeue_count: int
+
+
+class ShardQueue:
+    """SQLite-backed stand-in for an Azure Storage queue.
+
+    Safe across threads and processes on one machine. As with Azure, a
+    received message is hidden for visibility_timeout seconds and becomes
+    visible again unless deleted; after max_dequeue_count deliveries it is
+    moved to the poison table instead.
+    """
+
+    def __init__(self, path: Path, max_dequeue_count: int = 5):
+        self._path = Path(path)
+        self._max_dequeue_count = max_dequeue_count
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS messages ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, body TEXT NOT NULL, "
+                "visible_at REAL NOT NULL, dequeue_count INTEGER NOT NULL DEFAULT 0)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS poison (id INTEGER PRIMARY KEY, body TEXT)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(str(self._path), timeout=30, isolation_level=None)
+
+    def send(self, body: str) -> None:
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "INSERT INTO messages (body, visible_at) VALUES (?, ?)",
+                (body, time.time()),
+            )
+
+    def receive(self, visibility_timeout: float = 600.0) -> Optional[QueueMessage]:
+        """Take the next visible message, or None if there is none."""
+        conn = self._connect()
+        try:
+            while True:
+                conn.execute("BEGIN IMMEDIATE")
+                row = conn.execute(
+                    "SELECT id, body, dequeue_count FROM messages "
+                    "WHERE visible_at <= ? ORDER BY id LIMIT 1",
+                    (time.time(),),
+                ).fetchone()
+                if row is None:
+                    conn.execute("COMMIT")
+                    return None
+                msg_id, body, count = row
+                if count >= self._max_dequeue_count:
+                    conn.execute("INSERT INTO poison (id, body) VALUES (?, ?)", (msg_id, body))
+                    conn.execute("DELETE FROM messages WHERE id = ?", (msg_id,))
+                    conn.execute("COMMIT")
+                    logger.error(f"Message {msg_id} failed {count} time(s); moved to poison")
+                    continue
+                conn.execute(
+                    "UPDATE messages SET visible_at = ?, dequeue_count = ? WHERE id = ?",
+                    (time.time() + visibility_timeout, count + 1, msg_id),
+                )
+                conn.execute("COMMIT")
+                return QueueMessage(msg_id, body, count + 1)
+        finally:
+            conn.close()
+
+    def delete(self, message: QueueMessage) -> None:
+        with closing(self._connect()) as conn:
+            conn.execute("DELETE FROM messages WHERE id = ?", (message.id,))
+
+    def poison_count(self) -> int:
+        with closing(self._connect()) as conn:
+            return conn.execute("SELECT COUNT(*) FROM poison").fetchone()[0]
+
+    def __len__(self) -> int:
+        with closing(self._connect()) as conn:
+            return conn.execute("SELECT COUNT(*) FROM messages").fetchone()[0]
+
+
+def drain_queue(
+    queue: ShardQueue,
+    pipeline: SharePointPipeline,
+    run_root: Path,
+    visibility_timeout: float = 600.0,
+) -> int:
+    """Local worker loop: process shards until the queue has none visible.
+
+    A failed shard is left on the queue and redelivered after the
+    visibility timeout. Returns the number of shards processed.
+    """
+    processed = 0
+    while True:
+        message = queue.receive(visibility_timeout)
+        if message is None:
+            return processed
+        try:
+            process_shard(pipeline, run_root, Shard.from_message(message.body))
+        except Exception:
+            logger.exception(f"Shard message {message.id} failed; it will be retried")
+            continue
+        queue.delete(message)
+        processed += 1
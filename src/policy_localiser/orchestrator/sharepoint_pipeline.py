@@ -1,14 +1,48 @@
 import logging
+import math
 import tempfile
 import uuid
+from collections import Counter
 from pathlib import Path
-from typing import List, Optional
+from typing import Callable, Dict, List, Optional, Set, Tuple
 
 from ..engine.models import ProcessingResult, ProcessingStatus, SchoolRecord
-from ..engine.renderer import PolicyRenderer
+from ..engine.renderer import PolicyRenderer, TemplateCache
 from ..engine.validator import TemplateValidator
+from ..graph.client import GraphClient
+from ..graph.quickxor import quick_xor_hash
 from ..graph.sharepoint_files import SharePointFiles
 from ..graph.sharepoint_lists import SharePointLists
+from .asset_cache import AssetCache
+from .checkpoint import RunCheckpoint
+from .deadline import Deadline
+from .history import RunHistory
+from .planning import (
+    DEFAULT_REQUEST_SECONDS,
+    DEFAULT_UPLOAD_SECONDS,
+    SKIP,
+    UPLOAD,
+    PlannedItem,
+    RunPlan,
+)
+from .progress import RUN_FINISHED, RUN_STARTED, ProgressEmitter
+from .run_status import RunTracker
+from .scheduling import (
+    STRATEGIES,
+    CostModel,
+    ScheduleReport,
+    order_work,
+    simulate_makespan,
+)
+from .incremental import DirectoryState, RenderPlanner, apply_delta
+from .sinks import DocumentSink, SharePointLibrarySink
+from .stages import (
+    OncePerKey,
+    StagedPipeline,
+    WorkItem,
+    check_validation,
+    log_summary,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -20,24 +54,154 @@ class SharePointPipeline:
     LOGOS_LIBRARY = "School Logos"
     OUTPUT_LIBRARY = "Localised Policies"
 
-    def __init__(self, sp_lists: SharePointLists, sp_files: SharePointFiles):
+    def __init__(
+        self,
+        sp_lists: SharePointLists,
+        sp_files: SharePointFiles,
+        checkpoint_dir: Optional[Path] = None,
+        asset_cache: Optional[AssetCache] = None,
+        history: Optional[RunHistory] = None,
+        workers: int = 1,
+        scheduling: str = "lpt",
+        progress: Optional[ProgressEmitter] = None,
+        upload_workers: Optional[int] = None,
+        sink: Optional[DocumentSink] = None,
+    ):
         self._sp_lists = sp_lists
         self._sp_files = sp_files
-        self._renderer = PolicyRenderer()
+        self._template_cache = TemplateCache()
+        self._renderer = PolicyRenderer(self._template_cache)
+        self._checkpoint_dir = checkpoint_dir
+        self._asset_cache = asset_cache
+        self._history = history
+        self._workers = max(1, workers)
+        # Threads each for fetching logos, uploading and writing log entries
+        self._upload_workers = max(1, upload_workers or self._workers)
+        # Replaces uploading to the output library, e.g. NullSink in benchmarks
+        self._sink = sink
+        if scheduling not in STRATEGIES:
+            raise ValueError(f"Unknown scheduling strategy '{scheduling}'")
+        self._scheduling = scheduling
+        self._progress = progress or ProgressEmitter()
+        # {folder name: item ID} from the last run's folder reconciliation
+        self.folder_ids: Dict[str, str] = {}
+        # The School Directory as the last run saw it (after the school
+        # filter), including schools that had nothing to render, e.g. for
+        # sharing every school's folder after an incremental or resumed run
+        self.schools: List[SchoolRecord] = []
+        # ID of the current (or last) run; pass it as resume= to continue it
+        self.run_id: Optional[str] = None
+        # How the last run's work was ordered and its estimated makespan
+        self.schedule_report: Optional[ScheduleReport] = None
+        # (school code, template) pairs the last run left for lack of time,
+        # and the run ID to resume them with
+        self.deferred: List[Tuple[str, str]] = []
+        self.continuation: Optional[str] = None
 
     def run(
         self,
         school_filter: Optional[List[str]] = None,
         template_filter: Optional[List[str]] = None,
+        schools: Optional[List[SchoolRecord]] = None,
+        pair_filter: Optional[Callable[[SchoolRecord, Path], bool]] = None,
+        resume: Optional[str] = None,
+        run_id: Optional[str] = None,
+        deadline: Optional[Deadline] = None,
+        tracker: Optional[RunTracker] = None,
     ) -> List[ProcessingResult]:
-        run_id = str(uuid.uuid4())[:8]
-        results: List[ProcessingResult] = []
+        """Render and upload documents for every (school, template) pair.
+
+        schools overrides reading the School Directory; pair_filter narrows
+        the run to the pairs for which it returns True. run_id joins an
+        existing run (e.g. one shard of a coordinated run) instead of
+        starting a new one.
+
+        With a checkpoint_dir, each finished pair is checkpointed as it
+        completes. resume=<run_id> continues that run with its original
+        filters (and, for a run with a pair_filter, its original pairs),
+        skipping (and not downloading for) finished pairs; pairs that
+        failed are retried.
+
+        With a deadline, documents are only started while their estimated
+        time still fits; the rest are listed in deferred and, with a
+        checkpoint_dir, continuation holds the run ID to resume them with.
+
+        A tracker is told the document count and each result as it
+        finishes, for status requests while the run is in progress.
+        """
+        checkpoint = None
+        if resume:
+            if self._checkpoint_dir is None:
+                raise RuntimeError("Cannot resume: no checkpoint directory configured")
+            checkpoint = RunCheckpoint.load(self._checkpoint_dir, resume)
+            run_id = resume
+            school_filter = school_filter or checkpoint.school_filter
+            template_filter = template_filter or checkpoint.template_filter
+            pairs = checkpoint.pairs
+            if pairs is not None and pair_filter is None:
+
+                def in_pairs(school: SchoolRecord, path: Path) -> bool:
+                    return (school.SchoolCode, path.stem) in pairs
+
+                pair_filter = in_pairs
+        else:
+            run_id = run_id or str(uuid.uuid4())[:8]
+            if self._checkpoint_dir is not None:
+                checkpoint = RunCheckpoint.create(
+                    self._checkpoint_dir, run_id, school_filter, template_filter
+                )
+        self.run_id = run_id
+        self.schedule_report = None
+        self.deferred = []
+        self.continuation = None
+        if self._history is not None:
+            self._history.start_run(run_id, school_filter, template_filter)
+
+        try:
+            results = self._run(
+                run_id, school_filter, template_filter, schools, pair_filter,
+                checkpoint, deadline, tracker,
+            )
+            if self._history is not None:
+                self._history.finish_run(run_id)
+            if self._progress.enabled:
+                counts = Counter(r.status.value for r in results)
+                self._progress.emit(
+                    RUN_FINISHED, run_id,
+                    counts=dict(counts), deferred=len(self.deferred),
+                    continuation=self.continuation,
+                )
+            return results
+        except Exception as e:
+            self._progress.emit(RUN_FINISHED, run_id, error=str(e))
+            raise
+        finally:
+            if checkpoint is not None:
+                checkpoint.close()
+
+    def _run(
+        self,
+        run_id: str,
+        school_filter: Optional[List[str]],
+        template_filter: Optional[List[str]],
+        schools: Optional[List[SchoolRecord]],
+        pair_filter: Optional[Callable[[SchoolRecord, Path], bool]],
+        checkpoint: Optional[RunCheckpoint],
+        deadline: Optional[Deadline],
+        tracker: Optional[RunTracker],
+    ) -> List[ProcessingResult]:
+        done = checkpoint.completed_pairs() if checkpoint else set()
+        results: List[ProcessingResult] = (
+            checkpoint.completed_results() if checkpoint else []
+        )
 
         # Step 1: Get school data
-        logger.info("Fetching school directory from SharePoint...")
-        schools = self._sp_lists.get_schools()
+        if schools is None:
+            logger.info("Fetching school directory from SharePoint...")
+            schools = self._sp_lists.get_schools()
         if school_filter:
             schools = [s for s in schools if s.SchoolCode in school_filter]
+        self.schools = schools
         logger.info(f"Processing {len(schools)} school(s)")
 
         # Step 2: Resolve drive IDs
@@ -54,96 +218,430 @@ class SharePointPipeline:
             logo_dir.mkdir()
             out_dir.mkdir()
 
-            # Step 3: Download templates
+            # Step 3: Download templates that still have work
             logger.info("Downloading policy templates...")
-            template_items = self._sp_files.list_files(templates_drive)
+            template_items = [
+                item for item in self._sp_files.list_files(templates_drive)
+                if item["name"].endswith(".docx")
+                and (not template_filter or Path(item["name"]).stem in template_filter)
+                and not all(
+                    (s.SchoolCode, Path(item["name"]).stem) in done for s in schools
+                )
+                and (
+                    checkpoint is None
+                    or checkpoint.pairs is None
+                    or any(stem == Path(item["name"]).stem for _, stem in checkpoint.pairs)
+                )
+            ]
             for item in template_items:
-                if item["name"].endswith(".docx"):
+                if self._asset_cache is not None:
+                    self._asset_cache.fetch(
+                        self._sp_files, templates_drive, item, tmpl_dir / item["name"]
+                    )
+                else:
                     self._sp_files.download_file(
                         templates_drive, item["id"], tmpl_dir / item["name"]
                     )
-            logger.info(f"Downloaded {len(list(tmpl_dir.glob('*.docx')))} template(s)")
+            logger.info(f"Downloaded {len(template_items)} template(s)")
+
+            templates = sorted(tmpl_dir.glob("*.docx"))
+
+            work = [
+                (school, template_path)
+                for school in schools
+                for template_path in templates
+                if (school.SchoolCode, template_path.stem) not in done
+                and (pair_filter is None or pair_filter(school, template_path))
+            ]
+            if pair_filter is not None or done:
+                codes = {school.SchoolCode for school, _ in work}
+                schools = [s for s in schools if s.SchoolCode in codes]
+            if (
+                pair_filter is not None
+                and checkpoint is not None
+                and checkpoint.pairs is None
+            ):
+                # A resume must redo the remaining pairs, not the whole directory
+                checkpoint.record_pairs(
+                    {(school.SchoolCode, path.stem) for school, path in work}
+                )
+            if tracker is not None:
+                tracker.begin(len(work) + len(results), results)
+            if not work:
+                logger.info(f"Run {run_id}: nothing to process")
+                return results
 
-            # Step 4: Download logos
-            logger.info("Downloading school logos...")
-            for school in schools:
+            # Step 4: Validate, against the logo library's listing; each
+            # school's logo is downloaded by the fetch stage when first needed
+            logo_items = {
+                item["name"]: item for item in self._sp_files.list_files(logos_drive)
+            }
+            validator = TemplateValidator(self._template_cache)
+            check_validation(
+                validator.validate_templates(templates)
+                + validator.validate_names(
+                    [t.name for t in templates], logo_items, schools
+                )
+            )
+
+            # Step 5: Process and upload
+            costs = CostModel(self._history).estimate(templates)
+            ordered, report = order_work(
+                work, costs, self._scheduling, self._workers
+            )
+            self.schedule_report = report
+            total = len(work)
+            logger.info(
+                f"Starting run {run_id}: {len(schools)} school(s) x "
+                f"{len(templates)} template(s), {total} document(s)"
+                + (f", {len(done)} already done" if done else "")
+            )
+            logger.info(report.summary())
+            progress = self._progress
+            if progress.enabled:
+                progress.emit(
+                    RUN_STARTED, run_id,
+                    total=total + len(done), done=len(done),
+                    schools=len(schools), templates=len(templates),
+                    workers=self._workers,
+                )
+
+            # Input fingerprints, recorded with each result
+            template_hashes = {
+                t.stem: quick_xor_hash(t.read_bytes()) for t in templates
+            }
+            logos = OncePerKey()
+
+            def fetch_logo(school: SchoolRecord) -> str:
                 logo_name = f"{school.SchoolCode}.png"
-                try:
+                local_path = logo_dir / logo_name
+                if self._asset_cache is not None:
+                    self._asset_cache.fetch(
+                        self._sp_files, logos_drive, logo_items[logo_name], local_path
+                    )
+                else:
                     self._sp_files.download_file_by_name(
-                        logos_drive, logo_name, logo_dir / logo_name
+                        logos_drive, logo_name, local_path
                     )
+                return quick_xor_hash(local_path.read_bytes())
+
+            def fetch(item: WorkItem) -> dict:
+                school = item.school
+                logo_hash = logos.get(school.SchoolCode, lambda: fetch_logo(school))
+                return {
+                    "template_hash": template_hashes[item.template_path.stem],
+                    "logo_hash": logo_hash,
+                    "school_hash": school.content_hash,
+                }
+
+            # A sink passed to the pipeline is the caller's to close
+            sink = self._sink
+            if sink is None:
+                folder_ids = self._sp_files.reconcile_folders(
+                    output_drive, [s.folder_name for s in schools]
+                )
+                self.folder_ids = folder_ids
+                sink = SharePointLibrarySink(
+                    out_dir, self._sp_files, output_drive, folder_ids, progress
+                )
+
+            # Per-document time beyond rendering: compare, upload, log entry
+            stage_means = self._history.stage_means() if self._history else {}
+            overhead = (
+                stage_means.get("compare", 0.0)
+                + stage_means.get("upload", DEFAULT_UPLOAD_SECONDS)
+                + DEFAULT_REQUEST_SECONDS
+            )
+
+            def admit(item: WorkItem) -> bool:
+                return deadline is None or deadline.admits(
+                    costs[item.template_path.stem][0] + overhead
+                )
+
+            def record(result: ProcessingResult) -> None:
+                # Logged as it finishes, so a run stopped early (or resumed)
+                # never loses or repeats entries
+                try:
+                    self._sp_lists.write_processing_log_entry(result)
                 except Exception as e:
                     logger.error(
-                        f"Failed to download logo for {school.SchoolCode}: {e}"
+                        f"  Failed to write Processing Log entry: {e}"
                     )
+                if checkpoint is not None:
+                    checkpoint.record(result)
+                if self._history is not None:
+                    self._history.record(result)
+                if tracker is not None:
+                    tracker.record(result)
 
-            # Step 5: Validate
-            templates = sorted(tmpl_dir.glob("*.docx"))
-            if template_filter:
-                templates = [t for t in templates if t.stem in template_filter]
-
-            validator = TemplateValidator()
-            errors = validator.validate(templates, logo_dir, schools)
-            blocking = [e for e in errors if e.severity == "error"]
-            if blocking:
-                for err in blocking:
-                    logger.error(str(err))
-                raise RuntimeError(
-                    f"Validation failed with {len(blocking)} error(s)"
+            # Results stay in school-then-template order whatever the schedule
+            position = {
+                (school.SchoolCode, template_path.stem): index
+                for index, (school, template_path) in enumerate(work)
+            }
+            stages = StagedPipeline(
+                self._renderer,
+                sink,
+                run_id,
+                fetch=fetch,
+                admit=admit,
+                record=record,
+                progress=progress,
+                fetch_workers=self._upload_workers,
+                render_workers=self._workers,
+                sink_workers=self._upload_workers,
+                log_workers=self._upload_workers,
+            )
+            try:
+                results.extend(stages.run(
+                    [
+                        WorkItem(
+                            position[(school.SchoolCode, template_path.stem)],
+                            school,
+                            template_path,
+                            logo_dir / f"{school.SchoolCode}.png",
+                        )
+                        for school, template_path in ordered
+                    ],
+                    done=len(done),
+                ))
+            finally:
+                if sink is not self._sink:
+                    sink.close()
+                self.deferred = [
+                    (item.school.SchoolCode, item.template_path.stem)
+                    for item in stages.deferred
+                ]
+
+        log_summary(run_id, results)
+        if self.deferred:
+            if checkpoint is not None:
+                self.continuation = run_id
+                logger.warning(
+                    f"Run {run_id} stopped at its deadline: "
+                    f"{len(self.deferred)} document(s) deferred; "
+                    f"resume with run ID {run_id}"
+                )
+            else:
+                logger.warning(
+                    f"Run {run_id} stopped at its deadline: "
+                    f"{len(self.deferred)} document(s) deferred; no checkpoint "
+                    "directory is configured, so they need a new run"
                 )
 
-            # Step 6: Process and upload
-            total = len(schools) * len(templates)
-            processed = 0
-            logger.info(
-                f"Starting run {run_id}: {len(schools)} school(s) x "
-                f"{len(templates)} template(s) = {total} document(s)"
+        return results
+
+    def plan(
+        self,
+        school_filter: Optional[List[str]] = None,
+        template_filter: Optional[List[str]] = None,
+        resume: Optional[str] = None,
+    ) -> RunPlan:
+        """Dry run: predict what run() would do, using only read-only calls.
+
+        Templates and logos are validated from library listings, and each
+        document is predicted as uploaded or skipped by comparing SharePoint's
+        current hash with the run history's record of the inputs that
+        produced it. Request counts mirror the calls run() makes.
+        """
+        done: Set[Tuple[str, str]] = set()
+        pairs: Optional[Set[Tuple[str, str]]] = None
+        if resume:
+            if self._checkpoint_dir is None:
+                raise RuntimeError("Cannot resume: no checkpoint directory configured")
+            checkpoint = RunCheckpoint.load(self._checkpoint_dir, resume)
+            done = checkpoint.completed_pairs()
+            school_filter = school_filter or checkpoint.school_filter
+            template_filter = template_filter or checkpoint.template_filter
+            pairs = checkpoint.pairs
+
+        all_schools = self._sp_lists.get_schools()
+        schools = [
+            s for s in all_schools if not school_filter or s.SchoolCode in school_filter
+        ]
+        templates_drive = self._sp_files.get_drive_id(self.TEMPLATES_LIBRARY)
+        logos_drive = self._sp_files.get_drive_id(self.LOGOS_LIBRARY)
+        output_drive = self._sp_files.get_drive_id(self.OUTPUT_LIBRARY)
+
+        template_items = {
+            Path(item["name"]).stem: item
+            for item in self._sp_files.list_files(templates_drive)
+            if item["name"].endswith(".docx")
+            and (not template_filter or Path(item["name"]).stem in template_filter)
+        }
+        logo_items = {
+            item["name"]: item for item in self._sp_files.list_files(logos_drive)
+        }
+
+        work = [
+            (school, Path(template_items[stem]["name"]))
+            for school in schools
+            for stem in sorted(template_items)
+            if (school.SchoolCode, stem) not in done
+            and (pairs is None or (school.SchoolCode, stem) in pairs)
+        ]
+        codes = {school.SchoolCode for school, _ in work}
+        schools = [s for s in schools if s.SchoolCode in codes]
+        stems = {template.stem for _, template in work}
+
+        validation = TemplateValidator().validate_names(
+            [template_items[stem]["name"] for stem in stems], logo_items, schools
+        )
+
+        # Current output state: which folders exist and their file hashes
+        existing = {
+            item["name"].casefold(): item["id"]
+            for item in self._sp_files.list_files(output_drive)
+            if "folder" in item
+        }
+        remote_hashes = {
+            s.folder_name: self._sp_files.list_folder_hashes(
+                output_drive, existing[s.folder_name.casefold()]
             )
+            for s in schools
+            if s.folder_name.casefold() in existing
+        }
 
-            for school in schools:
-                folder_name = school.folder_name
-                self._sp_files.ensure_folder(output_drive, folder_name)
+        def item_hash(item: Optional[dict]) -> str:
+            return (item or {}).get("file", {}).get("hashes", {}).get("quickXorHash", "")
 
-                school_out = out_dir / folder_name
-                logo_path = logo_dir / f"{school.SchoolCode}.png"
+        stage_means = self._history.stage_means() if self._history else {}
+        upload_seconds = stage_means.get("upload", DEFAULT_UPLOAD_SECONDS)
+        compare_seconds = stage_means.get("compare", 0.0)
+        costs = CostModel(self._history).estimate_measures(
+            {stem: float(template_items[stem].get("size", 0)) for stem in stems}
+        )
 
-                for template_path in templates:
-                    processed += 1
-                    output_file = school_out / template_path.name
-                    logger.info(
-                        f"[{processed}/{total}] "
-                        f"{school.SchoolCode} / {template_path.stem}"
-                    )
+        items: List[PlannedItem] = []
+        for school, template in work:
+            remote = remote_hashes.get(school.folder_name, {}).get(template.name)
+            last = (
+                self._history.last_success(school.SchoolCode, template.stem)
+                if self._history is not None and remote
+                else None
+            )
+            unchanged = last is not None and (
+                last.output_hash == remote
+                and last.template_hash == item_hash(template_items[template.stem])
+                and last.logo_hash == item_hash(logo_items.get(f"{school.SchoolCode}.png"))
+                and last.school_hash == school.content_hash
+            )
+            seconds = costs[template.stem][0] + compare_seconds
+            if not unchanged:
+                seconds += upload_seconds
+            items.append(PlannedItem(
+                school.SchoolCode,
+                template.stem,
+                SKIP if unchanged else UPLOAD,
+                round(seconds, 3),
+            ))
 
-                    result = self._renderer.render(
-                        template_path=template_path,
-                        logo_path=logo_path,
-                        school=school,
-                        output_path=output_file,
-                        run_id=run_id,
-                    )
-                    results.append(result)
-
-                    if result.status == ProcessingStatus.SUCCESS:
-                        file_bytes = output_file.read_bytes()
-                        self._sp_files.upload_file(
-                            output_drive,
-                            folder_name,
-                            template_path.name,
-                            file_bytes,
-                        )
-                    else:
-                        logger.error(f"  FAILED: {result.error_message}")
+        # Order as run() would and schedule the per-item times over workers
+        ordered, schedule = order_work(
+            [(index, template) for index, (_, template) in enumerate(work)],
+            costs, self._scheduling, self._workers,
+        )
+        makespan = simulate_makespan(
+            [items[i].estimated_seconds for i, _ in ordered], self._workers
+        )
+        schedule.estimated_makespan = makespan
+        schedule.estimated_total = sum(item.estimated_seconds for item in items)
+
+        uploads = sum(1 for item in items if item.action == UPLOAD)
+        missing = sum(1 for s in schools if s.folder_name.casefold() not in existing)
+        requests = Counter({
+            "GET /sites/{site}/lists": 2,
+            "GET /sites/{site}/lists/{list}/items": max(1, math.ceil(len(all_schools) / 100)),
+            "GET /sites/{site}/drives": 1,
+            "GET /drives/{drive}/root/children": 3,
+            "GET /drives/{drive}/items/{item}/children": len(schools),
+            "GET /drives/{drive}/items/{item}/content": len(stems),
+            "GET /drives/{drive}/root:/{name}:/content": len(schools),
+            "POST /$batch": math.ceil(missing / GraphClient.BATCH_LIMIT),
+            # Batched folder creates, counted against throttling individually
+            "POST /drives/{drive}/root/children": missing,
+            "PUT /drives/{drive}/items/{item}:/{name}:/content": uploads,
+            "POST /sites/{site}/lists/{list}/items": len(work),
+        } if work else {})
+        requests = Counter({k: v for k, v in requests.items() if v})
+        # Everything but the uploads runs one call at a time; folder creates
+        # ride inside the $batch calls
+        sequential = sum(requests.values()) - uploads - missing
+
+        return RunPlan(
+            schools=len(schools),
+            templates=len(stems),
+            items=items,
+            request_counts=dict(requests),
+            estimated_seconds=sequential * DEFAULT_REQUEST_SECONDS + makespan,
+            schedule=schedule if work else None,
+            validation=validation,
+            already_done=len(done),
+        )
 
-            # Step 7: Write processing log
-            logger.info("Writing processing log to SharePoint...")
-            self._sp_lists.write_processing_log(results)
+    def run_incremental(
+        self,
+        state_path: Path,
+        template_filter: Optional[List[str]] = None,
+        deadline: Optional[Deadline] = None,
+        run_id: Optional[str] = None,
+        tracker: Optional[RunTracker] = None,
+    ) -> List[ProcessingResult]:
+        """Re-render only what School Directory or logo changes affect.
+
+        Reads the directory through the delta API using the delta link
+        stored at state_path, diffs changed items against the stored
+        snapshot, and runs the minimal set of (school, template) pairs.
+        The state is only advanced when the run has no failures, so failed
+        pairs are picked up again next time, as are pairs deferred by the
+        deadline. The first run is a full run.
+        """
+        self.deferred = []
+        state = DirectoryState.load(state_path)
+        delta = self._sp_lists.get_school_changes(state.delta_link)
+        changed = apply_delta(state, delta)
+
+        logos_drive = self._sp_files.get_drive_id(self.LOGOS_LIBRARY)
+        logo_tags = {
+            Path(item["name"]).stem: item.get("cTag", "")
+            for item in self._sp_files.list_files(logos_drive)
+            if item["name"].lower().endswith(".png")
+        }
+        logo_changed = {
+            code for code, tag in logo_tags.items()
+            if state.logo_tags.get(code) != tag
+        }
 
-        success = sum(1 for r in results if r.status == ProcessingStatus.SUCCESS)
-        failed = sum(1 for r in results if r.status == ProcessingStatus.ERROR)
+        planner = RenderPlanner(changed, logo_changed)
+        schools = [s for s in state.schools() if s.SchoolCode in planner.school_codes]
         logger.info(
-            f"Run {run_id} complete: {success} succeeded, "
-            f"{failed} failed out of {total}"
+            f"{len(changed)} school(s) with data changes, "
+            f"{len(logo_changed)} with logo changes"
         )
 
+        results: List[ProcessingResult] = []
+        if schools:
+            results = self.run(
+                template_filter=template_filter,
+                schools=schools,
+                pair_filter=planner.needs_render,
+                run_id=run_id,
+                deadline=deadline,
+                tracker=tracker,
+            )
+
+        if self.deferred:
+            logger.warning(
+                "Run stopped at its deadline; directory state not advanced so "
+                "deferred documents are picked up next time"
+            )
+        elif any(r.status == ProcessingStatus.ERROR for r in results):
+            logger.warning(
+                "Run had failures; directory state not advanced so they are retried"
+            )
+        else:
+            state.logo_tags = logo_tags
+            state.save(state_path)
+        # The whole directory, not just the changed schools run() was given
+        self.schools = state.schools()
         return results
@@ -0,0 +1,156 @@
+"""Where a StagedPipeline puts rendered documents.
+
+A sink chooses the path each document is rendered to (target) and is
+handed every successfully rendered document (write), possibly from several
+sink threads at once. write may change the result's status, e.g. to
+SKIPPED when SharePoint already has identical content, or to ERROR.
+A pipeline closes the sinks it creates itself; a sink passed to a
+pipeline is the caller's to close.
+"""
+
+import logging
+import threading
+import time
+import zipfile
+from pathlib import Path
+from typing import Dict, Optional
+
+from ..engine.models import ProcessingStatus
+from ..graph.quickxor import quick_xor_hash
+from ..graph.sharepoint_files import SharePointFiles
+from .progress import UPLOAD_DONE, ProgressEmitter
+from .stages import OncePerKey, WorkItem
+
+logger = logging.getLogger(__name__)
+
+
+class DocumentSink:
+    """Base sink: renders under staging_dir and discards the result."""
+
+    def __init__(self, staging_dir: Path):
+        self._staging_dir = Path(staging_dir)
+
+    def prepare(self, item: WorkItem) -> None:
+        """Called by the fetch stage, ahead of rendering the item."""
+
+    def target(self, item: WorkItem) -> Path:
+        return self._staging_dir / item.school.folder_name / item.template_path.name
+
+    def write(self, item: WorkItem) -> None:
+        item.output_path.unlink(missing_ok=True)
+
+    def close(self) -> None:
+        pass
+
+
+class NullSink(DocumentSink):
+    """Discards every document, for benchmarking the other stages."""
+
+
+class LocalDirectorySink(DocumentSink):
+    """Renders straight into <output_dir>/<school folder>/<template>.docx."""
+
+    def write(self, item: WorkItem) -> None:
+        pass
+
+
+class ZipBundleSink(DocumentSink):
+    """Collects every document in one zip, one folder per school."""
+
+    def __init__(self, staging_dir: Path, zip_path: Path):
+        super().__init__(staging_dir)
+        self.path = Path(zip_path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._zip = zipfile.ZipFile(self.path, "w", zipfile.ZIP_DEFLATED)
+        self._lock = threading.Lock()
+
+    def write(self, item: WorkItem) -> None:
+        name = f"{item.school.folder_name}/{item.template_path.name}"
+        with self._lock:
+            # .docx files are already deflated
+            self._zip.write(item.output_path, name, zipfile.ZIP_STORED)
+        item.output_path.unlink()
+
+    def close(self) -> None:
+        with self._lock:
+            self._zip.close()
+
+
+class SharePointLibrarySink(DocumentSink):
+    """Uploads to a document library, skipping documents it already has.
+
+    folder_ids maps school folder names to item IDs (from reconciling the
+    output folders). Each folder's current hashes are listed once, by the
+    fetch stage of the first document for it.
+    """
+
+    def __init__(
+        self,
+        staging_dir: Path,
+        sp_files: SharePointFiles,
+        drive_id: str,
+        folder_ids: Dict[str, str],
+        progress: Optional[ProgressEmitter] = None,
+    ):
+        super().__init__(staging_dir)
+        self._sp_files = sp_files
+        self._drive_id = drive_id
+        self._folder_ids = folder_ids
+        self._progress = progress or ProgressEmitter()
+        self._remote_hashes = OncePerKey()
+
+    def remote_hashes(self, folder_name: str) -> Dict[str, str]:
+        """{file name: quickXorHash} currently in a school's folder."""
+        folder_id = self._folder_ids.get(folder_name)
+        return self._remote_hashes.get(
+            folder_name,
+            lambda: (
+                self._sp_files.list_folder_hashes(self._drive_id, folder_id)
+                if folder_id
+                else {}
+            ),
+        )
+
+    def prepare(self, item: WorkItem) -> None:
+        self.remote_hashes(item.school.folder_name)
+
+    def write(self, item: WorkItem) -> None:
+        result = item.result
+        folder_name = item.school.folder_name
+        output_file = item.output_path
+        start = time.monotonic()
+        remote = self.remote_hashes(folder_name)
+
+        file_bytes = output_file.read_bytes()
+        local_hash = quick_xor_hash(file_bytes)
+        result.output_hash = local_hash
+        result.timings["compare"] = round(time.monotonic() - start, 3)
+        if remote.get(output_file.name) == local_hash:
+            result.status = ProcessingStatus.SKIPPED
+            logger.info("  Unchanged, upload skipped")
+            return
+
+        start = time.monotonic()
+        uploaded = self._sp_files.upload_file(
+            self._drive_id,
+            folder_name,
+            output_file.name,
+            file_bytes,
+            folder_id=self._folder_ids.get(folder_name),
+        )
+        result.timings["upload"] = round(time.monotonic() - start, 3)
+        if self._progress.enabled:
+            self._progress.emit(
+                UPLOAD_DONE, result.run_id, result.school_code, result.policy_name,
+                seconds=result.timings["upload"], bytes=len(file_bytes),
+            )
+        uploaded_hash = (
+            uploaded.get("file", {}).get("hashes", {}).get("quickXorHash")
+        )
+        if uploaded_hash and uploaded_hash != local_hash:
+            result.status = ProcessingStatus.ERROR
+            result.error_message = (
+                f"Upload hash mismatch: local {local_hash}, "
+                f"SharePoint {uploaded_hash}"
+            )
+            logger.error(f"  FAILED: {result.error_message}")
@@ -0,0 +1,341 @@
+"""Shared document pipeline core: source -> fetch -> render -> sink -> log.
+
+Each stage runs on its own threads and hands documents to the next through
+a bounded queue, so a slow stage holds back the ones before it instead of
+piling up rendered files (backpressure), and network stages (fetching
+inputs, uploading, writing log entries) overlap with rendering. Both
+LocalPipeline and SharePointPipeline feed their ordered work through a
+StagedPipeline and differ only in their hooks and sink.
+
+A fetch failure fails that document; a render failure skips the sink.
+Any other exception (from the sink or the log hook) stops the run: no
+new documents start, those already rendered still go through the sink
+and log, and run() re-raises the first error.
+"""
+
+import logging
+import queue
+import threading
+from collections import Counter
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, Hashable, List, Optional, Sequence, TypeVar
+
+from ..engine.models import ProcessingResult, ProcessingStatus, SchoolRecord
+from ..engine.renderer import PolicyRenderer
+from ..engine.validator import ValidationError
+from ..metrics import ACTIVE_WORKERS, DOCUMENTS, QUEUE_DEPTH
+from .progress import ITEM_FINISHED, ITEM_STARTED, ProgressEmitter
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Marks the end of a stage's input
+_DONE = object()
+
+
+@dataclass
+class WorkItem:
+    """One (school, template) document on its way through the stages."""
+
+    # Position in school-then-template order; results are returned in it
+    index: int
+    school: SchoolRecord
+    template_path: Path
+    logo_path: Path
+    output_path: Optional[Path] = None
+    # Result fields set by the fetch stage, e.g. input hashes
+    attributes: dict = field(default_factory=dict)
+    result: Optional[ProcessingResult] = None
+    # Admitted and counted as active (rendering or later)
+    started: bool = False
+
+
+class OncePerKey:
+    """Runs a function once per key; concurrent callers for a key wait for
+    the first one and share its result (or exception)."""
+
+    def __init__(self):
+        self._futures: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, fn: Callable[[], T]) -> T:
+        with self._lock:
+            future = self._futures.get(key)
+            owner = future is None
+            if owner:
+                future = self._futures[key] = Future()
+        if owner:
+            try:
+                future.set_result(fn())
+            except Exception as e:
+                future.set_exception(e)
+        return future.result()
+
+
+def check_validation(errors: List[ValidationError]) -> None:
+    """Log validation findings; raise if any of them block the run."""
+    blocking = [e for e in errors if e.severity == "error"]
+    if blocking:
+        for err in blocking:
+            logger.error(str(err))
+        raise RuntimeError(
+            f"Validation failed with {len(blocking)} error(s). "
+            "Fix them before proceeding."
+        )
+    for warn in [e for e in errors if e.severity == "warning"]:
+        logger.warning(str(warn))
+
+
+def log_summary(run_id: str, results: List[ProcessingResult]) -> None:
+    counts = Counter(r.status for r in results)
+    logger.info(
+        f"Run {run_id} complete: {counts[ProcessingStatus.SUCCESS]} succeeded, "
+        f"{counts[ProcessingStatus.SKIPPED]} unchanged, "
+        f"{counts[ProcessingStatus.ERROR]} failed out of {len(results)}"
+    )
+
+
+class StagedPipeline:
+    """Runs documents through fetch, render, sink and log stages.
+
+    admit(item) is asked as each document reaches the fetch stage and
+    defers it when False, so a deferred document downloads nothing;
+    fetch(item) prepares an item's inputs (e.g. downloads its logo) and may
+    return a dict of attributes to set on the result, and the sink's
+    prepare(item) runs alongside it (e.g. to list what is already there);
+    record(result) is the log stage (Processing Log, checkpoint, history).
+    Per-stage thread counts are independent; queues between stages hold
+    queue_size items (default: twice the next stage's threads).
+    """
+
+    def __init__(
+        self,
+        renderer: PolicyRenderer,
+        sink,
+        run_id: str,
+        fetch: Optional[Callable[[WorkItem], Optional[dict]]] = None,
+        admit: Optional[Callable[[WorkItem], bool]] = None,
+        record: Optional[Callable[[ProcessingResult], None]] = None,
+        progress: Optional[ProgressEmitter] = None,
+        fetch_workers: int = 1,
+        render_workers: int = 1,
+        sink_workers: int = 1,
+        log_workers: int = 1,
+        queue_size: Optional[int] = None,
+    ):
+        self._renderer = renderer
+        self._sink = sink
+        self._run_id = run_id
+        self._fetch = fetch
+        self._admit = admit
+        self._record = record
+        self._progress = progress or ProgressEmitter()
+        self._workers = [
+            max(1, n) for n in (fetch_workers, render_workers, sink_workers, log_workers)
+        ]
+        self._queue_size = queue_size
+        self._lock = threading.Lock()
+        self._error: Optional[BaseException] = None
+        # Items deferred by admit, in the order they were turned away
+        self.deferred: List[WorkItem] = []
+
+    def run(
+        self, items: Sequence[WorkItem], done: int = 0, total: Optional[int] = None
+    ) -> List[ProcessingResult]:
+        """Process items in the given order; results come back by index.
+
+        done and total only feed the completed/total counts in progress
+        events (e.g. a resumed run counts what it finished before).
+        """
+        self.deferred = []
+        self._error = None
+        self._done = done
+        self._total = total if total is not None else done + len(items)
+        self._completed = 0
+        self._slots: Dict[int, ProcessingResult] = {}
+        self._waiting = len(items)
+        self._active = 0
+
+        names = ("fetch", "render", "sink", "log")
+        steps = (self._fetch_item, self._render_item, self._sink_item, self._log_item)
+        queues = [
+            queue.Queue(self._queue_size or 2 * n) for n in self._workers
+        ]
+        threads: List[threading.Thread] = []
+        for stage, (name, step, workers) in enumerate(zip(names, steps, self._workers)):
+            inbox = queues[stage]
+            outbox = queues[stage + 1] if stage + 1 < len(queues) else None
+            # The last thread of a stage to finish ends the next stage's input
+            remaining = [workers]
+            for n in range(workers):
+                thread = threading.Thread(
+                    target=self._stage,
+                    args=(step, inbox, outbox, remaining, stage),
+                    name=f"{name}-{n}",
+                    daemon=True,
+                )
+                thread.start()
+                threads.append(thread)
+
+        QUEUE_DEPTH.inc(len(items))
+        try:
+            # Source stage: feeds the schedule in order, blocking while the
+            # fetch queue is full
+            for item in items:
+                if self._error is not None:
+                    break
+                queues[0].put(item)
+            for _ in range(self._workers[0]):
+                queues[0].put(_DONE)
+            for thread in threads:
+                thread.join()
+        except BaseException as e:
+            self._fail(e)
+            raise
+        finally:
+            # Settle the gauges for documents dropped by a failed run
+            with self._lock:
+                QUEUE_DEPTH.dec(self._waiting)
+                ACTIVE_WORKERS.dec(self._active)
+                self._waiting = self._active = 0
+
+        if self._error is not None:
+            raise self._error
+        return [self._slots[i] for i in sorted(self._slots)]
+
+    def _fail(self, error: BaseException) -> None:
+        with self._lock:
+            if self._error is None:
+                self._error = error
+
+    def _stage(
+        self,
+        step: Callable[[WorkItem], Optional[WorkItem]],
+        inbox: queue.Queue,
+        outbox: Optional[queue.Queue],
+        remaining: List[int],
+        stage: int,
+    ) -> None:
+        while True:
+            item = inbox.get()
+            if item is _DONE:
+                break
+            # After a failure, only documents already rendered carry on
+            if self._error is not None and stage < 2:
+                self._drop(item)
+                continue
+            try:
+                item = step(item)
+            except BaseException as e:
+                self._fail(e)
+                self._drop(item)
+                continue
+            if item is not None and outbox is not None:
+                outbox.put(item)
+        with self._lock:
+            remaining[0] -= 1
+            last = remaining[0] == 0
+        if last and outbox is not None:
+            for _ in range(self._workers[stage + 1]):
+                outbox.put(_DONE)
+
+    def _drop(self, item: WorkItem) -> None:
+        with self._lock:
+            if item.started:
+                self._active -= 1
+                ACTIVE_WORKERS.dec()
+            else:
+                self._waiting -= 1
+                QUEUE_DEPTH.dec()
+
+    def _fetch_item(self, item: WorkItem) -> Optional[WorkItem]:
+        if self._admit is not None and not self._admit(item):
+            with self._lock:
+                self._waiting -= 1
+                self.deferred.append(item)
+            QUEUE_DEPTH.dec()
+            return None
+        try:
+            if self._fetch is not None:
+                item.attributes = self._fetch(item) or {}
+            self._sink.prepare(item)
+        except Exception as e:
+            logger.error(
+                f"Failed to fetch inputs for {item.school.SchoolCode} / "
+                f"{item.template_path.stem}: {e}"
+            )
+            item.result = ProcessingResult(
+                run_id=self._run_id,
+                run_date=datetime.now(timezone.utc),
+                school_code=item.school.SchoolCode,
+                policy_name=item.template_path.stem,
+                status=ProcessingStatus.ERROR,
+                error_message=str(e),
+            )
+        return item
+
+    def _render_item(self, item: WorkItem) -> WorkItem:
+        school, template_path = item.school, item.template_path
+        with self._lock:
+            self._waiting -= 1
+            self._active += 1
+            item.started = True
+        QUEUE_DEPTH.dec()
+        ACTIVE_WORKERS.inc()
+
+        progress = self._progress
+        if progress.enabled:
+            progress.emit(ITEM_STARTED, self._run_id, school.SchoolCode, template_path.stem)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"{school.SchoolCode} / {template_path.stem}")
+
+        if item.result is not None:
+            return item  # fetch failed; straight to the log
+        item.output_path = self._sink.target(item)
+        result = self._renderer.render(
+            template_path=template_path,
+            logo_path=item.logo_path,
+            school=school,
+            output_path=item.output_path,
+            run_id=self._run_id,
+        )
+        result.timings["render"] = result.duration_seconds
+        for name, value in item.attributes.items():
+            setattr(result, name, value)
+        item.result = result
+        if result.status == ProcessingStatus.ERROR:
+            logger.error(f"  FAILED: {result.error_message}")
+        return item
+
+    def _sink_item(self, item: WorkItem) -> WorkItem:
+        if item.result.status == ProcessingStatus.SUCCESS:
+            self._sink.write(item)
+        return item
+
+    def _log_item(self, item: WorkItem) -> None:
+        result = item.result
+        if self._record is not None:
+            self._record(result)
+        DOCUMENTS.inc(status=result.status.value)
+        with self._lock:
+            self._slots[item.index] = result
+            self._completed += 1
+            completed = self._done + self._completed
+            self._active -= 1
+        ACTIVE_WORKERS.dec()
+        if self._progress.enabled:
+            self._progress.emit(
+                ITEM_FINISHED, self._run_id, item.school.SchoolCode,
+                item.template_path.stem,
+                always=result.status == ProcessingStatus.ERROR,
+                status=result.status.value,
+                seconds=round(sum(result.timings.values()), 3),
+                timings=dict(result.timings),
+                error=result.error_message,
+                completed=completed,
+                total=self._total,
+            )
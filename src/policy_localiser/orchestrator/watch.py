@@ -0,0 +1,208 @@
+"""Re-render local documents when their inputs change (run_local --watch).
+
+The watcher polls the template directory, the logo directory and the
+schools JSON (stdlib only, so it behaves the same on every platform and
+on network drives). Once the files have been quiet for the debounce
+period it works out which documents the changes affect and renders just
+those, with the same LocalPipeline, so templates stay cached in memory
+and docxtpl stays imported between rounds.
+"""
+
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from ..engine.models import ProcessingResult, SchoolRecord
+from .pipeline import LocalPipeline
+
+logger = logging.getLogger(__name__)
+
+# path -> (mtime_ns, size)
+Snapshot = Dict[Path, Tuple[int, int]]
+
+
+def _is_temporary(path: Path) -> bool:
+    # Word's owner files (~$Policy.docx) and editors' save-in-progress files
+    return path.name.startswith(("~$", ".")) or path.suffix.lower() == ".tmp"
+
+
+class LocalWatcher:
+    """Polls local inputs and re-renders the documents that changed.
+
+    Every school is re-rendered for a changed or new template, and every
+    template for a school whose logo or schools JSON record changed.
+    Removed templates, logos and schools are reported; their documents are
+    left as they are. A burst of saves is acted on once, debounce seconds
+    after the last of them.
+    """
+
+    def __init__(
+        self,
+        pipeline: LocalPipeline,
+        template_dir: Path,
+        logo_dir: Path,
+        schools_json: Path,
+        output_dir: Path,
+        load_schools: Callable[[Path], List[SchoolRecord]],
+        template_filter: Optional[List[str]] = None,
+        school_filter: Optional[List[str]] = None,
+        debounce: float = 0.3,
+        poll_interval: float = 0.1,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._pipeline = pipeline
+        self._template_dir = Path(template_dir)
+        self._logo_dir = Path(logo_dir)
+        self._schools_json = Path(schools_json)
+        self._output_dir = Path(output_dir)
+        self._load_schools = load_schools
+        self._template_filter = template_filter
+        self._school_filter = school_filter
+        self._debounce = debounce
+        self._poll_interval = poll_interval
+        self._clock = clock
+        self._baseline: Snapshot = {}
+        self._latest: Snapshot = {}
+        self._changed_at: Optional[float] = None
+        self.schools: List[SchoolRecord] = []
+
+    def scan(self) -> Snapshot:
+        """Size and mtime of every input file."""
+        paths = [
+            *self._template_dir.glob("*.docx"),
+            *self._logo_dir.glob("*.png"),
+            self._schools_json,
+        ]
+        snapshot: Snapshot = {}
+        for path in paths:
+            if _is_temporary(path):
+                continue
+            try:
+                stat = path.stat()
+            except FileNotFoundError:  # deleted while scanning
+                continue
+            snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def start(self) -> List[ProcessingResult]:
+        """Render everything once and start watching from there."""
+        self._baseline = self._latest = self.scan()
+        self.schools = self._load_schools(self._schools_json)
+        results = self._render(None)
+        if results is None:
+            # Nothing rendered: the next change re-renders everything
+            self._baseline = {}
+            return []
+        return results
+
+    def poll(self) -> Optional[List[ProcessingResult]]:
+        """Check the inputs once; the results if documents were re-rendered."""
+        now = self._clock()
+        snapshot = self.scan()
+        if snapshot != self._latest:
+            self._latest = snapshot
+            self._changed_at = now
+            return None
+        if self._changed_at is None or now - self._changed_at < self._debounce:
+            return None
+
+        self._changed_at = None
+        schools = self.schools
+        affected = self.affected(self._baseline, snapshot)
+        if not affected:
+            self._baseline = snapshot
+            return None
+        results = self._render(affected)
+        if results is None:
+            # Not rendered: keep the old baseline (and schools) so the next
+            # change renders these documents too
+            self.schools = schools
+            return None
+        self._baseline = snapshot
+        return results
+
+    def affected(self, before: Snapshot, after: Snapshot) -> Set[Tuple[str, str]]:
+        """(school code, template name) pairs to render for these changes."""
+        changed = {p for p in after if before.get(p) != after[p]}
+        removed = set(before) - set(after)
+        for path in sorted(removed):
+            logger.info(f"Removed {path.name}; its documents are left as they are")
+
+        schools = self.schools
+        if self._schools_json in changed:
+            try:
+                schools = self._load_schools(self._schools_json)
+            except (OSError, ValueError, TypeError) as e:
+                # Probably saved half-way; the next save triggers a retry
+                logger.error(f"Cannot read {self._schools_json.name}: {e}")
+                schools = self.schools
+        old = {s.SchoolCode: s for s in self.schools}
+        self.schools = schools
+
+        templates = [p.stem for p in after if self._is_template(p)]
+        if self._template_filter:
+            templates = [t for t in templates if t in self._template_filter]
+        changed_templates = {p.stem for p in changed if self._is_template(p)}
+        changed_schools = {s.SchoolCode for s in schools if old.get(s.SchoolCode) != s}
+        changed_schools |= {p.stem for p in changed if self._is_logo(p)}
+        for code in sorted(set(old) - {s.SchoolCode for s in schools}):
+            logger.info(f"School {code} removed; its documents are left as they are")
+
+        if self._school_filter:
+            schools = [s for s in schools if s.SchoolCode in self._school_filter]
+        return {
+            (school.SchoolCode, template)
+            for school in schools
+            for template in templates
+            if template in changed_templates or school.SchoolCode in changed_schools
+        }
+
+    def _is_template(self, path: Path) -> bool:
+        return path.parent == self._template_dir and path.suffix == ".docx"
+
+    def _is_logo(self, path: Path) -> bool:
+        return path.parent == self._logo_dir and path.suffix == ".png"
+
+    def run(
+        self,
+        on_results: Callable[[List[ProcessingResult]], None],
+        stop: Optional[threading.Event] = None,
+    ) -> None:
+        """Poll until stop is set, passing each round's results to on_results."""
+        stop = stop or threading.Event()
+        logger.info(
+            f"Watching {self._template_dir}, {self._logo_dir} and "
+            f"{self._schools_json.name} (Ctrl+C to stop)"
+        )
+        while not stop.wait(self._poll_interval):
+            try:
+                results = self.poll()
+                if results is not None:
+                    on_results(results)
+            except Exception:
+                logger.exception("Watch round failed; still watching")
+
+    def _render(
+        self, only: Optional[Set[Tuple[str, str]]]
+    ) -> Optional[List[ProcessingResult]]:
+        """The round's results, or None if the run itself failed."""
+        if only is not None:
+            logger.info(f"Inputs changed: re-rendering {len(only)} document(s)")
+        try:
+            return self._pipeline.process_all(
+                template_dir=self._template_dir,
+                logo_dir=self._logo_dir,
+                output_dir=self._output_dir,
+                schools=self.schools,
+                template_filter=self._template_filter,
+                school_filter=self._school_filter,
+                only=only,
+            )
+        except RuntimeError as e:
+            # e.g. validation failed on a missing logo; keep watching
+            logger.error(str(e))
+        except Exception:
+            logger.exception("Re-rendering failed; still watching")
+        return None
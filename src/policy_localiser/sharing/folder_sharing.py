@@ -1,5 +1,8 @@
+import json
 import logging
-from typing import Dict, List
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
 
 from ..engine.models import SchoolRecord
 from ..graph.client import GraphClient
@@ -8,6 +11,52 @@ from ..graph.sharepoint_files import SharePointFiles
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class SharingLinks:
+    """SchoolCode -> sharing link, persisted as JSON between sharing passes.
+
+    Each entry records the folder item ID and scope the link was made for,
+    so a recreated folder or a different scope gets a fresh lookup.
+    """
+
+    links: Dict[str, dict] = field(default_factory=dict)
+
+    @classmethod
+    def load(cls, path: Path) -> "SharingLinks":
+        if not path.exists():
+            return cls()
+        return cls(links=json.loads(path.read_text(encoding="utf-8")))
+
+    def save(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        tmp.write_text(json.dumps(self.links, indent=2), encoding="utf-8")
+        tmp.replace(path)
+
+    def get(
+        self, school_code: str, scope: str, folder_id: Optional[str] = None
+    ) -> Optional[str]:
+        """Cached URL for the school, if made for this scope (and folder)."""
+        entry = self.links.get(school_code)
+        if not entry or entry.get("scope") != scope:
+            return None
+        if folder_id is not None and entry.get("folder_id") != folder_id:
+            return None
+        return entry.get("url")
+
+    def set(self, school_code: str, url: str, folder_id: str, scope: str) -> None:
+        self.links[school_code] = {"url": url, "folder_id": folder_id, "scope": scope}
+
+
+def matching_view_link(permissions: List[dict], scope: str) -> Optional[str]:
+    """URL of an existing view link with the given scope, if any."""
+    for perm in permissions:
+        link = perm.get("link") or {}
+        if link.get("type") == "view" and link.get("scope") == scope:
+            return link.get("webUrl")
+    return None
+
+
 class FolderSharing:
     """Creates sharing links for school output folders."""
 
@@ -65,18 +114,94 @@ class FolderSharing:
         output_drive_id: str,
         schools: List[SchoolRecord],
         scope: str = "organization",
+        folder_ids: Optional[Dict[str, str]] = None,
+        links_path: Optional[Path] = None,
     ) -> Dict[str, str]:
-        """Create sharing links for all school folders. Returns {SchoolCode: URL}."""
-        links = {}
+        """Share every school folder with a view link. Returns {SchoolCode: URL}.
+
+        Links already in the cache at links_path are used as they are. For
+        the rest, the folders' existing permissions are read (batched) and a
+        matching view link is reused; only folders without one get a new
+        link, created in the same batched way. folder_ids ({folder name:
+        item ID}, e.g. from the pipeline run) saves reconciling the output
+        library again.
+        """
+        cache = SharingLinks.load(links_path) if links_path else SharingLinks()
+        folder_ids = dict(folder_ids or {})
+
+        links: Dict[str, str] = {}
+        pending: List[SchoolRecord] = []
         for school in schools:
-            folder_name = school.folder_name
-            try:
-                folder_id = sp_files.ensure_folder(output_drive_id, folder_name)
-                link = self.create_view_link(output_drive_id, folder_id, scope)
-                links[school.SchoolCode] = link
-                logger.info(f"{school.SchoolCode}: {link}")
-            except Exception as e:
+            cached = cache.get(
+                school.SchoolCode, scope, folder_ids.get(school.folder_name)
+            )
+            if cached:
+                links[school.SchoolCode] = cached
+            else:
+                pending.append(school)
+        if links:
+            logger.info(f"{len(links)} sharing link(s) from cache")
+        if not pending:
+            return links
+
+        missing = [s.folder_name for s in pending if s.folder_name not in folder_ids]
+        if missing:
+            folder_ids.update(sp_files.reconcile_folders(output_drive_id, missing))
+        targets = []
+        for school in pending:
+            if school.folder_name in folder_ids:
+                targets.append((school, folder_ids[school.folder_name]))
+            else:
+                logger.error(
+                    f"Failed to share folder for {school.SchoolCode}: "
+                    f"folder '{school.folder_name}' could not be created"
+                )
+
+        # Reuse view links the folders already have
+        responses = self._client.batch([
+            {
+                "method": "GET",
+                "url": f"/drives/{output_drive_id}/items/{folder_id}/permissions",
+            }
+            for _, folder_id in targets
+        ])
+        to_create = []
+        for (school, folder_id), resp in zip(targets, responses):
+            existing = None
+            if resp.get("status") == 200:
+                existing = matching_view_link(resp["body"].get("value", []), scope)
+            if existing:
+                links[school.SchoolCode] = existing
+                cache.set(school.SchoolCode, existing, folder_id, scope)
+            else:
+                to_create.append((school, folder_id))
+        reused = len(targets) - len(to_create)
+
+        responses = self._client.batch([
+            {
+                "method": "POST",
+                "url": f"/drives/{output_drive_id}/items/{folder_id}/createLink",
+                "body": {"type": "view", "scope": scope},
+            }
+            for _, folder_id in to_create
+        ])
+        for (school, folder_id), resp in zip(to_create, responses):
+            url = (resp.get("body") or {}).get("link", {}).get("webUrl")
+            if resp.get("status") in (200, 201) and url:
+                links[school.SchoolCode] = url
+                cache.set(school.SchoolCode, url, folder_id, scope)
+                logger.info(f"{school.SchoolCode}: {url}")
+            else:
+                error = (resp.get("body") or {}).get("error", {}).get("message", "")
                 logger.error(
-                    f"Failed to share folder for {school.SchoolCode}: {e}"
+                    f"Failed to share folder for {school.SchoolCode}: "
+                    f"{resp.get('status')} {error}"
                 )
+
+        logger.info(
+            f"Sharing: {len(schools) - len(pending)} cached, {reused} existing "
+            f"link(s) reused, {len(to_create)} created"
+        )
+        if links_path:
+            cache.save(links_path)
         return links
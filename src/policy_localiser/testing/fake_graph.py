@@ -0,0 +1,600 @@
+"""In-process stand-in for the Microsoft Graph endpoints this project uses.
+
+Serves drives, document library files and folders, list items (including
+delta), sharing links, invitations and $batch over real HTTP on localhost,
+with state kept on the local filesystem:
+
+    <root>/drives/<library name>/<folder>/<file>
+    <root>/lists/<list name>.json
+    <root>/permissions.json
+
+Drives and lists seeded without a site are served for every site ID; to
+emulate several sites, seed with names from scoped(site_id, name), which
+only that site's /sites/{site}/drives and /sites/{site}/lists return.
+
+Latency, bandwidth, paging and 429/503 injection are configurable so the
+Graph layer and the SharePoint pipeline can be tested and benchmarked
+offline. Point a GraphClient at it with
+`GraphClient(FakeAuth(), base_url=server.base_url)`.
+"""
+
+import base64
+import json
+import logging
+import random
+import re
+import threading
+import time
+import uuid
+from collections import Counter
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, quote, unquote, urlencode, urlsplit
+
+from ..graph.quickxor import quick_xor_hash
+
+logger = logging.getLogger(__name__)
+
+DOCX_MIME = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+# Separates the site ID from the name in site-scoped drive and list names
+SITE_SEPARATOR = "~"
+
+
+@dataclass
+class FakeGraphConfig:
+    """Fault and performance knobs for FakeGraphServer."""
+
+    latency: float = 0.0  # seconds added to every HTTP request
+    latency_jitter: float = 0.0  # uniform extra 0..jitter seconds
+    bandwidth: Optional[float] = None  # bytes/second for bodies; None = unlimited
+    throttle_rate: float = 0.0  # probability of a 429 per request
+    unavailable_rate: float = 0.0  # probability of a 503 per request
+    retry_after: float = 1.0  # Retry-After seconds on injected failures
+    page_size: int = 100  # default $top for collections
+    seed: Optional[int] = None
+
+
+class FakeAuth:
+    """Token provider for clients talking to the fake server."""
+
+    def get_token(self) -> str:
+        return "fake-token"
+
+
+class GraphError(Exception):
+    def __init__(self, status: int, code: str, message: str = ""):
+        super().__init__(message or code)
+        self.status = status
+        self.code = code
+
+
+Response = Tuple[int, Dict[str, str], object]
+
+
+def _encode_id(value: str) -> str:
+    return base64.urlsafe_b64encode(value.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _decode_id(value: str) -> str:
+    padded = value + "=" * (-len(value) % 4)
+    try:
+        return base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8")
+    except (ValueError, UnicodeDecodeError):
+        raise GraphError(404, "itemNotFound", f"Unknown ID '{value}'")
+
+
+def _route_name(pattern: str) -> str:
+    """Readable endpoint template for a route regex, e.g. /drives/{drive}."""
+    name = re.sub(r"\(\?P<(\w+)>[^)]*\)", r"{\1}", pattern)
+    return name.replace("/sites/[^/]+", "/sites/{site}").replace("\\$", "$")
+
+
+class FakeGraphServer:
+    """Threaded localhost HTTP server emulating the Graph v1.0 API subset."""
+
+    def __init__(self, root: Path, config: Optional[FakeGraphConfig] = None):
+        self.root = Path(root)
+        self.config = config or FakeGraphConfig()
+        self.request_counts: Counter = Counter()
+        self._random = random.Random(self.config.seed)
+        self._lock = threading.RLock()
+        self._forced: List[int] = []
+        self._forced_batched: List[int] = []
+        self._httpd: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+        (self.root / "drives").mkdir(parents=True, exist_ok=True)
+        (self.root / "lists").mkdir(parents=True, exist_ok=True)
+        drive = r"/drives/(?P<drive>[^/]+)"
+        item = drive + r"/items/(?P<item>[^/:]+)"
+        items = r"/sites/[^/]+/lists/(?P<list_id>[^/]+)/items"
+        self._routes = [
+            ("GET", r"/sites/[^/]+/drives", self._list_drives),
+            ("GET", r"/sites/[^/]+/lists", self._find_lists),
+            ("GET", items + "/delta", self._list_delta),
+            ("GET", items, self._list_items),
+            ("POST", items, self._create_list_item),
+            ("GET", drive + "/root/children", self._children),
+            ("GET", item + "/children", self._children),
+            ("POST", drive + "/root/children", self._create_folder),
+            ("GET", item + "/content", self._download),
+            ("GET", drive + r"/root:/(?P<rel>.+):/content", self._download),
+            ("GET", drive + r"/root:/(?P<rel>.+)", self._get_item),
+            ("PUT", drive + r"/root:/(?P<rel>.+):/content", self._upload),
+            ("PUT", item + r":/(?P<rel>.+):/content", self._upload),
+            ("GET", item + "/permissions", self._permissions),
+            ("POST", item + "/createLink", self._create_link),
+            ("POST", item + "/invite", self._invite),
+            ("POST", r"/\$batch", self._batch),
+        ]
+        self._compiled = [
+            (method, re.compile(f"^{pattern}$"), _route_name(pattern), handler)
+            for method, pattern, handler in self._routes
+        ]
+
+    # -- lifecycle --------------------------------------------------------
+
+    @property
+    def base_url(self) -> str:
+        if self._httpd is None:
+            raise RuntimeError("Server not started")
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/v1.0"
+
+    def start(self) -> str:
+        """Start serving on a free localhost port. Returns base_url."""
+        server = self
+
+        class Handler(_Handler):
+            fake = server
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+        )
+        self._thread.start()
+        return self.base_url
+
+    def stop(self) -> None:
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+    def __enter__(self) -> "FakeGraphServer":
+        self.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def fail_next(self, count: int = 1, status: int = 429, batched: bool = False) -> None:
+        """Make the next `count` HTTP requests fail, or with batched=True the
+        next `count` sub-requests inside $batch calls."""
+        with self._lock:
+            (self._forced_batched if batched else self._forced).extend([status] * count)
+
+    # -- seeding and inspection -------------------------------------------
+
+    def add_drive(self, name: str) -> str:
+        (self.root / "drives" / name).mkdir(parents=True, exist_ok=True)
+        return self.drive_id(name)
+
+    @staticmethod
+    def drive_id(name: str) -> str:
+        return "b!" + _encode_id(name)
+
+    @staticmethod
+    def scoped(site_id: str, name: str) -> str:
+        """Seeding name for a drive or list that belongs to one site only."""
+        return f"{site_id}{SITE_SEPARATOR}{name}"
+
+    @staticmethod
+    def _site_view(path: str, names: List[str]) -> Dict[str, str]:
+        """{display name: stored name} visible to the site in a /sites/ path."""
+        prefix = path.split("/")[2] + SITE_SEPARATOR
+        scoped = {n[len(prefix):]: n for n in names if n.startswith(prefix)}
+        return scoped or {n: n for n in names if SITE_SEPARATOR not in n}
+
+    def put_file(self, drive: str, path: str, data: bytes) -> None:
+        target = self.root / "drives" / drive / path
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_bytes(data)
+
+    def delete_file(self, drive: str, path: str) -> None:
+        (self.root / "drives" / drive / path).unlink()
+
+    def read_file(self, drive: str, path: str) -> bytes:
+        return (self.root / "drives" / drive / path).read_bytes()
+
+    def files(self, drive: str) -> List[str]:
+        base = self.root / "drives" / drive
+        return sorted(
+            p.relative_to(base).as_posix() for p in base.rglob("*") if p.is_file()
+        )
+
+    def add_list(self, name: str, items: List[dict] = ()) -> None:
+        with self._lock:
+            data = {"version": 0, "items": {}}
+            self._save_list(name, data)
+            for fields in items:
+                self._add_item(name, fields)
+
+    def list_items(self, name: str) -> List[dict]:
+        data = self._load_list(name)
+        return [i["fields"] for i in data["items"].values() if not i.get("deleted")]
+
+    def update_list_item(self, name: str, item_id: str, fields: dict) -> None:
+        with self._lock:
+            data = self._load_list(name)
+            data["version"] += 1
+            item = data["items"][item_id]
+            item["fields"].update(fields)
+            item["version"] = data["version"]
+            self._save_list(name, data)
+
+    def delete_list_item(self, name: str, item_id: str) -> None:
+        with self._lock:
+            data = self._load_list(name)
+            data["version"] += 1
+            data["items"][item_id].update(deleted=True, version=data["version"])
+            self._save_list(name, data)
+
+    # -- request handling -------------------------------------------------
+
+    def handle(
+        self,
+        method: str,
+        raw_path: str,
+        body: bytes,
+        headers: Dict[str, str],
+        batched: bool = False,
+    ) -> Response:
+        """Dispatch one request (HTTP or batched) to its route."""
+        split = urlsplit(raw_path)
+        path = split.path
+        if path.startswith("/v1.0"):
+            path = path[len("/v1.0"):]
+        query = {k: v[0] for k, v in parse_qs(split.query).items()}
+
+        injected = self._injected_failure(batched)
+        if injected:
+            self.request_counts[f"{method} (injected {injected})"] += 1
+            return (
+                injected,
+                {"Retry-After": str(self.config.retry_after)},
+                {"error": {"code": "throttled", "message": "Injected failure"}},
+            )
+
+        for route_method, pattern, name, handler in self._compiled:
+            match = pattern.match(path)
+            if route_method != method or not match:
+                continue
+            self.request_counts[f"{method} {name}"] += 1
+            params = {k: unquote(v) for k, v in match.groupdict().items() if v}
+            try:
+                return handler(
+                    path=path, query=query, body=body, headers=headers, **params
+                )
+            except GraphError as e:
+                return e.status, {}, {"error": {"code": e.code, "message": str(e)}}
+        error = {"code": "invalidRequest", "message": f"No route {method} {path}"}
+        return 400, {}, {"error": error}
+
+    def _injected_failure(self, batched: bool) -> Optional[int]:
+        with self._lock:
+            forced = self._forced_batched if batched else self._forced
+            if forced:
+                return forced.pop(0)
+            roll = self._random.random()
+        if roll < self.config.throttle_rate:
+            return 429
+        if roll < self.config.throttle_rate + self.config.unavailable_rate:
+            return 503
+        return None
+
+    def simulate_transfer(self, num_bytes: int) -> None:
+        delay = self.config.latency
+        if self.config.latency_jitter:
+            delay += self._random.uniform(0, self.config.latency_jitter)
+        if self.config.bandwidth:
+            delay += num_bytes / self.config.bandwidth
+        if delay > 0:
+            time.sleep(delay)
+
+    def _page(self, path: str, query: dict, values: List[dict]) -> dict:
+        top = int(query.get("$top", self.config.page_size))
+        skip = int(query.get("$skiptoken", 0))
+        page = {"value": values[skip:skip + top]}
+        if skip + top < len(values):
+            next_query = {**query, "$top": str(top), "$skiptoken": str(skip + top)}
+            page["@odata.nextLink"] = f"{self.base_url}{path}?{urlencode(next_query)}"
+        return page
+
+    # -- sites, drives and items ------------------------------------------
+
+    def _list_drives(self, path, query, body, headers) -> Response:
+        drives = self._site_view(
+            path, [p.name for p in (self.root / "drives").iterdir() if p.is_dir()]
+        )
+        values = [
+            {"id": self.drive_id(stored), "name": name}
+            for name, stored in sorted(drives.items())
+        ]
+        return 200, {}, {"value": values}
+
+    def _drive_dir(self, drive: str) -> Path:
+        name = _decode_id(drive[2:]) if drive.startswith("b!") else None
+        base = self.root / "drives" / (name or "")
+        if not name or not base.is_dir():
+            raise GraphError(404, "itemNotFound", f"Drive '{drive}' not found")
+        return base
+
+    def _item_path(self, drive: str, item: Optional[str] = None, path: str = "") -> Path:
+        base = self._drive_dir(drive)
+        relative = "" if item in (None, "root") else _decode_id(item)
+        target = base / relative / path if path else base / relative
+        if ".." in Path(relative, path).parts:
+            raise GraphError(400, "invalidRequest", "Path escapes drive")
+        return target
+
+    def _item_json(self, drive: str, target: Path) -> dict:
+        base = self._drive_dir(drive)
+        relative = target.relative_to(base).as_posix()
+        item_id = _encode_id(relative)
+        stat = target.stat()
+        item = {
+            "id": item_id,
+            "name": target.name,
+            "eTag": f'"{{{item_id}}},{stat.st_mtime_ns}"',
+            "parentReference": {"driveId": drive},
+            "webUrl": f"https://fake.sharepoint.local/{quote(base.name)}/{quote(relative)}",
+        }
+        if target.is_dir():
+            item["folder"] = {"childCount": sum(1 for _ in target.iterdir())}
+        else:
+            data = target.read_bytes()
+            item["size"] = len(data)
+            item["cTag"] = f'"c:{{{item_id}}},{stat.st_mtime_ns}"'
+            item["file"] = {
+                "mimeType": (
+                    DOCX_MIME if target.suffix == ".docx" else "application/octet-stream"
+                ),
+                "hashes": {"quickXorHash": quick_xor_hash(data)},
+            }
+        return item
+
+    def _children(self, path, query, body, headers, drive, item=None) -> Response:
+        folder = self._item_path(drive, item)
+        if not folder.is_dir():
+            raise GraphError(404, "itemNotFound", "Folder not found")
+        values = [self._item_json(drive, child) for child in sorted(folder.iterdir())]
+        return 200, {}, self._page(path, query, values)
+
+    def _get_item(self, path, query, body, headers, drive, rel) -> Response:
+        target = self._item_path(drive, path=rel)
+        if not target.exists():
+            raise GraphError(404, "itemNotFound", "The resource could not be found.")
+        return 200, {}, self._item_json(drive, target)
+
+    def _create_folder(self, path, query, body, headers, drive) -> Response:
+        payload = json.loads(body or b"{}")
+        target = self._item_path(drive, path=payload["name"])
+        with self._lock:
+            if target.exists():
+                if payload.get("@microsoft.graph.conflictBehavior", "fail") == "fail":
+                    raise GraphError(409, "nameAlreadyExists", "Name already exists")
+            target.mkdir(parents=True, exist_ok=True)
+        return 201, {}, self._item_json(drive, target)
+
+    def _download(self, path, query, body, headers, drive, item=None, rel="") -> Response:
+        target = self._item_path(drive, item, rel)
+        if not target.is_file():
+            raise GraphError(404, "itemNotFound", "The resource could not be found.")
+        return 200, {"Content-Type": "application/octet-stream"}, target.read_bytes()
+
+    def _upload(self, path, query, body, headers, drive, item=None, rel="") -> Response:
+        target = self._item_path(drive, item, rel)
+        with self._lock:
+            created = not target.exists()
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_bytes(body)
+        return (201 if created else 200), {}, self._item_json(drive, target)
+
+    # -- sharing ----------------------------------------------------------
+
+    def _load_permissions(self) -> dict:
+        path = self.root / "permissions.json"
+        return json.loads(path.read_text()) if path.exists() else {}
+
+    def _save_permissions(self, data: dict) -> None:
+        (self.root / "permissions.json").write_text(json.dumps(data, indent=2))
+
+    def _permissions(self, path, query, body, headers, drive, item) -> Response:
+        if not self._item_path(drive, item).exists():
+            raise GraphError(404, "itemNotFound", "Item not found")
+        return 200, {}, {"value": self._load_permissions().get(item, [])}
+
+    def _create_link(self, path, query, body, headers, drive, item) -> Response:
+        if not self._item_path(drive, item).exists():
+            raise GraphError(404, "itemNotFound", "Item not found")
+        payload = json.loads(body or b"{}")
+        link_type = payload.get("type", "view")
+        scope = payload.get("scope", "anonymous")
+        with self._lock:
+            data = self._load_permissions()
+            perms = data.setdefault(item, [])
+            for perm in perms:
+                link = perm.get("link", {})
+                if link.get("type") == link_type and link.get("scope") == scope:
+                    # Graph returns the existing link for the same type/scope
+                    return 200, {}, perm
+            perm = {
+                "id": uuid.uuid4().hex,
+                "roles": ["read" if link_type == "view" else "write"],
+                "link": {
+                    "type": link_type,
+                    "scope": scope,
+                    "webUrl": (
+                        f"https://fake.sharepoint.local/:f:/s/{uuid.uuid4().hex[:12]}"
+                    ),
+                },
+            }
+            perms.append(perm)
+            self._save_permissions(data)
+        return 201, {}, perm
+
+    def _invite(self, path, query, body, headers, drive, item) -> Response:
+        if not self._item_path(drive, item).exists():
+            raise GraphError(404, "itemNotFound", "Item not found")
+        payload = json.loads(body or b"{}")
+        created = []
+        with self._lock:
+            data = self._load_permissions()
+            for recipient in payload.get("recipients", []):
+                perm = {
+                    "id": uuid.uuid4().hex,
+                    "roles": payload.get("roles", ["read"]),
+                    "grantedToIdentities": [{"user": {"email": recipient.get("email")}}],
+                }
+                data.setdefault(item, []).append(perm)
+                created.append(perm)
+            self._save_permissions(data)
+        return 200, {}, {"value": created}
+
+    # -- lists ------------------------------------------------------------
+
+    def _list_file(self, name: str) -> Path:
+        return self.root / "lists" / f"{name}.json"
+
+    def _load_list(self, name: str) -> dict:
+        path = self._list_file(name)
+        if not path.exists():
+            raise GraphError(404, "itemNotFound", f"List '{name}' not found")
+        return json.loads(path.read_text(encoding="utf-8"))
+
+    def _save_list(self, name: str, data: dict) -> None:
+        self._list_file(name).write_text(json.dumps(data), encoding="utf-8")
+
+    def _add_item(self, name: str, fields: dict) -> dict:
+        data = self._load_list(name)
+        data["version"] += 1
+        item_id = str(len(data["items"]) + 1)
+        data["items"][item_id] = {"fields": dict(fields), "version": data["version"]}
+        self._save_list(name, data)
+        return {"id": item_id, "fields": dict(fields)}
+
+    def _list_name(self, list_id: str) -> str:
+        name = _decode_id(list_id)
+        if not self._list_file(name).exists():
+            raise GraphError(404, "itemNotFound", f"List '{list_id}' not found")
+        return name
+
+    def _find_lists(self, path, query, body, headers) -> Response:
+        names = self._site_view(
+            path, [p.stem for p in (self.root / "lists").glob("*.json")]
+        )
+        match = re.search(r"displayName eq '(.*)'", query.get("$filter", ""))
+        if match:
+            names = {n: s for n, s in names.items() if n == match.group(1)}
+        values = [
+            {"id": _encode_id(stored), "displayName": name}
+            for name, stored in sorted(names.items())
+        ]
+        return 200, {}, {"value": values}
+
+    def _list_items(self, path, query, body, headers, list_id) -> Response:
+        data = self._load_list(self._list_name(list_id))
+        values = [
+            {"id": item_id, "fields": {**item["fields"], "id": item_id}}
+            for item_id, item in data["items"].items()
+            if not item.get("deleted")
+        ]
+        return 200, {}, self._page(path, query, values)
+
+    def _create_list_item(self, path, query, body, headers, list_id) -> Response:
+        payload = json.loads(body or b"{}")
+        with self._lock:
+            item = self._add_item(self._list_name(list_id), payload.get("fields", {}))
+        return 201, {}, item
+
+    def _list_delta(self, path, query, body, headers, list_id) -> Response:
+        name = self._list_name(list_id)
+        data = self._load_list(name)
+        since = int(query.get("token", 0))
+        values = []
+        for item_id, item in data["items"].items():
+            if item["version"] <= since:
+                continue
+            if item.get("deleted"):
+                values.append({"id": item_id, "deleted": {"state": "deleted"}})
+            else:
+                values.append({"id": item_id, "fields": {**item["fields"], "id": item_id}})
+        page = self._page(path, query, values)
+        if "@odata.nextLink" not in page:
+            page["@odata.deltaLink"] = (
+                f"{self.base_url}{path}?{urlencode({'token': data['version']})}"
+            )
+        return 200, {}, page
+
+    # -- batching ---------------------------------------------------------
+
+    def _batch(self, path, query, body, headers) -> Response:
+        payload = json.loads(body or b"{}")
+        responses = []
+        for sub in payload.get("requests", []):
+            sub_body = sub.get("body")
+            raw = json.dumps(sub_body).encode("utf-8") if sub_body is not None else b""
+            status, sub_headers, result = self.handle(
+                sub["method"], sub["url"], raw, sub.get("headers", {}), batched=True
+            )
+            if isinstance(result, bytes):
+                result = base64.b64encode(result).decode("ascii")
+            responses.append({
+                "id": sub["id"],
+                "status": status,
+                "headers": sub_headers,
+                "body": result,
+            })
+        return 200, {}, {"responses": responses}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    fake: FakeGraphServer
+
+    def log_message(self, format, *args):  # noqa: A002 - stdlib signature
+        logger.debug(format % args)
+
+    def _serve(self) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        status, headers, result = self.fake.handle(
+            self.command, self.path, body, dict(self.headers.items())
+        )
+        if isinstance(result, bytes):
+            payload = result
+            content_type = headers.pop("Content-Type", "application/octet-stream")
+        else:
+            payload = json.dumps(result).encode("utf-8")
+            content_type = "application/json"
+        self.fake.simulate_transfer(len(body) + len(payload))
+
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        self.send_header("request-id", uuid.uuid4().hex)
+        if self.headers.get("client-request-id"):
+            self.send_header("client-request-id", self.headers["client-request-id"])
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    do_GET = _serve
+    do_POST = _serve
+    do_PUT = _serve
+    do_DELETE = _serve
@@ -4,6 +4,9 @@ from pathlib import Path
 import pytest
 
 from policy_localiser.engine.models import SchoolRecord
+from policy_localiser.graph.client import GraphClient
+from policy_localiser.graph.throttle import RateController, RetryPolicy
+from policy_localiser.testing.fake_graph import FakeAuth, FakeGraphConfig, FakeGraphServer
 
 FIXTURES_DIR = Path(__file__).parent / "fixtures"
 
@@ -33,3 +36,35 @@ def sample_schools():
 @pytest.fixture
 def stm_school(sample_schools):
     return next(s for s in sample_schools if s.SchoolCode == "STM")
+
+
+@pytest.fixture
+def fake_graph(tmp_path, sample_schools):
+    """Fake Graph server seeded like the real site: the School Directory and
+    Processing Log lists plus the three document libraries."""
+    server = FakeGraphServer(tmp_path / "graph", FakeGraphConfig(retry_after=0, seed=1))
+    server.add_list("School Directory", [vars(s) for s in sample_schools])
+    server.add_list("Processing Log")
+    server.add_drive("Policy Templates")
+    server.add_drive("School Logos")
+    server.add_drive("Localised Policies")
+    server.put_file(
+        "Policy Templates",
+        "Sample_Policy.docx",
+        (FIXTURES_DIR / "templates" / "Sample_Policy.docx").read_bytes(),
+    )
+    for school in sample_schools:
+        logo = FIXTURES_DIR / "logos" / f"{school.SchoolCode}.png"
+        server.put_file("School Logos", logo.name, logo.read_bytes())
+    with server:
+        yield server
+
+
+@pytest.fixture
+def fake_client(fake_graph):
+    return GraphClient(
+        FakeAuth(),
+        rate_controller=RateController(initial_rate=1000, max_rate=1000),
+        retry_policy=RetryPolicy(base_delay=0.01, max_delay=0.05),
+        base_url=fake_graph.base_url,
+    )
@@ -0,0 +1,57 @@
+import pytest
+
+from policy_localiser.graph.sharepoint_files import SharePointFiles
+from policy_localiser.orchestrator.asset_cache import AssetCache
+
+TEMPLATES = "Policy Templates"
+
+
+@pytest.fixture
+def sp_files(fake_client):
+    return SharePointFiles(fake_client, "site")
+
+
+def template_item(sp_files):
+    drive_id = sp_files.get_drive_id(TEMPLATES)
+    return drive_id, sp_files.get_file(drive_id, "Sample_Policy.docx")
+
+
+class TestAssetCache:
+    def test_new_version_gets_its_own_file(self, fake_graph, sp_files, tmp_path):
+        cache = AssetCache(tmp_path / "cache")
+        drive_id, item = template_item(sp_files)
+        first = cache.cached_path(sp_files, drive_id, item)
+        original = first.read_bytes()
+        assert cache.cached_path(sp_files, drive_id, item) == first
+
+        fake_graph.put_file(TEMPLATES, "Sample_Policy.docx", original + b"\0")
+        drive_id, item = template_item(sp_files)
+        second = cache.cached_path(sp_files, drive_id, item)
+
+        assert second != first
+        assert second.read_bytes() == original + b"\0"
+        # A reader still holding the old path sees the old version, whole
+        assert first.read_bytes() == original
+        assert (cache.hits, cache.misses) == (1, 2)
+
+    def test_failed_download_leaves_no_partial_file(
+        self, fake_graph, sp_files, tmp_path
+    ):
+        cache = AssetCache(tmp_path / "cache")
+        drive_id, item = template_item(sp_files)
+
+        def broken_download(drive_id, item_id, local_path):
+            local_path.write_bytes(b"half a templ")
+            raise RuntimeError("connection reset")
+
+        download = sp_files.download_file
+        sp_files.download_file = broken_download
+        with pytest.raises(RuntimeError, match="connection reset"):
+            cache.cached_path(sp_files, drive_id, item)
+        assert list((tmp_path / "cache").iterdir()) == []
+
+        sp_files.download_file = download
+        cached = cache.cached_path(sp_files, drive_id, item)
+        assert cached.read_bytes() == fake_graph.read_file(
+            TEMPLATES, "Sample_Policy.docx"
+        )
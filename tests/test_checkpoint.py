@@ -0,0 +1,77 @@
+from datetime import datetime
+
+import pytest
+
+from policy_localiser.engine.models import ProcessingResult, ProcessingStatus
+from policy_localiser.orchestrator.checkpoint import RunCheckpoint
+
+
+def make_result(school, policy, status=ProcessingStatus.SUCCESS):
+    return ProcessingResult(
+        run_id="abc",
+        run_date=datetime(2026, 1, 15, 2, 0),
+        school_code=school,
+        policy_name=policy,
+        status=status,
+        error_message="boom" if status == ProcessingStatus.ERROR else None,
+        duration_seconds=0.5,
+    )
+
+
+class TestRunCheckpoint:
+    def test_round_trip_keeps_filters_and_results(self, tmp_path):
+        checkpoint = RunCheckpoint.create(tmp_path, "abc", ["STM"], ["Policy A"])
+        checkpoint.record(make_result("STM", "Policy A"))
+        checkpoint.record(make_result("STM", "Policy B", ProcessingStatus.SKIPPED))
+        checkpoint.close()
+
+        loaded = RunCheckpoint.load(tmp_path, "abc")
+        assert loaded.school_filter == ["STM"]
+        assert loaded.template_filter == ["Policy A"]
+        assert loaded.completed_pairs() == {("STM", "Policy A"), ("STM", "Policy B")}
+        assert loaded.completed_results()[0] == make_result("STM", "Policy A")
+
+    def test_failed_pairs_are_not_completed(self, tmp_path):
+        checkpoint = RunCheckpoint.create(tmp_path, "abc")
+        checkpoint.record(make_result("STM", "Policy A", ProcessingStatus.ERROR))
+        checkpoint.close()
+
+        assert RunCheckpoint.load(tmp_path, "abc").completed_pairs() == set()
+
+    def test_torn_last_line_is_ignored_and_terminated(self, tmp_path):
+        checkpoint = RunCheckpoint.create(tmp_path, "abc")
+        checkpoint.record(make_result("STM", "Policy A"))
+        checkpoint.close()
+        with open(tmp_path / "abc.jsonl", "a") as f:
+            f.write('{"run_id": "abc", "scho')
+
+        loaded = RunCheckpoint.load(tmp_path, "abc")
+        loaded.record(make_result("HFC", "Policy A"))
+        loaded.close()
+
+        assert RunCheckpoint.load(tmp_path, "abc").completed_pairs() == {
+            ("STM", "Policy A"),
+            ("HFC", "Policy A"),
+        }
+
+    def test_missing_checkpoint_raises(self, tmp_path):
+        with pytest.raises(RuntimeError, match="No checkpoint"):
+            RunCheckpoint.load(tmp_path, "nope")
+
+    def test_existing_checkpoint_is_not_created_again(self, tmp_path):
+        RunCheckpoint.create(tmp_path, "abc").close()
+
+        with pytest.raises(RuntimeError, match="already exists"):
+            RunCheckpoint.create(tmp_path, "abc")
+        assert RunCheckpoint.exists(tmp_path, "abc")
+
+    def test_stray_header_lines_are_skipped(self, tmp_path):
+        checkpoint = RunCheckpoint.create(tmp_path, "abc")
+        checkpoint.record(make_result("STM", "Policy A"))
+        checkpoint.close()
+        # As written by an older version on a redelivered queue message
+        with open(tmp_path / "abc.jsonl", "a") as f:
+            f.write('{"run_id": "abc", "started": "2026-01-15T02:05:00"}\n')
+
+        loaded = RunCheckpoint.load(tmp_path, "abc")
+        assert loaded.completed_pairs() == {("STM", "Policy A")}
@@ -0,0 +1,92 @@
+import threading
+from pathlib import Path
+
+import pytest
+
+from policy_localiser.config import Config
+from policy_localiser.orchestrator.context import AppContext, get_context, reset_context
+from policy_localiser.testing.fake_graph import FakeAuth
+
+
+@pytest.fixture
+def build(fake_graph, tmp_path):
+    built = []
+
+    def factory(config):
+        context = AppContext(config, auth=FakeAuth(), base_url=fake_graph.base_url)
+        built.append(context)
+        return context
+
+    factory.built = built
+    reset_context()
+    yield factory
+    reset_context()
+
+
+def make_config(tmp_path, **overrides):
+    settings = dict(
+        sharepoint_site_id="site",
+        checkpoint_dir=tmp_path / "checkpoints",
+        history_db_path=tmp_path / "history.db",
+        run_record_dir=tmp_path / "runs",
+        delta_state_path=tmp_path / "state.json",
+    )
+    return Config(**{**settings, **overrides})
+
+
+class TestSharedContext:
+    def test_reused_while_config_unchanged(self, build, tmp_path):
+        first = get_context(make_config(tmp_path), factory=build)
+        second = get_context(make_config(tmp_path), factory=build)
+
+        assert second is first
+        assert first.pipeline() is not second.pipeline()
+
+    def test_rebuilt_when_config_changes(self, build, tmp_path):
+        first = get_context(make_config(tmp_path), factory=build)
+        second = get_context(make_config(tmp_path, pipeline_workers=2), factory=build)
+
+        assert second is not first
+        assert second.config.pipeline_workers == 2
+        assert len(build.built) == 2
+
+    def test_concurrent_first_use_builds_once(self, build, tmp_path):
+        config = make_config(tmp_path)
+        seen = []
+        threads = [
+            threading.Thread(target=lambda: seen.append(get_context(config, factory=build)))
+            for _ in range(8)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert len(build.built) == 1
+        assert all(context is seen[0] for context in seen)
+
+    def test_warm_run_skips_repeat_lookups(self, build, fake_graph, tmp_path):
+        context = get_context(make_config(tmp_path), factory=build)
+        context.pipeline().run()
+        assert fake_graph.request_counts["GET /sites/{site}/drives"] > 0
+        fake_graph.request_counts.clear()
+
+        get_context(make_config(tmp_path), factory=build).pipeline().run()
+
+        assert fake_graph.request_counts["GET /sites/{site}/drives"] == 0
+
+    def test_relative_state_paths_fail_at_startup(self, build, tmp_path):
+        config = make_config(tmp_path, run_record_dir=Path("./data/runs"))
+
+        with pytest.raises(ValueError, match="RUN_RECORD_DIR=data/runs"):
+            get_context(config, factory=build)
+
+    def test_history_opened_by_first_run(self, build, tmp_path):
+        context = get_context(make_config(tmp_path), factory=build)
+        context.preview.render("STM", "Sample_Policy")
+        assert not (tmp_path / "history.db").exists()
+
+        context.pipeline()
+
+        assert (tmp_path / "history.db").exists()
+        assert not (tmp_path / "history.db-wal").exists()
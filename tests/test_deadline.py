@@ -0,0 +1,69 @@
+import json
+
+import pytest
+
+from policy_localiser.orchestrator.deadline import (
+    DEFAULT_FUNCTION_TIMEOUT,
+    Deadline,
+    function_timeout,
+    parse_timespan,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def write_host(tmp_path, **settings):
+    path = tmp_path / "host.json"
+    path.write_text(json.dumps({"version": "2.0", **settings}))
+    return path
+
+
+class TestFunctionTimeout:
+    @pytest.mark.parametrize("value, seconds", [
+        ("00:05:00", 300),
+        ("01:30:15", 5415),
+        ("1.00:00:00", 86400),
+        ("-1", None),
+    ])
+    def test_parse_timespan(self, value, seconds):
+        assert parse_timespan(value) == seconds
+
+    def test_reads_host_json(self, tmp_path):
+        assert function_timeout(write_host(tmp_path, functionTimeout="00:10:00")) == 600
+
+    def test_defaults_when_unset_or_missing(self, tmp_path):
+        assert function_timeout(write_host(tmp_path)) == DEFAULT_FUNCTION_TIMEOUT
+        assert function_timeout(tmp_path / "missing.json") == DEFAULT_FUNCTION_TIMEOUT
+
+
+class TestDeadline:
+    def test_admits_only_what_fits(self):
+        clock = FakeClock()
+        deadline = Deadline(60, clock=clock)
+        assert deadline.admits(60)
+
+        clock.now = 50
+        assert deadline.remaining() == 10
+        assert deadline.admits(10)
+        assert not deadline.admits(10.5)
+        assert not deadline.expired
+
+        clock.now = 70
+        assert deadline.remaining() == 0
+        assert deadline.expired
+
+    def test_from_host_json_applies_margin_and_limit(self, tmp_path):
+        host = write_host(tmp_path, functionTimeout="00:10:00")
+        assert Deadline.from_host_json(host, margin=30).seconds == 570
+        assert Deadline.from_host_json(host, margin=30, limit=230).seconds == 200
+
+    def test_unbounded_timeout_has_no_deadline(self, tmp_path):
+        host = write_host(tmp_path, functionTimeout="-1")
+        assert Deadline.from_host_json(host) is None
+        assert Deadline.from_host_json(host, margin=0, limit=230).seconds == 230
@@ -0,0 +1,105 @@
+from datetime import datetime, timezone
+
+import pytest
+import requests
+
+from policy_localiser.engine.models import ProcessingResult, ProcessingStatus
+from policy_localiser.graph.quickxor import quick_xor_hash
+from policy_localiser.graph.sharepoint_files import SharePointFiles
+from policy_localiser.graph.sharepoint_lists import SharePointLists
+from policy_localiser.sharing.folder_sharing import FolderSharing
+
+
+class TestFakeGraphLists:
+    def test_get_schools_pages_through_list(self, fake_graph, fake_client, sample_schools):
+        fake_graph.config.page_size = 2
+        schools = SharePointLists(fake_client, "site").get_schools()
+        assert [s.SchoolCode for s in schools] == [s.SchoolCode for s in sample_schools]
+
+    def test_delta_reports_only_changes(self, fake_graph, fake_client):
+        lists = SharePointLists(fake_client, "site")
+        first = lists.get_school_changes()
+        assert len(first.changed) == 3
+
+        fake_graph.update_list_item("School Directory", "1", {"PrincipalName": "New"})
+        fake_graph.delete_list_item("School Directory", "3")
+        second = lists.get_school_changes(first.delta_link)
+        assert list(second.changed) == ["1"]
+        assert second.changed["1"]["PrincipalName"] == "New"
+        assert second.removed == ["3"]
+
+    def test_processing_log_written(self, fake_graph, fake_client):
+        result = ProcessingResult(
+            "run1", datetime.now(timezone.utc), "STM", "Sample_Policy",
+            ProcessingStatus.SUCCESS,
+        )
+        SharePointLists(fake_client, "site").write_processing_log([result])
+        assert fake_graph.list_items("Processing Log")[0]["RunId"] == "run1"
+
+
+class TestFakeGraphFiles:
+    def test_upload_reports_quick_xor_hash(self, fake_graph, fake_client):
+        files = SharePointFiles(fake_client, "site")
+        drive = files.get_drive_id("Localised Policies")
+        folder_ids = files.reconcile_folders(drive, ["STM - St Mary's"])
+
+        uploaded = files.upload_file(
+            drive, "STM - St Mary's", "a.docx", b"hello",
+            folder_id=folder_ids["STM - St Mary's"],
+        )
+
+        assert uploaded["file"]["hashes"]["quickXorHash"] == quick_xor_hash(b"hello")
+        assert fake_graph.read_file("Localised Policies", "STM - St Mary's/a.docx") == b"hello"
+        assert files.list_folder_hashes(drive, folder_ids["STM - St Mary's"]) == {
+            "a.docx": quick_xor_hash(b"hello")
+        }
+
+    def test_download_by_name(self, fake_client, logos_dir, tmp_path):
+        files = SharePointFiles(fake_client, "site")
+        drive = files.get_drive_id("School Logos")
+        files.download_file_by_name(drive, "STM.png", tmp_path / "STM.png")
+        assert (tmp_path / "STM.png").read_bytes() == (logos_dir / "STM.png").read_bytes()
+
+    def test_ensure_folder_404_creates(self, fake_graph, fake_client):
+        files = SharePointFiles(fake_client, "site")
+        drive = files.get_drive_id("Localised Policies")
+        created = files.ensure_folder(drive, "New Folder")
+        assert files.ensure_folder(drive, "New Folder") == created
+
+
+class TestFakeGraphFaults:
+    def test_throttled_requests_are_retried(self, fake_graph, fake_client):
+        fake_graph.fail_next(2, status=429)
+        files = SharePointFiles(fake_client, "site")
+        assert files.get_drive_id("School Logos")
+        stats = fake_client.throttle_stats()
+        assert stats.throttled == 2
+        assert stats.retries == 2
+
+    def test_gives_up_after_retry_budget(self, fake_graph, fake_client):
+        fake_graph.fail_next(20, status=503)
+        with pytest.raises(requests.HTTPError):
+            SharePointFiles(fake_client, "site").get_drive_id("School Logos")
+        assert fake_client.throttle_stats().gave_up == 1
+
+    def test_throttled_batch_entries_are_retried(self, fake_graph, fake_client):
+        files = SharePointFiles(fake_client, "site")
+        drive = files.get_drive_id("Localised Policies")
+        names = [f"Folder {i}" for i in range(25)]
+        fake_graph.fail_next(3, status=429, batched=True)
+
+        ids = files.reconcile_folders(drive, names)
+
+        assert sorted(ids) == sorted(names)
+        assert fake_client.throttle_stats().throttled == 3
+
+
+class TestFakeGraphSharing:
+    def test_create_link_returns_existing_link(self, fake_client):
+        files = SharePointFiles(fake_client, "site")
+        drive = files.get_drive_id("Localised Policies")
+        folder_id = files.ensure_folder(drive, "STM - St Mary's")
+        sharing = FolderSharing(fake_client)
+        first = sharing.create_view_link(drive, folder_id)
+        assert first.startswith("https://")
+        assert sharing.create_view_link(drive, folder_id) == first
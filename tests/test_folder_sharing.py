@@ -0,0 +1,51 @@
+from policy_localiser.graph.sharepoint_files import SharePointFiles
+from policy_localiser.sharing.folder_sharing import FolderSharing, SharingLinks
+
+CREATE_LINK = "POST /drives/{drive}/items/{item}/createLink"
+
+
+class TestShareAllSchoolFolders:
+    def test_repeat_pass_uses_cached_links(
+        self, fake_graph, fake_client, sample_schools, tmp_path
+    ):
+        files = SharePointFiles(fake_client, "site")
+        drive = files.get_drive_id("Localised Policies")
+        sharing = FolderSharing(fake_client)
+        links_path = tmp_path / "links.json"
+
+        first = sharing.share_all_school_folders(
+            files, drive, sample_schools, links_path=links_path
+        )
+        assert sorted(first) == ["HFC", "SJV", "STM"]
+        assert fake_graph.request_counts[CREATE_LINK] == 3
+        assert fake_graph.request_counts["POST /$batch"] == 3  # folders, perms, links
+
+        fake_graph.request_counts.clear()
+        second = sharing.share_all_school_folders(
+            files, drive, sample_schools, links_path=links_path
+        )
+        assert second == first
+        assert sum(fake_graph.request_counts.values()) == 0
+
+    def test_reuses_existing_view_link(self, fake_graph, fake_client, sample_schools):
+        files = SharePointFiles(fake_client, "site")
+        drive = files.get_drive_id("Localised Policies")
+        sharing = FolderSharing(fake_client)
+        stm = sample_schools[0]
+        folder_id = files.ensure_folder(drive, stm.folder_name)
+        existing = sharing.create_view_link(drive, folder_id)
+        fake_graph.request_counts.clear()
+
+        links = sharing.share_all_school_folders(files, drive, sample_schools)
+
+        assert links[stm.SchoolCode] == existing
+        assert fake_graph.request_counts[CREATE_LINK] == 2
+
+    def test_cache_entry_for_other_folder_is_ignored(self):
+        cache = SharingLinks()
+        cache.set("STM", "https://link", "folder-1", "organization")
+
+        assert cache.get("STM", "organization") == "https://link"
+        assert cache.get("STM", "organization", "folder-1") == "https://link"
+        assert cache.get("STM", "organization", "folder-2") is None
+        assert cache.get("STM", "anonymous") is None
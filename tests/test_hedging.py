@@ -0,0 +1,109 @@
+import threading
+import time
+
+import pytest
+import requests
+
+from policy_localiser.graph.client import GraphClient
+from policy_localiser.graph.sharepoint_files import SharePointFiles
+from policy_localiser.graph.throttle import HedgePolicy, RateController
+from policy_localiser.metrics import GRAPH_HEDGES
+from policy_localiser.testing.fake_graph import FakeAuth
+
+
+class StallingSession(requests.Session):
+    """Stalls the nth request and records each request's timeout."""
+
+    def __init__(self, stall_call: int, stall_seconds: float):
+        super().__init__()
+        self.stall_call = stall_call
+        self.stall_seconds = stall_seconds
+        self.calls = 0
+        self.timeouts = []
+        self._lock = threading.Lock()
+
+    def request(self, method, url, **kwargs):
+        with self._lock:
+            self.calls += 1
+            call = self.calls
+            self.timeouts.append(kwargs.get("timeout"))
+        if call == self.stall_call:
+            time.sleep(self.stall_seconds)
+        return super().request(method, url, **kwargs)
+
+
+def make_client(fake_graph, session, concurrency=4, **kwargs):
+    return GraphClient(
+        FakeAuth(),
+        rate_controller=RateController(
+            initial_concurrency=concurrency, max_concurrency=concurrency,
+            initial_rate=1000, max_rate=1000,
+        ),
+        base_url=fake_graph.base_url,
+        session=session,
+        hedge_policy=HedgePolicy(min_samples=3, max_fraction=1.0),
+        **kwargs,
+    )
+
+
+class TestHedgedDownloads:
+    def test_stalled_download_is_hedged(self, fake_graph):
+        # drives lookup, listing, 3 timed downloads, then the 4th stalls
+        session = StallingSession(stall_call=6, stall_seconds=2.0)
+        client = make_client(fake_graph, session, timeout=(3.0, 30.0))
+        files = SharePointFiles(client, "site")
+        drive = files.get_drive_id("School Logos")
+        item = files.list_files(drive)[0]
+        path = f"/drives/{drive}/items/{item['id']}/content"
+        for _ in range(3):
+            expected = client.get_binary(path)
+        won = GRAPH_HEDGES.value(result="won")
+
+        start = time.monotonic()
+        data = client.get_binary(path)
+
+        assert data == expected
+        assert time.monotonic() - start < 1.5
+        assert client.throttle_stats().hedges == 1
+        assert GRAPH_HEDGES.value(result="won") - won == 1
+        assert set(session.timeouts) == {(3.0, 30.0)}
+
+    def test_no_hedge_without_spare_capacity(self, fake_graph):
+        session = StallingSession(stall_call=6, stall_seconds=0.5)
+        # One request at a time: a hedge would have to wait for the first
+        client = make_client(fake_graph, session, concurrency=1)
+        files = SharePointFiles(client, "site")
+        drive = files.get_drive_id("School Logos")
+        item = files.list_files(drive)[0]
+        path = f"/drives/{drive}/items/{item['id']}/content"
+        for _ in range(4):
+            client.get_binary(path)
+
+        assert client.throttle_stats().hedges == 0
+        assert session.calls == 6
+
+    def test_failed_copies_never_win(self, fake_graph):
+        class FailingSession(StallingSession):
+            def request(self, method, url, **kwargs):
+                resp = super().request(method, url, **kwargs)
+                if self.calls >= 6:
+                    resp.status_code = 403
+                return resp
+
+        session = FailingSession(stall_call=6, stall_seconds=0.5)
+        client = make_client(fake_graph, session)
+        files = SharePointFiles(client, "site")
+        drive = files.get_drive_id("School Logos")
+        item = files.list_files(drive)[0]
+        path = f"/drives/{drive}/items/{item['id']}/content"
+        for _ in range(3):
+            client.get_binary(path)
+        counts = {r: GRAPH_HEDGES.value(result=r) for r in ("won", "lost", "failed")}
+
+        with pytest.raises(requests.HTTPError):
+            client.get_binary(path)
+
+        assert client.throttle_stats().hedges == 1
+        assert GRAPH_HEDGES.value(result="failed") - counts["failed"] == 1
+        assert GRAPH_HEDGES.value(result="won") == counts["won"]
+        assert GRAPH_HEDGES.value(result="lost") == counts["lost"]
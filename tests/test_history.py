@@ -0,0 +1,61 @@
+from datetime import datetime, timedelta
+
+from policy_localiser.engine.models import ProcessingResult, ProcessingStatus
+from policy_localiser.orchestrator.history import RunHistory
+
+
+def make_result(run_id, school, policy, status=ProcessingStatus.SUCCESS, minutes=0):
+    return ProcessingResult(
+        run_id=run_id,
+        run_date=datetime(2026, 1, 15, 2, 0) + timedelta(minutes=minutes),
+        school_code=school,
+        policy_name=policy,
+        status=status,
+        duration_seconds=1.5,
+        timings={"render": 1.5, "upload": 0.25},
+        template_hash="t",
+        logo_hash="l",
+        school_hash="s",
+        output_hash=f"o-{run_id}",
+    )
+
+
+class TestRunHistory:
+    def test_round_trip_and_run_summary(self, tmp_path):
+        history = RunHistory(tmp_path / "history.db")
+        history.start_run("r1", ["STM"], None)
+        history.record(make_result("r1", "STM", "A"))
+        history.record(make_result("r1", "STM", "B", ProcessingStatus.ERROR))
+        # A resumed run retries B; the latest result per pair wins
+        history.record(make_result("r1", "STM", "B", minutes=5))
+        history.finish_run("r1")
+
+        results = history.run_results("r1")
+        assert [(r.policy_name, r.status) for r in results] == [
+            ("A", ProcessingStatus.SUCCESS),
+            ("B", ProcessingStatus.SUCCESS),
+        ]
+        assert results[0].timings == {"render": 1.5, "upload": 0.25}
+        assert results[0].output_hash == "o-r1"
+
+        [run] = history.recent_runs()
+        assert (run["run_id"], run["total"], run["success"], run["failed"]) == (
+            "r1", 2, 2, 0
+        )
+
+    def test_last_success_ignores_failures(self, tmp_path):
+        history = RunHistory(tmp_path / "history.db")
+        history.record(make_result("r1", "STM", "A", minutes=0))
+        history.record(make_result("r2", "STM", "A", ProcessingStatus.ERROR, minutes=10))
+
+        assert history.last_success("STM", "A").run_id == "r1"
+        assert [r.run_id for r in history.pair_history("STM", "A")] == ["r2", "r1"]
+        assert history.last_success("HFC", "A") is None
+
+    def test_persists_across_connections(self, tmp_path):
+        path = tmp_path / "history.db"
+        history = RunHistory(path)
+        history.record(make_result("r1", "STM", "A"))
+        history.close()
+
+        assert len(RunHistory(path).run_results("r1")) == 1
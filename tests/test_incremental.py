@@ -0,0 +1,84 @@
+import zipfile
+
+from policy_localiser.graph.sharepoint_lists import SchoolDirectoryDelta
+from policy_localiser.orchestrator.incremental import (
+    DirectoryState,
+    RenderPlanner,
+    apply_delta,
+    school_fields,
+    template_fields,
+)
+
+
+def make_template(path, body_xml):
+    with zipfile.ZipFile(path, "w") as zf:
+        zf.writestr("word/document.xml", f"<w:document>{body_xml}</w:document>")
+    return path
+
+
+def snapshot_of(schools):
+    return {f"item-{s.SchoolCode}": school_fields(vars(s)) for s in schools}
+
+
+class TestTemplateFields:
+    def test_finds_placeholders_split_across_runs(self, tmp_path):
+        tpl = make_template(
+            tmp_path / "Split.docx",
+            "<w:r><w:t>{{Princ</w:t></w:r><w:r><w:t>ipalName}}</w:t></w:r>"
+            "<w:t>{% if SchoolType == 'Primary' %}x{% endif %}</w:t>",
+        )
+        assert template_fields(tpl) == {"PrincipalName", "SchoolType"}
+
+    def test_fixture_template_references_address(self, template_path):
+        assert "SchoolAddress" in template_fields(template_path)
+
+
+class TestApplyDelta:
+    def test_diffs_changed_fields(self, sample_schools):
+        state = DirectoryState(snapshot=snapshot_of(sample_schools))
+        delta = SchoolDirectoryDelta(
+            changed={"item-STM": {**vars(sample_schools[0]), "PrincipalName": "New"}},
+            delta_link="link-2",
+        )
+        changes = apply_delta(state, delta)
+        assert changes == {"STM": {"PrincipalName"}}
+        assert state.snapshot["item-STM"]["PrincipalName"] == "New"
+        assert state.delta_link == "link-2"
+
+    def test_unchanged_item_is_not_a_change(self, sample_schools):
+        state = DirectoryState(snapshot=snapshot_of(sample_schools))
+        delta = SchoolDirectoryDelta(changed={"item-STM": vars(sample_schools[0])})
+        assert apply_delta(state, delta) == {}
+
+    def test_full_resync_drops_missing_items(self, sample_schools):
+        state = DirectoryState(snapshot=snapshot_of(sample_schools))
+        delta = SchoolDirectoryDelta(
+            changed={"item-STM": vars(sample_schools[0])}, full_resync=True
+        )
+        apply_delta(state, delta)
+        assert list(state.snapshot) == ["item-STM"]
+
+    def test_state_round_trip(self, sample_schools, tmp_path):
+        state = DirectoryState("link", snapshot_of(sample_schools), {"STM": "c1"})
+        state.save(tmp_path / "state.json")
+        loaded = DirectoryState.load(tmp_path / "state.json")
+        assert loaded == state
+        assert [s.SchoolCode for s in loaded.schools()] == ["STM", "HFC", "SJV"]
+
+
+class TestRenderPlanner:
+    def test_only_templates_referencing_changed_field(self, stm_school, tmp_path):
+        uses = make_template(tmp_path / "A.docx", "<w:t>{{ PrincipalName }}</w:t>")
+        other = make_template(tmp_path / "B.docx", "<w:t>{{ABN}}</w:t>")
+        planner = RenderPlanner({"STM": {"PrincipalName"}})
+        assert planner.needs_render(stm_school, uses)
+        assert not planner.needs_render(stm_school, other)
+
+    def test_name_or_logo_change_renders_everything(self, sample_schools, tmp_path):
+        other = make_template(tmp_path / "B.docx", "<w:t>{{ABN}}</w:t>")
+        stm, hfc, sjv = sample_schools
+        planner = RenderPlanner({"STM": {"Title"}}, logo_changed=["HFC"])
+        assert planner.needs_render(stm, other)
+        assert planner.needs_render(hfc, other)
+        assert not planner.needs_render(sjv, other)
+        assert planner.school_codes == {"STM", "HFC"}
@@ -0,0 +1,75 @@
+import io
+import zipfile
+
+import pytest
+
+from policy_localiser.engine.logo_slots import LogoSlot, find_logo_slots
+from policy_localiser.engine.renderer import normalise_docx
+
+FOOTER_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Target="media/image2.png" Type="http://schemas.'
+    'openxmlformats.org/officeDocument/2006/relationships/image"/></Relationships>'
+)
+
+
+def rewrite(data: bytes, parts: dict) -> bytes:
+    """Copy of a .docx with parts replaced or added."""
+    out = io.BytesIO()
+    with zipfile.ZipFile(io.BytesIO(data)) as src, zipfile.ZipFile(out, "w") as dst:
+        for name in src.namelist():
+            if name not in parts:
+                dst.writestr(name, src.read(name))
+        for name, content in parts.items():
+            dst.writestr(name, content)
+    return out.getvalue()
+
+
+class TestFindLogoSlots:
+    def test_finds_the_header_placeholder(self, template_path):
+        assert find_logo_slots(template_path.read_bytes()) == [
+            LogoSlot("word/header1.xml", "rId1", "word/media/image1.png")
+        ]
+
+    def test_finds_every_slot(self, template_path):
+        data = template_path.read_bytes()
+        with zipfile.ZipFile(io.BytesIO(data)) as docx:
+            header = docx.read("word/header1.xml")
+        data = rewrite(data, {
+            "word/footer1.xml": header,
+            "word/_rels/footer1.xml.rels": FOOTER_RELS,
+            "word/media/image2.png": b"png",
+        })
+
+        assert [s.media for s in find_logo_slots(data)] == [
+            "word/media/image2.png", "word/media/image1.png"
+        ]
+
+    def test_other_pictures_are_not_slots(self, template_path):
+        data = template_path.read_bytes()
+        with zipfile.ZipFile(io.BytesIO(data)) as docx:
+            header = docx.read("word/header1.xml")
+        data = rewrite(data, {
+            "word/header1.xml": header.replace(b"logo_placeholder.png", b"crest.png")
+        })
+
+        assert find_logo_slots(data) == []
+
+    def test_not_a_docx(self):
+        with pytest.raises(zipfile.BadZipFile):
+            find_logo_slots(b"not a zip")
+
+
+class TestNormaliseDocx:
+    def test_swaps_named_media(self, template_path):
+        output = normalise_docx(
+            template_path.read_bytes(), {"word/media/image1.png": b"logo"}
+        )
+
+        with zipfile.ZipFile(io.BytesIO(output)) as docx:
+            assert docx.read("word/media/image1.png") == b"logo"
+
+    def test_missing_media_part_is_an_error(self, template_path):
+        with pytest.raises(RuntimeError, match="image9.png"):
+            normalise_docx(template_path.read_bytes(), {"word/media/image9.png": b""})
@@ -0,0 +1,70 @@
+import pytest
+
+from policy_localiser.graph.sharepoint_files import SharePointFiles
+from policy_localiser.metrics import (
+    GRAPH_BYTES,
+    GRAPH_REQUESTS,
+    STAGE_SECONDS,
+    MetricsRegistry,
+)
+
+
+class TestMetricsRegistry:
+    def test_counter_and_gauge_exposition(self):
+        registry = MetricsRegistry()
+        docs = registry.counter("docs_total", "Documents", ["status"])
+        depth = registry.gauge("depth", "Queue depth")
+        docs.inc(status="Success")
+        docs.inc(2, status='Er"ror')
+        depth.inc(5)
+        depth.dec(2)
+
+        text = registry.render()
+
+        assert "# TYPE docs_total counter" in text
+        assert 'docs_total{status="Success"} 1' in text
+        assert 'docs_total{status="Er\\"ror"} 2' in text
+        assert "# TYPE depth gauge\ndepth 3" in text
+        with pytest.raises(ValueError):
+            docs.inc(-1, status="Success")
+        with pytest.raises(ValueError):
+            docs.inc(other="x")
+
+    def test_histogram_buckets_are_cumulative(self, tmp_path):
+        registry = MetricsRegistry()
+        latency = registry.histogram("lat_seconds", "Latency", ["stage"], buckets=[0.1, 1])
+        for value in (0.05, 0.5, 0.7, 3):
+            latency.observe(value, stage="render")
+
+        text = registry.render()
+
+        assert 'lat_seconds_bucket{stage="render",le="0.1"} 1' in text
+        assert 'lat_seconds_bucket{stage="render",le="1"} 3' in text
+        assert 'lat_seconds_bucket{stage="render",le="+Inf"} 4' in text
+        assert 'lat_seconds_sum{stage="render"} 4.25' in text
+        assert 'lat_seconds_count{stage="render"} 4' in text
+
+        registry.write(tmp_path / "m" / "policy.prom")
+        assert (tmp_path / "m" / "policy.prom").read_text(encoding="utf-8") == text
+
+    def test_names_are_unique(self):
+        registry = MetricsRegistry()
+        registry.counter("x_total", "X")
+        with pytest.raises(ValueError):
+            registry.gauge("x_total", "X again")
+
+
+class TestGraphMetrics:
+    def test_requests_bytes_and_download_latency(self, fake_client):
+        files = SharePointFiles(fake_client, "site")
+        ok = GRAPH_REQUESTS.value(method="GET", status="200")
+        received = GRAPH_BYTES.value(direction="in")
+        downloads = STAGE_SECONDS.count(stage="download")
+
+        drive = files.get_drive_id("Policy Templates")
+        item = files.list_files(drive)[0]
+        data = fake_client.get_binary(f"/drives/{drive}/items/{item['id']}/content")
+
+        assert GRAPH_REQUESTS.value(method="GET", status="200") - ok == 3
+        assert GRAPH_BYTES.value(direction="in") - received >= len(data)
+        assert STAGE_SECONDS.count(stage="download") - downloads == 1
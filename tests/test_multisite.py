@@ -0,0 +1,121 @@
+from pathlib import Path
+
+import pytest
+
+from policy_localiser.config import Config, parse_sites
+from policy_localiser.engine.models import ProcessingStatus
+from policy_localiser.graph.client import GraphClient
+from policy_localiser.graph.throttle import RateController, RetryPolicy
+from policy_localiser.orchestrator.asset_cache import AssetCache
+from policy_localiser.orchestrator.multisite import MultiSiteRunner
+from policy_localiser.testing.fake_graph import FakeAuth, FakeGraphConfig, FakeGraphServer
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+SITES = {
+    "north": "contoso.sharepoint.com,north-1,north-2",
+    "south": "contoso.sharepoint.com,south-1,south-2",
+}
+
+
+def seed(server, site_id, schools):
+    scoped = lambda name: FakeGraphServer.scoped(site_id, name)  # noqa: E731
+    server.add_list(scoped("School Directory"), [vars(s) for s in schools])
+    server.add_list(scoped("Processing Log"))
+    for library in ("Policy Templates", "School Logos", "Localised Policies"):
+        server.add_drive(scoped(library))
+    server.put_file(
+        scoped("Policy Templates"),
+        "Sample_Policy.docx",
+        (FIXTURES_DIR / "templates" / "Sample_Policy.docx").read_bytes(),
+    )
+    for school in schools:
+        logo = FIXTURES_DIR / "logos" / f"{school.SchoolCode}.png"
+        server.put_file(scoped("School Logos"), logo.name, logo.read_bytes())
+
+
+@pytest.fixture
+def two_sites(tmp_path, sample_schools):
+    server = FakeGraphServer(tmp_path / "graph", FakeGraphConfig(retry_after=0, seed=1))
+    seed(server, SITES["north"], sample_schools[:2])
+    seed(server, SITES["south"], sample_schools[2:])
+    with server:
+        yield server
+
+
+@pytest.fixture
+def site_config(tmp_path):
+    return Config(
+        sharepoint_sites=dict(SITES),
+        checkpoint_dir=tmp_path / "checkpoints",
+        history_db_path=tmp_path / "state" / "history.db",
+    )
+
+
+def make_client(server):
+    return GraphClient(
+        FakeAuth(),
+        rate_controller=RateController(initial_rate=1000, max_rate=1000),
+        retry_policy=RetryPolicy(base_delay=0.01, max_delay=0.05),
+        base_url=server.base_url,
+        pool_size=8,
+    )
+
+
+class TestSiteConfig:
+    def test_parse_sites(self):
+        assert parse_sites("north=a,b,c; south=d,e,f;") == {
+            "north": "a,b,c", "south": "d,e,f",
+        }
+        with pytest.raises(ValueError):
+            parse_sites("north")
+
+    def test_single_site_is_default(self):
+        config = Config(sharepoint_site_id="a,b,c")
+        assert config.sites() == {"default": "a,b,c"}
+        assert config.for_site("default") is config
+
+    def test_each_site_gets_its_own_state(self, site_config, tmp_path):
+        north = site_config.for_site("north")
+        assert north.sharepoint_site_id == SITES["north"]
+        assert north.checkpoint_dir == tmp_path / "checkpoints" / "north"
+        assert north.history_db_path == tmp_path / "state" / "north" / "history.db"
+        with pytest.raises(ValueError):
+            site_config.for_site("east")
+
+
+class TestMultiSiteRunner:
+    def test_sites_run_concurrently_with_separate_results(
+        self, two_sites, site_config, tmp_path
+    ):
+        client = make_client(two_sites)
+        runner = MultiSiteRunner(client, site_config, AssetCache(tmp_path / "cache"))
+        runs = runner.run()
+
+        assert [r.school_code for r in runs["north"].results] == ["STM", "HFC"]
+        assert [r.school_code for r in runs["south"].results] == ["SJV"]
+        assert runs["north"].run_id != runs["south"].run_id
+        assert all(
+            r.status == ProcessingStatus.SUCCESS
+            for run in runs.values() for r in run.results
+        )
+        north = FakeGraphServer.scoped(SITES["north"], "Processing Log")
+        south = FakeGraphServer.scoped(SITES["south"], "Localised Policies")
+        assert len(two_sites.list_items(north)) == 2
+        assert two_sites.files(south) == [
+            "SJV - St John Vianney School/Sample_Policy.docx"
+        ]
+        # The template is identical in both sites, so it is downloaded once
+        assert runner.asset_cache.hits >= 1
+        assert (tmp_path / "state" / "north" / "history.db").exists()
+
+    def test_failed_site_does_not_stop_others(
+        self, two_sites, site_config, tmp_path
+    ):
+        site_config.sharepoint_sites["east"] = "contoso.sharepoint.com,missing"
+        runner = MultiSiteRunner(make_client(two_sites), site_config)
+        runs = runner.run(sites=["north", "east"])
+
+        assert runs["east"].error
+        assert runs["east"].results == []
+        assert len(runs["north"].results) == 2
+        assert runs["north"].error is None
@@ -4,7 +4,10 @@ from pathlib import Path
 import pytest
 
 from policy_localiser.engine.models import ProcessingStatus, SchoolRecord
+from policy_localiser.orchestrator.history import RunHistory
 from policy_localiser.orchestrator.pipeline import LocalPipeline
+from policy_localiser.orchestrator.progress import ProgressEmitter, RingBufferSink
+from policy_localiser.orchestrator.sinks import LocalDirectorySink
 
 
 class TestLocalPipeline:
@@ -29,6 +32,46 @@ class TestLocalPipeline:
             assert folder.exists()
             assert (folder / "Sample_Policy.docx").exists()
 
+    def test_emits_progress_events(
+        self, fixtures_dir, logos_dir, sample_schools, tmp_path
+    ):
+        buffer = RingBufferSink()
+        pipeline = LocalPipeline(progress=ProgressEmitter([buffer], max_per_second=0))
+        pipeline.process_all(
+            template_dir=fixtures_dir / "templates",
+            logo_dir=logos_dir,
+            output_dir=tmp_path,
+            schools=sample_schools,
+        )
+
+        events = buffer.events()
+        types = [e.type for e in events]
+        assert types[0] == "run_started" and types[-1] == "run_finished"
+        # Stages overlap, so the next document may start before one finishes
+        for school in sample_schools:
+            assert [e.type for e in events if e.school == school.SchoolCode] == [
+                "item_started", "item_finished",
+            ]
+        assert events[0].data["total"] == 3
+        finished = [e for e in events if e.type == "item_finished"]
+        assert [e.data["completed"] for e in finished] == [1, 2, 3]
+        assert events[-1].data["counts"] == {"Success": 3}
+
+    def test_only_renders_listed_pairs(
+        self, fixtures_dir, logos_dir, sample_schools, tmp_path
+    ):
+        pipeline = LocalPipeline()
+        results = pipeline.process_all(
+            template_dir=fixtures_dir / "templates",
+            logo_dir=logos_dir,
+            output_dir=tmp_path,
+            schools=sample_schools,
+            only={("HFC", "Sample_Policy"), ("XYZ", "Sample_Policy")},
+        )
+
+        assert [r.school_code for r in results] == ["HFC"]
+        assert [p.name for p in tmp_path.iterdir()] == [sample_schools[1].folder_name]
+
     def test_school_filter(self, fixtures_dir, logos_dir, sample_schools, tmp_path):
         pipeline = LocalPipeline()
         results = pipeline.process_all(
@@ -74,3 +117,70 @@ class TestLocalPipeline:
                 output_dir=tmp_path / "out",
                 schools=sample_schools,
             )
+
+    def test_plan_renders_nothing(self, fixtures_dir, logos_dir, sample_schools, tmp_path):
+        pipeline = LocalPipeline()
+        plan = pipeline.plan(
+            template_dir=fixtures_dir / "templates",
+            logo_dir=logos_dir,
+            schools=sample_schools,
+            school_filter=["STM", "HFC"],
+        )
+
+        assert plan.schools == 2
+        assert [item.school_code for item in plan.items] == ["STM", "HFC"]
+        assert plan.action_counts() == {"render": 2}
+        assert plan.estimated_seconds > 0
+        assert not plan.blocking
+        assert list(tmp_path.iterdir()) == []
+
+    def test_history_records_runs_and_drives_estimates(
+        self, fixtures_dir, logos_dir, sample_schools, tmp_path
+    ):
+        history = RunHistory(tmp_path / "history.db")
+        pipeline = LocalPipeline(history=history)
+        results = pipeline.process_all(
+            template_dir=fixtures_dir / "templates",
+            logo_dir=logos_dir,
+            output_dir=tmp_path / "out",
+            schools=sample_schools,
+        )
+
+        run = history.recent_runs()[0]
+        assert run["total"] == run["success"] == len(results)
+        plan = pipeline.plan(
+            template_dir=fixtures_dir / "templates",
+            logo_dir=logos_dir,
+            schools=sample_schools,
+        )
+        assert plan.schedule.sources == {"history": 1}
+        history.close()
+
+    def test_leaves_a_callers_sink_open(
+        self, fixtures_dir, logos_dir, sample_schools, tmp_path
+    ):
+        class Sink(LocalDirectorySink):
+            closed = False
+
+            def close(self):
+                self.closed = True
+
+        sink = Sink(tmp_path)
+        LocalPipeline().process_all(
+            template_dir=fixtures_dir / "templates",
+            logo_dir=logos_dir,
+            output_dir=tmp_path,
+            schools=sample_schools,
+            sink=sink,
+        )
+
+        assert not sink.closed
+
+    def test_plan_reports_validation_errors(self, fixtures_dir, sample_schools, tmp_path):
+        plan = LocalPipeline().plan(
+            template_dir=fixtures_dir / "templates",
+            logo_dir=tmp_path,  # Empty dir = no logos
+            schools=sample_schools,
+        )
+
+        assert len(plan.blocking) == len(sample_schools)
@@ -0,0 +1,73 @@
+import zipfile
+import io
+
+import pytest
+
+from policy_localiser.graph.sharepoint_files import SharePointFiles
+from policy_localiser.graph.sharepoint_lists import SharePointLists
+from policy_localiser.orchestrator.preview import MissingAssetError, PreviewService
+
+DOWNLOADS = "GET /drives/{drive}/items/{item}/content"
+
+
+@pytest.fixture
+def service(fake_client):
+    return PreviewService(
+        SharePointLists(fake_client, "site"), SharePointFiles(fake_client, "site")
+    )
+
+
+class TestPreviewService:
+    def test_renders_in_memory_without_uploading_or_logging(self, fake_graph, service):
+        preview = service.render("STM", "Sample_Policy")
+
+        assert preview.file_name == "STM - Sample_Policy.docx"
+        assert zipfile.ZipFile(io.BytesIO(preview.content)).namelist()
+        assert fake_graph.request_counts[DOWNLOADS] == 2
+        assert not any(k.startswith(("PUT", "POST")) for k in fake_graph.request_counts)
+        assert fake_graph.files("Localised Policies") == []
+        assert fake_graph.list_items("Processing Log") == []
+
+    def test_warm_preview_only_checks_versions(self, fake_graph, service):
+        service.render("STM", "Sample_Policy.docx")
+        fake_graph.request_counts.clear()
+
+        service.render("HFC", "Sample_Policy")
+
+        # Template cached; only the new school's logo is downloaded
+        assert fake_graph.request_counts[DOWNLOADS] == 1
+        assert fake_graph.request_counts["GET /drives/{drive}/root:/{rel}"] == 2
+        assert sum(fake_graph.request_counts.values()) == 3
+
+    def test_edited_template_is_downloaded_again(self, fake_graph, service):
+        service.render("STM", "Sample_Policy")
+        data = fake_graph.read_file("Policy Templates", "Sample_Policy.docx")
+        fake_graph.put_file("Policy Templates", "Sample_Policy.docx", data + b"\0")
+        fake_graph.request_counts.clear()
+
+        service.render("STM", "Sample_Policy")
+
+        assert fake_graph.request_counts[DOWNLOADS] == 1
+
+    def test_unknown_school_or_template(self, service):
+        with pytest.raises(ValueError, match="School 'XYZ' not found"):
+            service.render("XYZ", "Sample_Policy")
+        with pytest.raises(ValueError, match="Template 'Missing.docx' not found"):
+            service.render("STM", "Missing")
+
+    def test_missing_logo_or_logo_slot(self, fake_graph, service):
+        data = fake_graph.read_file("Policy Templates", "Sample_Policy.docx")
+        with zipfile.ZipFile(io.BytesIO(data)) as src:
+            out = io.BytesIO()
+            with zipfile.ZipFile(out, "w") as dst:
+                for name in src.namelist():
+                    dst.writestr(
+                        name, src.read(name).replace(b"logo_placeholder.png", b"crest.png")
+                    )
+        fake_graph.put_file("Policy Templates", "No_Logo.docx", out.getvalue())
+        fake_graph.delete_file("School Logos", "HFC.png")
+
+        with pytest.raises(MissingAssetError, match="No logo for school 'HFC'"):
+            service.render("HFC", "Sample_Policy")
+        with pytest.raises(MissingAssetError, match="has no logo slot"):
+            service.render("STM", "No_Logo")
@@ -0,0 +1,66 @@
+import io
+import json
+
+from policy_localiser.orchestrator.progress import (
+    ITEM_FINISHED,
+    ITEM_STARTED,
+    RUN_FINISHED,
+    RUN_STARTED,
+    CallbackSink,
+    JsonLinesSink,
+    ProgressEmitter,
+    RingBufferSink,
+    console_progress,
+)
+
+
+class TestProgressEmitter:
+    def test_disabled_without_sinks(self):
+        emitter = ProgressEmitter()
+        assert not emitter.enabled
+        emitter.emit(RUN_STARTED, "run1", total=1)  # no-op
+
+    def test_rate_limit_keeps_run_events_and_failures(self):
+        buffer = RingBufferSink()
+        emitter = ProgressEmitter([buffer], max_per_second=2)
+        emitter.emit(RUN_STARTED, "run1", total=10)
+        for n in range(10):
+            emitter.emit(ITEM_STARTED, "run1", "STM", f"P{n}")
+        emitter.emit(ITEM_FINISHED, "run1", "STM", "P9", always=True, status="Error")
+        emitter.emit(RUN_FINISHED, "run1", counts={})
+
+        types = [e.type for e in buffer.events()]
+        assert types[0] == RUN_STARTED
+        assert types.count(ITEM_STARTED) == 2
+        assert types[-2:] == [ITEM_FINISHED, RUN_FINISHED]
+        assert buffer.events()[-1].data["dropped"] == 8
+        assert emitter.dropped("run1") == 0
+
+    def test_ring_buffer_keeps_the_latest(self):
+        buffer = RingBufferSink(capacity=3)
+        emitter = ProgressEmitter([buffer], max_per_second=0)
+        for n in range(5):
+            emitter.emit(ITEM_STARTED, "run1", "STM", f"P{n}")
+        assert [e.template for e in buffer.events()] == ["P2", "P3", "P4"]
+
+
+class TestSinks:
+    def test_json_lines_round_trip(self, tmp_path):
+        path = tmp_path / "events" / "run.jsonl"
+        emitter = ProgressEmitter([JsonLinesSink(path)])
+        emitter.emit(RUN_STARTED, "run1", total=1)
+        emitter.emit(RUN_FINISHED, "run1", counts={"Success": 1})
+        emitter.close()
+
+        events = [json.loads(line) for line in path.read_text().splitlines()]
+        assert [e["type"] for e in events] == [RUN_STARTED, RUN_FINISHED]
+        assert events[1]["data"] == {"counts": {"Success": 1}, "dropped": 0}
+
+    def test_console_progress_line(self):
+        out = io.StringIO()
+        emitter = ProgressEmitter([CallbackSink(console_progress(out))])
+        emitter.emit(
+            ITEM_FINISHED, "run1", "STM", "Enrolment Policy",
+            status="Error", seconds=1.234, error="boom", completed=2, total=3,
+        )
+        assert out.getvalue() == "[2/3] STM / Enrolment Policy  Error 1.23s  boom\n"
@@ -0,0 +1,53 @@
+import base64
+import os
+
+from policy_localiser.graph.quickxor import quick_xor_hash
+
+U64 = (1 << 64) - 1
+
+
+def reference_hash(data: bytes) -> str:
+    """Line-by-line port of Microsoft's published C# QuickXorHash."""
+    width, shift = 160, 11
+    cells = [0, 0, 0]
+    vector_index, vector_offset = 0, 0
+    for i in range(min(len(data), width)):
+        is_last = vector_index == len(cells) - 1
+        bits_in_cell = width % 64 if is_last else 64
+        if vector_offset <= bits_in_cell - 8:
+            for j in range(i, len(data), width):
+                cells[vector_index] ^= (data[j] << vector_offset) & U64
+        else:
+            index2 = 0 if is_last else vector_index + 1
+            low = bits_in_cell - vector_offset
+            xored = 0
+            for j in range(i, len(data), width):
+                xored ^= data[j]
+            cells[vector_index] ^= (xored << vector_offset) & U64
+            cells[index2] ^= xored >> low
+        vector_offset += shift
+        while vector_offset >= bits_in_cell:
+            vector_index = 0 if is_last else vector_index + 1
+            vector_offset -= bits_in_cell
+
+    out = bytearray(20)
+    out[0:8] = cells[0].to_bytes(8, "little")
+    out[8:16] = cells[1].to_bytes(8, "little")
+    out[16:20] = cells[2].to_bytes(8, "little")[:4]
+    for i, b in enumerate(len(data).to_bytes(8, "little")):
+        out[12 + i] ^= b
+    return base64.b64encode(bytes(out)).decode("ascii")
+
+
+class TestQuickXorHash:
+    def test_empty(self):
+        assert quick_xor_hash(b"") == base64.b64encode(bytes(20)).decode()
+
+    def test_matches_reference_across_sizes(self):
+        for size in (1, 7, 159, 160, 161, 320, 1000, 4099):
+            data = os.urandom(size)
+            assert quick_xor_hash(data) == reference_hash(data), size
+
+    def test_fixture_template(self, template_path):
+        data = template_path.read_bytes()
+        assert quick_xor_hash(data) == reference_hash(data)
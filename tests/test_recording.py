@@ -0,0 +1,77 @@
+import zipfile
+
+import pytest
+
+from policy_localiser.graph.client import GraphClient
+from policy_localiser.graph.recording import (
+    RecordingSession,
+    ReplayMissError,
+    ReplaySession,
+    scrub_body,
+    scrub_url,
+)
+from policy_localiser.graph.sharepoint_files import SharePointFiles
+from policy_localiser.graph.sharepoint_lists import SharePointLists
+from policy_localiser.testing.fake_graph import FakeAuth
+
+
+class TestScrubbing:
+    def test_scrub_url_redacts_signed_params(self):
+        url = "https://x/download.aspx?UniqueId=abc&tempauth=eyJ0eXAi&$top=5"
+        scrubbed = scrub_url(url)
+        assert "eyJ0eXAi" not in scrubbed
+        assert "UniqueId=abc" in scrubbed
+        assert "$top=5" in scrubbed
+
+    def test_scrub_body_redacts_download_urls(self):
+        body = (
+            b'{"value": [{"name": "a.docx", '
+            b'"@microsoft.graph.downloadUrl": "https://x/d?tempauth=secret"}],'
+            b'"note": "https://y/?sig=abc"}'
+        )
+        scrubbed = scrub_body(body, "application/json; charset=utf-8")
+        assert b"secret" not in scrubbed
+        assert b"sig=abc" not in scrubbed
+        assert b"a.docx" in scrubbed
+
+    def test_binary_bodies_untouched(self):
+        assert scrub_body(b"\x89PNG", "image/png") == b"\x89PNG"
+
+
+class TestRecordReplay:
+    def test_replay_reproduces_recorded_run(self, fake_graph, tmp_path, logos_dir):
+        cassette = tmp_path / "run.zip"
+        recorder = GraphClient(
+            FakeAuth(),
+            base_url=fake_graph.base_url,
+            session=RecordingSession(cassette),
+        )
+        recorded_schools = SharePointLists(recorder, "site").get_schools()
+        files = SharePointFiles(recorder, "site")
+        drive = files.get_drive_id("School Logos")
+        files.download_file_by_name(drive, "STM.png", tmp_path / "rec.png")
+        recorder.close()
+
+        with zipfile.ZipFile(cassette) as zf:
+            assert "interactions.json" in zf.namelist()
+            assert b"fake-token" not in zf.read("interactions.json")
+
+        base_url = fake_graph.base_url
+        fake_graph.stop()  # replay must not touch the network
+        replayer = GraphClient(
+            FakeAuth(),
+            base_url=base_url,
+            session=ReplaySession(cassette, latency_scale=0),
+        )
+        assert SharePointLists(replayer, "site").get_schools() == recorded_schools
+        files = SharePointFiles(replayer, "site")
+        files.download_file_by_name(drive, "STM.png", tmp_path / "rep.png")
+        assert (tmp_path / "rep.png").read_bytes() == (logos_dir / "STM.png").read_bytes()
+
+    def test_unrecorded_request_is_a_miss(self, tmp_path):
+        cassette = tmp_path / "empty.zip"
+        RecordingSession(cassette).close()
+        client = GraphClient(FakeAuth(), session=ReplaySession(cassette, latency_scale=0))
+        with pytest.raises(ReplayMissError):
+            client.get("/sites/site/drives")
+
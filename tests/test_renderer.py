@@ -1,11 +1,14 @@
+import io
 import re
+import zipfile
 from pathlib import Path
 
+import pytest
 from docx import Document
 from lxml import etree
 
 from policy_localiser.engine.models import ProcessingStatus
-from policy_localiser.engine.renderer import PolicyRenderer
+from policy_localiser.engine.renderer import PolicyRenderer, TemplateCache
 
 
 class TestPolicyRenderer:
@@ -120,6 +123,25 @@ class TestPolicyRenderer:
         assert result.status == ProcessingStatus.ERROR
         assert result.error_message is not None
 
+    def test_logo_written_over_placeholder_media(
+        self, template_path, logos_dir, stm_school
+    ):
+        data = PolicyRenderer().render_bytes(
+            template_path, logos_dir / "STM.png", stm_school
+        )
+
+        with zipfile.ZipFile(io.BytesIO(data)) as docx:
+            assert docx.read("word/media/image1.png") == (logos_dir / "STM.png").read_bytes()
+
+    def test_error_on_template_without_logo_slot(self, template_path, logos_dir, stm_school, tmp_path):
+        template = tmp_path / "No_Logo.docx"
+        with zipfile.ZipFile(template_path) as src, zipfile.ZipFile(template, "w") as dst:
+            for name in src.namelist():
+                dst.writestr(name, src.read(name).replace(b"logo_placeholder.png", b"crest.png"))
+
+        with pytest.raises(RuntimeError, match="no logo slot"):
+            PolicyRenderer().render_bytes(template, logos_dir / "STM.png", stm_school)
+
     def test_different_schools_produce_different_output(
         self, template_path, logos_dir, sample_schools, tmp_path
     ):
@@ -141,3 +163,45 @@ class TestPolicyRenderer:
         assert "St Mary's Primary School" in outputs["STM"]
         assert "Holy Family College" in outputs["HFC"]
         assert "St Mary's Primary School" not in outputs["HFC"]
+
+    def test_rerender_is_byte_identical(self, template_path, logos_dir, stm_school, tmp_path):
+        renderer = PolicyRenderer()
+        outputs = []
+        for name in ("first.docx", "second.docx"):
+            output = tmp_path / name
+            renderer.render(
+                template_path=template_path,
+                logo_path=logos_dir / "STM.png",
+                school=stm_school,
+                output_path=output,
+                run_id="test008",
+            )
+            outputs.append(output.read_bytes())
+
+        # Stable bytes let the SharePoint pipeline skip unchanged uploads
+        assert outputs[0] == outputs[1]
+
+
+class TestTemplateCache:
+    def test_reads_once_until_the_file_changes(self, template_path, tmp_path):
+        template = tmp_path / "Policy.docx"
+        template.write_bytes(template_path.read_bytes())
+        cache = TemplateCache()
+
+        first = cache.load(template)
+        assert cache.load(template) is first
+        template.write_bytes(first + b"\0")
+
+        assert cache.load(template) == first + b"\0"
+        assert (cache.hits, cache.misses) == (1, 2)
+
+    def test_cached_render_matches_uncached(
+        self, template_path, logos_dir, stm_school, tmp_path
+    ):
+        outputs = []
+        for renderer in (PolicyRenderer(), PolicyRenderer(TemplateCache())):
+            output = tmp_path / f"{len(outputs)}.docx"
+            renderer.render(template_path, logos_dir / "STM.png", stm_school, output, "r1")
+            outputs.append(output.read_bytes())
+
+        assert outputs[0] == outputs[1]
@@ -0,0 +1,98 @@
+import threading
+
+import requests
+
+from policy_localiser.graph.response_cache import ResponseCache
+from policy_localiser.graph.sharepoint_files import SharePointFiles
+from policy_localiser.graph.sharepoint_lists import SharePointLists
+from policy_localiser.metrics import GRAPH_CACHE
+
+
+class TestResponseCache:
+    def test_ttl_expiry_and_lru_eviction(self):
+        now = [0.0]
+        cache = ResponseCache(max_entries=2, clock=lambda: now[0])
+        calls = []
+
+        def call(name):
+            calls.append(name)
+            return name
+
+        assert cache.fetch("a", lambda: call("a"), ttl=10) == "a"
+        assert cache.fetch("a", lambda: call("a"), ttl=10) == "a"
+        cache.fetch("b", lambda: call("b"), ttl=10)
+        cache.fetch("c", lambda: call("c"), ttl=10)  # evicts a
+        cache.fetch("a", lambda: call("a"), ttl=10)
+        now[0] = 11.0
+        cache.fetch("a", lambda: call("a"), ttl=10)  # expired
+        cache.fetch("a", lambda: call("a"))  # no ttl: never cached
+
+        assert calls == ["a", "b", "c", "a", "a", "a"]
+        assert (cache.hits, cache.misses) == (1, 5)
+
+    def test_failures_are_shared_but_not_cached(self):
+        cache = ResponseCache()
+        release = threading.Event()
+        errors = []
+
+        def failing():
+            release.wait(1)
+            raise requests.ConnectionError("reset")
+
+        def caller():
+            try:
+                cache.fetch("k", failing, ttl=60)
+            except requests.ConnectionError as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=caller) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        while cache.coalesced < 2:
+            threading.Event().wait(0.01)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        assert len(errors) == 3 and cache.misses == 1
+        assert cache.fetch("k", lambda: "ok", ttl=60) == "ok"
+
+
+class TestGraphClientCaching:
+    def test_metadata_lookups_are_cached_across_instances(self, fake_graph, fake_client):
+        hits = GRAPH_CACHE.value(result="hit")
+        for _ in range(3):
+            SharePointFiles(fake_client, "site").get_drive_id("School Logos")
+            SharePointLists(fake_client, "site").get_schools()
+
+        assert fake_graph.request_counts["GET /sites/{site}/drives"] == 1
+        assert fake_graph.request_counts["GET /sites/{site}/lists"] == 1
+        assert fake_graph.request_counts["GET /sites/{site}/lists/{list_id}/items"] == 1
+        assert GRAPH_CACHE.value(result="hit") - hits == 6
+
+        fake_client.response_cache.invalidate("/sites/site/lists")
+        SharePointLists(fake_client, "site").get_schools()
+        assert fake_graph.request_counts["GET /sites/{site}/lists/{list_id}/items"] == 2
+
+    def test_concurrent_identical_gets_share_one_call(self, fake_graph, fake_client):
+        fake_graph.config.latency = 0.2
+        drive = SharePointFiles(fake_client, "site").get_drive_id("School Logos")
+        fake_graph.request_counts.clear()
+        path = f"/drives/{drive}/root/children?$top=999"
+        responses = []
+
+        threads = [
+            threading.Thread(target=lambda: responses.append(fake_client.get(path)))
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert fake_graph.request_counts["GET /drives/{drive}/root/children"] == 1
+        assert len({id(r) for r in responses}) == 1
+        assert fake_client.response_cache.coalesced == 3
+        # Not opted in to caching: the next call goes to Graph again
+        fake_client.get(path)
+        assert fake_graph.request_counts["GET /drives/{drive}/root/children"] == 2
@@ -0,0 +1,149 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from policy_localiser.config import Config
+from policy_localiser.engine.models import ProcessingResult, ProcessingStatus
+from policy_localiser.orchestrator.context import AppContext
+from policy_localiser.orchestrator.run_status import (
+    COMPLETED,
+    FAILED,
+    QUEUED,
+    RUNNING,
+    RunStatus,
+    RunStatusStore,
+    RunTracker,
+)
+from policy_localiser.testing.fake_graph import FakeAuth
+
+
+def result(code, status=ProcessingStatus.SUCCESS, **timings):
+    return ProcessingResult(
+        run_id="run1",
+        run_date=datetime.now(),
+        school_code=code,
+        policy_name="Sample_Policy",
+        status=status,
+        error_message="boom" if status == ProcessingStatus.ERROR else None,
+        timings=timings,
+    )
+
+
+@pytest.fixture
+def context(fake_graph, tmp_path):
+    config = Config(
+        sharepoint_site_id="site",
+        checkpoint_dir=tmp_path / "checkpoints",
+        history_db_path=tmp_path / "history.db",
+        run_record_dir=tmp_path / "runs",
+        delta_state_path=tmp_path / "state.json",
+    )
+    return AppContext(config, auth=FakeAuth(), base_url=fake_graph.base_url)
+
+
+class TestRunTracker:
+    def test_progress_counts_and_stage_timings(self, tmp_path):
+        store = RunStatusStore(tmp_path)
+        tracker = RunTracker(store, "run1", {"schools": ["STM"]}, interval=0)
+        tracker.submit()
+        assert store.load("run1").state == QUEUED
+
+        tracker.start()
+        tracker.begin(3, [result("STM", render=1.0)])
+        tracker.record(result("HFC", render=2.0, upload=0.5))
+        tracker.record(result("SJV", ProcessingStatus.ERROR, render=0.5))
+
+        status = store.load("run1")
+        assert (status.total, status.processed) == (3, 3)
+        assert status.counts == {"Success": 2, "Error": 1}
+        assert status.stages["render"] == {
+            "count": 3, "total_seconds": 3.5, "mean_seconds": 1.167,
+        }
+        assert status.failures == [
+            {"school": "SJV", "template": "Sample_Policy", "error": "boom"}
+        ]
+        assert status.request == {"schools": ["STM"]}
+
+    def test_saves_are_throttled_between_state_changes(self, tmp_path):
+        store = RunStatusStore(tmp_path)
+        tracker = RunTracker(store, "run1", interval=60)
+        tracker.start()
+        tracker.begin(2, [])
+        tracker.record(result("STM"))
+        assert store.load("run1").processed == 0
+
+        tracker.finish()
+        assert store.load("run1").processed == 1
+
+    def test_only_silent_queued_or_running_runs_are_stale(self):
+        updated = datetime(2026, 1, 15, 2, 0)
+        later = updated + timedelta(seconds=400)
+
+        for state in (QUEUED, RUNNING):
+            status = RunStatus("run1", state, updated=updated.isoformat())
+            assert status.is_stale(360, now=later)
+            assert not status.is_stale(600, now=later)
+        finished = RunStatus("run1", COMPLETED, updated=updated.isoformat())
+        assert not finished.is_stale(360, now=later)
+
+    def test_unknown_or_malformed_run_id(self, tmp_path):
+        store = RunStatusStore(tmp_path / "runs")
+        assert store.load("nope") is None
+        assert store.load("../runs") is None
+
+
+class TestBackgroundRun:
+    def test_submitted_run_reports_completion(self, context):
+        run_id = context.submit_run({"schools": ["STM", "HFC"]})
+        assert context.status_store.load(run_id).state == QUEUED
+
+        status = context.execute_run(run_id, {"schools": ["STM", "HFC"]})
+
+        assert status.state == COMPLETED
+        assert status.total == status.processed == 2
+        assert status.counts == {"Success": 2}
+        assert set(status.stages) >= {"render", "upload"}
+        assert context.status_store.load(run_id).to_dict() == status.to_dict()
+
+    def test_failed_run_is_recorded_not_raised(self, context):
+        run_id = context.submit_run({"resume": "missing"})
+
+        status = context.execute_run(run_id, {"resume": "missing"})
+
+        assert run_id == "missing"
+        assert status.state == FAILED
+        assert "No checkpoint" in status.error
+
+    def test_queued_run_cannot_be_submitted_again(self, context):
+        run_id = context.submit_run({})
+        with pytest.raises(RuntimeError):
+            context.submit_run({"resume": run_id})
+        with pytest.raises(ValueError):
+            context.submit_run({"resume": "../etc"})
+
+    def test_dead_run_can_be_resumed_once_stale(self, context):
+        run_id = context.submit_run({})
+        RunTracker(context.status_store, run_id).start()
+        with pytest.raises(RuntimeError, match="already running"):
+            context.submit_run({"resume": run_id}, stale_after=3600)
+
+        # The host running it was recycled long ago
+        status = context.status_store.load(run_id)
+        status.updated = (datetime.now() - timedelta(hours=2)).isoformat()
+        context.status_store.save(status)
+
+        assert context.submit_run({"resume": run_id}, stale_after=3600) == run_id
+        assert context.status_store.load(run_id).state == QUEUED
+
+    def test_redelivered_message_resumes_the_run(self, context):
+        request = {"schools": ["STM", "HFC"]}
+        run_id = context.submit_run(request)
+        context.execute_run(run_id, request)
+
+        # At-least-once delivery: the same message is processed again
+        status = context.execute_run(run_id, request)
+
+        assert status.state == COMPLETED
+        assert status.counts == {"Success": 2}
+        resumed = context.execute_run(run_id, {"resume": run_id})
+        assert resumed.state == COMPLETED
@@ -0,0 +1,81 @@
+from datetime import datetime
+
+import pytest
+
+from policy_localiser.engine.models import ProcessingResult, ProcessingStatus
+from policy_localiser.orchestrator.history import RunHistory
+from policy_localiser.orchestrator.scheduling import (
+    CostModel,
+    order_work,
+    part_count,
+    simulate_makespan,
+)
+
+
+def write_template(tmp_path, name, size):
+    path = tmp_path / f"{name}.docx"
+    path.write_bytes(b"x" * size)
+    return path
+
+
+def record(history, policy, seconds):
+    history.record(ProcessingResult(
+        run_id="r1",
+        run_date=datetime(2026, 1, 15),
+        school_code="STM",
+        policy_name=policy,
+        status=ProcessingStatus.SUCCESS,
+        duration_seconds=seconds,
+    ))
+
+
+class TestCostModel:
+    def test_history_wins_and_calibrates_size_fallback(self, tmp_path):
+        history = RunHistory(tmp_path / "h.db")
+        record(history, "Known", 2.0)
+        record(history, "Known", 4.0)
+        known = write_template(tmp_path, "Known", 1000)
+        new = write_template(tmp_path, "New", 500)
+
+        costs = CostModel(history).estimate([known, new])
+
+        assert costs["Known"] == (3.0, "history")
+        # 3s per 1000 bytes learned from Known
+        assert costs["New"] == (pytest.approx(1.5), "size")
+
+    def test_without_history_size_orders_templates(self, tmp_path):
+        small = write_template(tmp_path, "Small", 10)
+        big = write_template(tmp_path, "Big", 10_000)
+        costs = CostModel().estimate([small, big])
+        assert costs["Big"][0] > costs["Small"][0]
+        assert costs["Big"][1] == "size"
+
+    def test_part_count_fallback(self, template_path):
+        assert part_count(template_path) > 0
+        costs = CostModel(fallback="parts").estimate([template_path])
+        assert costs[template_path.stem][1] == "parts"
+
+
+class TestOrderWork:
+    def test_lpt_beats_fixed_order(self, tmp_path):
+        templates = [tmp_path / f"{n}.docx" for n in ("A", "B", "Huge")]
+        costs = {"A": (1.0, "history"), "B": (1.0, "history"), "Huge": (6.0, "history")}
+        work = [(school, t) for school in ("S1", "S2") for t in templates]
+
+        fixed, fixed_report = order_work(work, costs, "fixed", workers=2)
+        lpt, lpt_report = order_work(work, costs, "lpt", workers=2)
+
+        assert fixed == work
+        assert [t.stem for _, t in lpt[:2]] == ["Huge", "Huge"]
+        assert lpt_report.estimated_makespan == 8.0
+        assert fixed_report.estimated_makespan > lpt_report.estimated_makespan
+        assert lpt_report.sources == {"history": 3}
+        assert "lpt on 2 worker(s)" in lpt_report.summary()
+
+    def test_unknown_strategy(self):
+        with pytest.raises(ValueError):
+            order_work([], {}, "random", workers=1)
+
+    def test_simulate_makespan(self):
+        assert simulate_makespan([3, 3, 2, 2, 2], workers=2) == 7
+        assert simulate_makespan([1, 2], workers=1) == 3
@@ -0,0 +1,87 @@
+from policy_localiser.engine.models import ProcessingStatus
+from policy_localiser.graph.sharepoint_files import SharePointFiles
+from policy_localiser.graph.sharepoint_lists import SharePointLists
+from policy_localiser.orchestrator.asset_cache import AssetCache
+from policy_localiser.orchestrator.sharding import (
+    RunRecord,
+    Shard,
+    ShardQueue,
+    drain_queue,
+    plan_shards,
+    start_run,
+)
+from policy_localiser.orchestrator.sharepoint_pipeline import SharePointPipeline
+
+
+class TestPlanShards:
+    def test_blocks_of_schools(self):
+        shards = plan_shards("run", ["A", "B", "C", "D", "E"], ["P"], schools_per_shard=2)
+        assert [s.school_codes for s in shards] == [["A", "B"], ["C", "D"], ["E"]]
+        assert [s.index for s in shards] == [0, 1, 2]
+        assert all(s.template_names == ["P"] for s in shards)
+
+    def test_message_round_trip(self):
+        shard = Shard("run", 3, ["STM"], None)
+        assert Shard.from_message(shard.to_message()) == shard
+
+
+class TestShardQueue:
+    def test_received_message_is_hidden_until_timeout(self, tmp_path):
+        queue = ShardQueue(tmp_path / "q.db")
+        queue.send("one")
+
+        first = queue.receive(visibility_timeout=60)
+        assert first.body == "one"
+        assert queue.receive() is None
+
+        queue.delete(first)
+        assert len(queue) == 0
+
+    def test_undeleted_message_is_redelivered_then_poisoned(self, tmp_path):
+        queue = ShardQueue(tmp_path / "q.db", max_dequeue_count=2)
+        queue.send("flaky")
+
+        assert queue.receive(visibility_timeout=0).dequeue_count == 1
+        assert queue.receive(visibility_timeout=0).dequeue_count == 2
+        assert queue.receive(visibility_timeout=0) is None
+        assert queue.poison_count() == 1
+
+
+class TestShardedRun:
+    def test_workers_complete_run_record(self, fake_graph, fake_client, tmp_path):
+        sp_lists = SharePointLists(fake_client, "site")
+        sp_files = SharePointFiles(fake_client, "site")
+        queue = ShardQueue(tmp_path / "q.db")
+        run_root = tmp_path / "runs"
+
+        shards = start_run(sp_lists, run_root, schools_per_shard=2)
+        for shard in shards:
+            queue.send(shard.to_message())
+        record = RunRecord(run_root, shards[0].run_id)
+        assert record.pending_shards() == [0, 1]
+
+        cache = AssetCache(tmp_path / "cache")
+        pipeline = SharePointPipeline(sp_lists, sp_files, asset_cache=cache)
+        assert drain_queue(queue, pipeline, run_root) == 2
+
+        assert record.is_complete()
+        results = record.results()
+        assert len(results) == 3
+        assert {r.run_id for r in results} == {shards[0].run_id}
+        assert all(r.status == ProcessingStatus.SUCCESS for r in results)
+        # The second shard reuses the template from the warm cache
+        assert cache.hits >= 1
+
+    def test_failed_shard_stays_queued(self, fake_graph, fake_client, tmp_path):
+        sp_lists = SharePointLists(fake_client, "site")
+        queue = ShardQueue(tmp_path / "q.db")
+        shards = start_run(sp_lists, tmp_path / "runs", school_filter=["STM"])
+        queue.send(shards[0].to_message())
+
+        class BrokenPipeline:
+            def run(self, **kwargs):
+                raise RuntimeError("worker crashed")
+
+        assert drain_queue(queue, BrokenPipeline(), tmp_path / "runs") == 0
+        assert len(queue) == 1
+        assert RunRecord(tmp_path / "runs", shards[0].run_id).pending_shards() == [0]
@@ -0,0 +1,75 @@
+from policy_localiser.graph.sharepoint_files import SharePointFiles
+
+
+class FakeResponse:
+    def __init__(self, data):
+        self._data = data
+
+    def json(self):
+        return self._data
+
+
+class FakeClient:
+    """Serves canned GET pages and records batched requests."""
+
+    def __init__(self, pages, batch_statuses=None):
+        self.pages = pages
+        self.batch_statuses = batch_statuses or {}
+        self.gets = []
+        self.batches = []
+
+    def get(self, url, params=None):
+        self.gets.append(url)
+        return FakeResponse(self.pages[url])
+
+    def batch(self, requests_):
+        self.batches.append(requests_)
+        responses = []
+        for sub in requests_:
+            name = sub["body"]["name"]
+            status = self.batch_statuses.get(name, 201)
+            responses.append({"status": status, "body": {"id": f"new-{name}"}})
+        return responses
+
+
+ROOT = "/drives/d1/root/children?$select=id,name,folder&$top=999"
+
+
+class TestReconcileFolders:
+    def test_lists_once_with_paging_and_creates_only_missing(self):
+        client = FakeClient({
+            ROOT: {
+                "value": [{"id": "1", "name": "STM - St Mary's", "folder": {}}],
+                "@odata.nextLink": "page2",
+            },
+            "page2": {
+                "value": [
+                    {"id": "2", "name": "hfc - holy family", "folder": {}},
+                    {"id": "3", "name": "SJV - St John", "file": {}},
+                ],
+            },
+        })
+        files = SharePointFiles(client, "site")
+
+        ids = files.reconcile_folders(
+            "d1", ["STM - St Mary's", "HFC - Holy Family", "SJV - St John"]
+        )
+
+        assert ids == {
+            "STM - St Mary's": "1",
+            "HFC - Holy Family": "2",
+            "SJV - St John": "new-SJV - St John",
+        }
+        assert client.gets == [ROOT, "page2"]
+        assert len(client.batches) == 1
+        assert [r["body"]["name"] for r in client.batches[0]] == ["SJV - St John"]
+
+    def test_nothing_missing_means_no_batch(self):
+        client = FakeClient({ROOT: {"value": [{"id": "1", "name": "A", "folder": {}}]}})
+        assert SharePointFiles(client, "site").reconcile_folders("d1", ["A"]) == {"A": "1"}
+        assert client.batches == []
+
+    def test_failed_creation_is_left_out(self):
+        client = FakeClient({ROOT: {"value": []}}, batch_statuses={"B": 403})
+        ids = SharePointFiles(client, "site").reconcile_folders("d1", ["A", "B"])
+        assert ids == {"A": "new-A"}
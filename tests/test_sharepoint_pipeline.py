@@ -0,0 +1,255 @@
+import itertools
+
+import pytest
+
+from policy_localiser.engine.models import ProcessingStatus
+from policy_localiser.graph.sharepoint_files import SharePointFiles
+from policy_localiser.graph.quickxor import quick_xor_hash
+from policy_localiser.graph.sharepoint_lists import SharePointLists
+from policy_localiser.metrics import (
+    ACTIVE_WORKERS,
+    DOCUMENTS,
+    GRAPH_THROTTLES,
+    QUEUE_DEPTH,
+    STAGE_SECONDS,
+)
+from policy_localiser.orchestrator.deadline import Deadline
+from policy_localiser.orchestrator.history import RunHistory
+from policy_localiser.orchestrator.progress import ProgressEmitter, RingBufferSink
+from policy_localiser.orchestrator.sharepoint_pipeline import SharePointPipeline
+from policy_localiser.orchestrator.sinks import NullSink
+
+
+def make_pipeline(client):
+    return SharePointPipeline(
+        SharePointLists(client, "site"), SharePointFiles(client, "site")
+    )
+
+
+class TestSharePointPipeline:
+    def test_renders_and_uploads_every_combination(self, fake_graph, fake_client):
+        results = make_pipeline(fake_client).run()
+
+        assert len(results) == 3
+        assert all(r.status == ProcessingStatus.SUCCESS for r in results)
+        assert "STM - St Mary's Primary School/Sample_Policy.docx" in fake_graph.files(
+            "Localised Policies"
+        )
+        assert len(fake_graph.list_items("Processing Log")) == 3
+
+    def test_rerun_skips_unchanged_uploads(self, fake_graph, fake_client):
+        pipeline = make_pipeline(fake_client)
+        pipeline.run()
+        results = pipeline.run()
+
+        assert [r.status for r in results] == [ProcessingStatus.SKIPPED] * 3
+
+    def test_survives_throttling(self, fake_graph, fake_client):
+        fake_graph.config.throttle_rate = 0.2
+        results = make_pipeline(fake_client).run(school_filter=["STM"])
+
+        assert [r.status for r in results] == [ProcessingStatus.SUCCESS]
+        assert fake_client.throttle_stats().throttled > 0
+
+    def test_metrics_track_documents_stages_and_throttles(
+        self, fake_graph, fake_client
+    ):
+        fake_graph.config.throttle_rate = 0.2
+        success = DOCUMENTS.value(status="Success")
+        uploads = STAGE_SECONDS.count(stage="upload")
+        throttles = GRAPH_THROTTLES.value()
+
+        make_pipeline(fake_client).run()
+
+        assert DOCUMENTS.value(status="Success") - success == 3
+        assert STAGE_SECONDS.count(stage="upload") - uploads == 3
+        stats = fake_client.throttle_stats()
+        assert GRAPH_THROTTLES.value() - throttles == stats.throttled + stats.unavailable
+        assert QUEUE_DEPTH.value() == 0
+        assert ACTIVE_WORKERS.value() == 0
+
+    def test_progress_events_include_uploads(self, fake_graph, fake_client):
+        buffer = RingBufferSink()
+        pipeline = SharePointPipeline(
+            SharePointLists(fake_client, "site"),
+            SharePointFiles(fake_client, "site"),
+            progress=ProgressEmitter([buffer], max_per_second=0),
+        )
+        pipeline.run(school_filter=["STM"])
+
+        events = buffer.events()
+        assert [e.type for e in events] == [
+            "run_started", "item_started", "upload_done", "item_finished", "run_finished",
+        ]
+        assert events[2].data["bytes"] > 0
+        assert set(events[3].data["timings"]) >= {"render", "upload"}
+        assert events[-1].run_id == pipeline.run_id
+
+    def test_incremental_rerenders_only_changed_school(
+        self, fake_graph, fake_client, tmp_path
+    ):
+        pipeline = make_pipeline(fake_client)
+        state = tmp_path / "state.json"
+        assert len(pipeline.run_incremental(state)) == 3
+
+        fake_graph.update_list_item("School Directory", "2", {"PrincipalName": "New"})
+        results = pipeline.run_incremental(state)
+
+        assert [r.school_code for r in results] == ["HFC"]
+        # Sharing still sees every school, not just the one with work
+        assert len(pipeline.schools) == 3
+        assert pipeline.run_incremental(state) == []
+        assert len(pipeline.schools) == 3
+
+    def test_resume_continues_interrupted_run(self, fake_graph, fake_client, tmp_path):
+        pipeline = SharePointPipeline(
+            SharePointLists(fake_client, "site"),
+            SharePointFiles(fake_client, "site"),
+            checkpoint_dir=tmp_path / "checkpoints",
+        )
+        upload = pipeline._sp_files.upload_file
+        uploads = []
+
+        def interrupted_upload(*args, **kwargs):
+            if len(uploads) == 2:
+                raise RuntimeError("host recycled")
+            uploads.append(args)
+            return upload(*args, **kwargs)
+
+        pipeline._sp_files.upload_file = interrupted_upload
+        with pytest.raises(RuntimeError, match="host recycled"):
+            pipeline.run()
+        run_id = pipeline.run_id
+
+        pipeline._sp_files.upload_file = upload
+        fake_graph.request_counts.clear()
+        results = pipeline.run(resume=run_id)
+
+        assert len(results) == 3
+        assert {r.run_id for r in results} == {run_id}
+        assert all(r.status == ProcessingStatus.SUCCESS for r in results)
+        assert len(fake_graph.list_items("Processing Log")) == 3
+        # Only the unfinished pair's template and logo are downloaded again
+        downloads = sum(
+            count for name, count in fake_graph.request_counts.items()
+            if name.startswith("GET") and name.endswith("content")
+        )
+        assert downloads == 2
+
+    def test_deadline_defers_work_for_resume(self, fake_graph, fake_client, tmp_path):
+        pipeline = SharePointPipeline(
+            SharePointLists(fake_client, "site"),
+            SharePointFiles(fake_client, "site"),
+            checkpoint_dir=tmp_path / "checkpoints",
+            scheduling="fixed",
+        )
+        # Time enough for the first document only
+        clock = itertools.chain([0.0, 0.0], itertools.repeat(1000.0))
+        results = pipeline.run(deadline=Deadline(100, clock=lambda: next(clock)))
+
+        assert [r.school_code for r in results] == ["STM"]
+        assert pipeline.deferred == [("HFC", "Sample_Policy"), ("SJV", "Sample_Policy")]
+        assert pipeline.continuation == pipeline.run_id
+        assert len(fake_graph.list_items("Processing Log")) == 1
+
+        results = pipeline.run(resume=pipeline.continuation)
+        assert [r.school_code for r in results] == ["STM", "HFC", "SJV"]
+        assert pipeline.deferred == [] and pipeline.continuation is None
+        assert len(fake_graph.list_items("Processing Log")) == 3
+
+    def test_incremental_continuation_resumes_only_changed_pairs(
+        self, fake_graph, fake_client, tmp_path
+    ):
+        pipeline = SharePointPipeline(
+            SharePointLists(fake_client, "site"),
+            SharePointFiles(fake_client, "site"),
+            checkpoint_dir=tmp_path / "checkpoints",
+            scheduling="fixed",
+        )
+        state = tmp_path / "state.json"
+        pipeline.run_incremental(state)
+        fake_graph.update_list_item("School Directory", "2", {"PrincipalName": "New"})
+        fake_graph.update_list_item("School Directory", "3", {"PrincipalName": "New"})
+
+        clock = itertools.chain([0.0, 0.0], itertools.repeat(1000.0))
+        results = pipeline.run_incremental(
+            state, deadline=Deadline(100, clock=lambda: next(clock))
+        )
+        assert [r.school_code for r in results] == ["HFC"]
+        assert pipeline.deferred == [("SJV", "Sample_Policy")]
+
+        results = pipeline.run(resume=pipeline.continuation)
+        assert [r.school_code for r in results] == ["HFC", "SJV"]
+
+    def test_history_records_timings_and_hashes(self, fake_graph, fake_client, tmp_path):
+        history = RunHistory(tmp_path / "history.db")
+        pipeline = SharePointPipeline(
+            SharePointLists(fake_client, "site"),
+            SharePointFiles(fake_client, "site"),
+            history=history,
+        )
+        pipeline.run(school_filter=["STM"])
+
+        [result] = history.run_results(pipeline.run_id)
+        assert result.status == ProcessingStatus.SUCCESS
+        assert set(result.timings) == {"render", "compare", "upload"}
+        assert result.template_hash and result.logo_hash and result.school_hash
+        uploaded = fake_graph.read_file(
+            "Localised Policies", "STM - St Mary's Primary School/Sample_Policy.docx"
+        )
+        assert result.output_hash == quick_xor_hash(uploaded)
+        assert history.recent_runs()[0]["success"] == 1
+
+    def test_parallel_workers_keep_result_order(self, fake_graph, fake_client):
+        pipeline = SharePointPipeline(
+            SharePointLists(fake_client, "site"),
+            SharePointFiles(fake_client, "site"),
+            workers=3,
+        )
+        results = pipeline.run()
+
+        assert [r.school_code for r in results] == ["STM", "HFC", "SJV"]
+        assert all(r.status == ProcessingStatus.SUCCESS for r in results)
+        assert pipeline.schedule_report.workers == 3
+        assert pipeline.schedule_report.items == 3
+
+    def test_null_sink_renders_without_uploading(self, fake_graph, fake_client, tmp_path):
+        pipeline = SharePointPipeline(
+            SharePointLists(fake_client, "site"),
+            SharePointFiles(fake_client, "site"),
+            workers=2,
+            upload_workers=3,
+            sink=NullSink(tmp_path),
+        )
+        results = pipeline.run()
+
+        assert all(r.status == ProcessingStatus.SUCCESS for r in results)
+        assert all(r.logo_hash for r in results)
+        assert fake_graph.files("Localised Policies") == []
+        assert len(fake_graph.list_items("Processing Log")) == 3
+
+    def test_plan_predicts_uploads_then_skips(self, fake_graph, fake_client, tmp_path):
+        pipeline = SharePointPipeline(
+            SharePointLists(fake_client, "site"),
+            SharePointFiles(fake_client, "site"),
+            history=RunHistory(tmp_path / "history.db"),
+        )
+        first = pipeline.plan()
+        assert first.action_counts() == {"upload": 3}
+        assert first.request_counts["PUT /drives/{drive}/items/{item}:/{name}:/content"] == 3
+        assert first.request_counts["POST /$batch"] == 1
+        assert not first.blocking
+        assert fake_graph.files("Localised Policies") == []  # nothing written
+
+        pipeline.run()
+        second = pipeline.plan()
+        assert second.action_counts() == {"skip": 3}
+        assert "POST /$batch" not in second.request_counts
+        assert second.estimated_seconds > 0
+
+    def test_plan_reports_missing_logo(self, fake_graph, fake_client):
+        fake_graph.delete_file("School Logos", "STM.png")
+        plan = make_pipeline(fake_client).plan(school_filter=["STM"])
+        assert [e.message for e in plan.blocking] == [
+            "Logo not found for STM: School Logos/STM.png"
+        ]
@@ -0,0 +1,166 @@
+import threading
+import zipfile
+from datetime import datetime, timezone
+
+import pytest
+
+from policy_localiser.engine.models import ProcessingResult, ProcessingStatus
+from policy_localiser.metrics import ACTIVE_WORKERS, QUEUE_DEPTH
+from policy_localiser.orchestrator.sinks import DocumentSink, ZipBundleSink
+from policy_localiser.orchestrator.stages import OncePerKey, StagedPipeline, WorkItem
+
+
+class FakeRenderer:
+    """Writes the school code as the document; fails for school "BAD"."""
+
+    def __init__(self):
+        self.rendered = []
+        self._lock = threading.Lock()
+
+    def render(self, template_path, logo_path, school, output_path, run_id):
+        with self._lock:
+            self.rendered.append(school.SchoolCode)
+        status = ProcessingStatus.SUCCESS
+        if school.SchoolCode == "BAD":
+            status = ProcessingStatus.ERROR
+        else:
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            output_path.write_text(school.SchoolCode)
+        return ProcessingResult(
+            run_id, datetime.now(timezone.utc), school.SchoolCode,
+            template_path.stem, status, duration_seconds=0.01,
+        )
+
+
+def make_items(schools, tmp_path):
+    template = tmp_path / "Policy.docx"
+    return [
+        WorkItem(index, school, template, tmp_path / f"{school.SchoolCode}.png")
+        for index, school in enumerate(schools)
+    ]
+
+
+class TestStagedPipeline:
+    def test_results_in_index_order_with_parallel_stages(self, sample_schools, tmp_path):
+        sink = ZipBundleSink(tmp_path / "staging", tmp_path / "bundle.zip")
+        logged = []
+        stages = StagedPipeline(
+            FakeRenderer(), sink, "run1", record=logged.append,
+            render_workers=3, sink_workers=2,
+        )
+        items = make_items(sample_schools, tmp_path)
+
+        results = stages.run(list(reversed(items)))
+        sink.close()
+
+        assert [r.school_code for r in results] == [s.SchoolCode for s in sample_schools]
+        assert len(logged) == 3
+        with zipfile.ZipFile(tmp_path / "bundle.zip") as bundle:
+            name = f"{sample_schools[0].folder_name}/Policy.docx"
+            assert bundle.read(name) == sample_schools[0].SchoolCode.encode()
+            assert len(bundle.namelist()) == 3
+
+    def test_failures_per_document_skip_the_sink(self, sample_schools, tmp_path):
+        written = []
+
+        class RecordingSink(DocumentSink):
+            def write(self, item):
+                written.append(item.school.SchoolCode)
+
+        sample_schools[1].SchoolCode = "BAD"
+
+        def fetch(item):
+            if item.school.SchoolCode == sample_schools[2].SchoolCode:
+                raise RuntimeError("logo download failed")
+            return {"logo_hash": "abc"}
+
+        stages = StagedPipeline(
+            FakeRenderer(), RecordingSink(tmp_path), "run1", fetch=fetch
+        )
+        results = stages.run(make_items(sample_schools, tmp_path))
+
+        assert [r.status for r in results] == [
+            ProcessingStatus.SUCCESS, ProcessingStatus.ERROR, ProcessingStatus.ERROR,
+        ]
+        assert results[0].logo_hash == "abc"
+        assert results[2].error_message == "logo download failed"
+        assert written == [sample_schools[0].SchoolCode]
+
+    def test_deferred_documents_fetch_nothing(self, sample_schools, tmp_path):
+        fetched = []
+        stages = StagedPipeline(
+            FakeRenderer(), DocumentSink(tmp_path), "run1",
+            fetch=lambda item: fetched.append(item.index),
+            admit=lambda item: item.index == 0,
+        )
+        results = stages.run(make_items(sample_schools, tmp_path))
+
+        assert [r.status for r in results] == [ProcessingStatus.SUCCESS]
+        assert fetched == [0]
+        assert [item.index for item in stages.deferred] == [1, 2]
+
+    def test_bounded_queues_hold_back_rendering(self, sample_schools, tmp_path):
+        release = threading.Event()
+
+        class SlowSink(DocumentSink):
+            def write(self, item):
+                release.wait(5)
+
+        renderer = FakeRenderer()
+        stages = StagedPipeline(renderer, SlowSink(tmp_path), "run1", queue_size=1)
+        items = make_items(sample_schools * 4, tmp_path)
+        thread = threading.Thread(target=stages.run, args=(items,))
+        thread.start()
+        try:
+            threading.Event().wait(0.3)
+            # One in the sink, one queued for it, one rendered and waiting
+            assert len(renderer.rendered) <= 3
+        finally:
+            release.set()
+            thread.join(5)
+        assert len(renderer.rendered) == 12
+
+    def test_sink_error_stops_the_run_and_settles_gauges(
+        self, sample_schools, tmp_path
+    ):
+        logged = []
+
+        class FailingSink(DocumentSink):
+            def write(self, item):
+                if item.index == 1:
+                    raise RuntimeError("host recycled")
+
+        stages = StagedPipeline(
+            FakeRenderer(), FailingSink(tmp_path), "run1", record=logged.append
+        )
+        with pytest.raises(RuntimeError, match="host recycled"):
+            stages.run(make_items(sample_schools * 10, tmp_path))
+
+        assert logged[0].school_code == sample_schools[0].SchoolCode
+        assert len(logged) < 29
+        assert QUEUE_DEPTH.value() == 0
+        assert ACTIVE_WORKERS.value() == 0
+
+
+class TestOncePerKey:
+    def test_concurrent_callers_share_one_call(self):
+        once = OncePerKey()
+        calls = []
+        started = threading.Event()
+
+        def slow():
+            calls.append(1)
+            started.wait(1)
+            return "value"
+
+        threads = [
+            threading.Thread(target=once.get, args=("k", slow)) for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        started.set()
+        for thread in threads:
+            thread.join()
+
+        assert calls == [1]
+        assert once.get("k", lambda: "other") == "value"
@@ -0,0 +1,128 @@
+from policy_localiser.graph.throttle import LatencyWindow, RateController, RetryPolicy
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestRetryPolicy:
+    def test_backoff_within_exponential_ceiling(self):
+        policy = RetryPolicy(base_delay=1.0, max_delay=8.0)
+        for attempt in range(6):
+            delay = policy.backoff(attempt)
+            assert 0 <= delay <= min(8.0, 2**attempt)
+
+    def test_retry_after_is_a_floor(self):
+        policy = RetryPolicy(base_delay=1.0)
+        assert all(policy.backoff(0, retry_after=10) >= 10 for _ in range(20))
+
+    def test_budget_limits_attempts_and_time(self):
+        policy = RetryPolicy(max_attempts=3, total_budget=10)
+        assert policy.allows(0, waited=0, delay=1)
+        assert not policy.allows(2, waited=0, delay=1)
+        assert not policy.allows(0, waited=9, delay=2)
+
+
+class TestRateController:
+    def test_throttle_decreases_limits_multiplicatively(self):
+        clock = FakeClock()
+        rc = RateController(initial_concurrency=8, initial_rate=20, clock=clock)
+        rc.on_response(429, {})
+        stats = rc.stats()
+        assert stats.concurrency_limit == 4
+        assert stats.rate_limit == 10
+        assert stats.throttled == 1
+
+    def test_burst_of_throttles_counts_once_per_cooldown(self):
+        clock = FakeClock()
+        rc = RateController(initial_concurrency=8, initial_rate=20, clock=clock)
+        for _ in range(5):
+            rc.on_response(503, {})
+        assert rc.stats().concurrency_limit == 4
+        assert rc.stats().unavailable == 5
+        assert rc.stats().decreases == 1
+
+        clock.now += 2
+        rc.on_response(503, {})
+        assert rc.stats().concurrency_limit == 2
+
+    def test_success_increases_additively(self):
+        rc = RateController(initial_concurrency=2, max_concurrency=4, clock=FakeClock())
+        rc.on_response(200, {})
+        rc.on_response(200, {})
+        assert rc.stats().concurrency_limit == 2.9
+        for _ in range(50):
+            rc.on_response(200, {})
+        assert rc.stats().concurrency_limit == 4
+
+    def test_server_errors_hold_the_limits(self):
+        rc = RateController(initial_concurrency=2, initial_rate=10, clock=FakeClock())
+        for status in (500, 502, 504):
+            rc.on_response(status, {})
+        stats = rc.stats()
+        assert (stats.concurrency_limit, stats.rate_limit) == (2, 10)
+        assert stats.server_errors == 3
+
+    def test_retry_after_pauses_admission(self):
+        clock = FakeClock()
+        rc = RateController(clock=clock)
+        rc.on_response(429, {"Retry-After": "7"})
+        with rc._lock:
+            assert rc._try_acquire() == 7
+        clock.now += 7
+        with rc._lock:
+            assert rc._try_acquire() == 0
+
+    def test_concurrency_slots(self):
+        clock = FakeClock()
+        rc = RateController(initial_concurrency=1, initial_rate=1000, clock=clock)
+        with rc._lock:
+            assert rc._try_acquire() == 0
+            assert rc._try_acquire() is None
+        rc.release()
+        clock.now += 1
+        with rc._lock:
+            assert rc._try_acquire() == 0
+
+    def test_rate_limit_headers_slow_down(self):
+        clock = FakeClock()
+        rc = RateController(initial_rate=20, clock=clock)
+        rc.on_response(
+            200,
+            {"RateLimit-Limit": "1000", "RateLimit-Remaining": "20", "RateLimit-Reset": "10"},
+        )
+        assert rc.stats().rate_limit == 2
+
+        rc.on_response(
+            200,
+            {"RateLimit-Limit": "1000", "RateLimit-Remaining": "0", "RateLimit-Reset": "30"},
+        )
+        assert rc.stats().rate_limit_pauses == 1
+
+    def test_has_capacity_respects_slots_tokens_and_pauses(self):
+        clock = FakeClock()
+        rc = RateController(initial_concurrency=1, initial_rate=1, clock=clock)
+        assert rc.has_capacity()
+        rc.acquire()
+        assert not rc.has_capacity()  # slot taken
+        rc.release()
+        assert not rc.has_capacity()  # no token yet
+        clock.now += 1
+        assert rc.has_capacity()
+        rc.on_response(429, {"Retry-After": "5"})
+        assert not rc.has_capacity()
+
+
+class TestLatencyWindow:
+    def test_nearest_rank_percentile_over_recent_samples(self):
+        window = LatencyWindow(size=20)
+        assert window.percentile(0.95) is None
+        for n in range(1, 41):
+            window.observe(n / 10)
+        assert len(window) == 20
+        assert window.percentile(0.95) == 3.9
+        assert window.percentile(0.5) == 3.0
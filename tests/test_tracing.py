@@ -0,0 +1,91 @@
+import logging
+
+import pytest
+import requests
+
+from policy_localiser.graph.tracing import CallTrace, CallTracer, endpoint_template
+from policy_localiser.metrics import GRAPH_LATENCY
+
+
+class TestEndpointTemplate:
+    def test_ids_and_item_paths_are_normalised(self):
+        cases = {
+            "/sites/contoso.sharepoint.com,1,2/drives": "/sites/{site}/drives",
+            "/sites/s/lists/L1/items?$expand=fields": "/sites/{site}/lists/{list}/items",
+            "/drives/b!x/items/01AB/content": "/drives/{drive}/items/{item}/content",
+            "/drives/b!x/root:/St Mary/Policy.docx:/content":
+                "/drives/{drive}/root:/{path}:/content",
+            "/drives/b!x/items/01AB:/Policy.docx:/content":
+                "/drives/{drive}/items/{item}:/{path}:/content",
+            "/drives/b!x/root:/St Mary": "/drives/{drive}/root:/{path}",
+            "https://graph.microsoft.com/v1.0/sites/s/lists?$skiptoken=abc":
+                "/sites/{site}/lists",
+            "/$batch": "/$batch",
+        }
+        for path, expected in cases.items():
+            assert endpoint_template(path) == expected, path
+
+    def test_graph_keywords_are_not_ids(self):
+        cases = {
+            "/drives/b!x/root/delta?token=abc": "/drives/{drive}/root/delta",
+            "/sites/s/lists/L1/items/delta": "/sites/{site}/lists/{list}/items/delta",
+            "/drives/b!x/items/root:/St Mary": "/drives/{drive}/items/root:/{path}",
+            "/drives/b!x/items/root/children": "/drives/{drive}/items/root/children",
+            "/drives/b!x/items/01AB/permissions/p1":
+                "/drives/{drive}/items/{item}/permissions/{permission}",
+            "/drives/b!x/items/01AB/createLink": "/drives/{drive}/items/{item}/createLink",
+            "/sites/root": "/sites/root",
+            "/drives/b!x/items/deltaFolder": "/drives/{drive}/items/{item}",
+        }
+        for path, expected in cases.items():
+            assert endpoint_template(path) == expected, path
+
+
+class TestCallTracer:
+    def test_aggregates_per_endpoint_and_logs_slow_calls(self, caplog):
+        tracer = CallTracer(slow_seconds=1.0)
+        for seconds in (0.1, 0.2, 1.5):
+            tracer.record(CallTrace("GET", "/drives/{drive}", 200, seconds))
+        tracer.record(CallTrace("PUT", "/drives/{drive}/root:/{path}:/content", 503,
+                                0.4, retries=2, request_id="abc"))
+        with caplog.at_level(logging.WARNING):
+            tracer.record(CallTrace("GET", "/sites/{site}/lists", 0, 3.0,
+                                    client_request_id="c1"))
+
+        endpoints = tracer.endpoints()
+        assert list(endpoints)[0] == ("GET", "/sites/{site}/lists")
+        drive = endpoints[("GET", "/drives/{drive}")]
+        assert (drive.calls, drive.slow, drive.failed, drive.max_seconds) == (3, 1, 0, 1.5)
+        put = endpoints[("PUT", "/drives/{drive}/root:/{path}:/content")]
+        assert (put.failed, put.retries) == (1, 2)
+        assert len(tracer.slow_calls) == 2
+        assert "no response" in caplog.text and "client-request-id c1" in caplog.text
+
+        lines = tracer.summary_lines()
+        assert len(lines) == 4
+        assert lines[1].startswith("GET /sites/{site}/lists")
+
+
+class TestGraphClientTracing:
+    def test_traces_status_retries_bytes_and_request_ids(self, fake_graph, fake_client):
+        observed = GRAPH_LATENCY.count(method="GET", endpoint="/sites/{site}/drives")
+        fake_graph.fail_next(1, status=429)
+
+        resp = fake_client.get("/sites/site/drives")
+
+        stats = fake_client.tracer.endpoints()[("GET", "/sites/{site}/drives")]
+        assert (stats.calls, stats.retries, stats.failed) == (1, 1, 0)
+        # The throttled response counts too
+        assert stats.bytes_received > len(resp.content)
+        assert resp.headers["client-request-id"]
+        assert GRAPH_LATENCY.count(
+            method="GET", endpoint="/sites/{site}/drives"
+        ) == observed + 1
+
+        fake_client.tracer.slow_seconds = 1e-9
+        with pytest.raises(requests.HTTPError):
+            fake_client.post("/sites/site/lists/x/items", json={"fields": {}})
+        trace = fake_client.tracer.slow_calls[-1]
+        assert trace.endpoint == "/sites/{site}/lists/{list}/items"
+        assert trace.status == 404 and trace.failed
+        assert trace.bytes_sent > 0 and trace.request_id
@@ -1,3 +1,4 @@
+import zipfile
 from pathlib import Path
 
 from policy_localiser.engine.models import SchoolRecord
@@ -60,3 +61,26 @@ class TestTemplateValidator:
         errors = validator.validate([template_path], logos_dir, duped)
         dup_errors = [e for e in errors if "Duplicate" in e.message]
         assert len(dup_errors) >= 1
+
+    def test_template_without_logo_slot_is_error(self, template_path, tmp_path):
+        template = tmp_path / "No_Logo.docx"
+        with zipfile.ZipFile(template_path) as src, zipfile.ZipFile(template, "w") as dst:
+            for name in src.namelist():
+                content = src.read(name)
+                if name == "word/header1.xml":
+                    content = content.replace(b"logo_placeholder.png", b"crest.png")
+                dst.writestr(name, content)
+
+        errors = TemplateValidator().validate_templates([template_path, template])
+
+        assert len(errors) == 1
+        assert "no logo slot" in errors[0].message
+        assert "No_Logo.docx" in errors[0].message
+
+    def test_corrupt_template_is_error(self, tmp_path):
+        template = tmp_path / "Broken.docx"
+        template.write_bytes(b"not a zip")
+
+        errors = TemplateValidator().validate_templates([template])
+
+        assert [e.message for e in errors] == [f"Template is not a valid .docx: {template}"]
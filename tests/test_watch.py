@@ -0,0 +1,159 @@
+import json
+import os
+import shutil
+
+import pytest
+
+from policy_localiser.engine.models import SchoolRecord
+from policy_localiser.orchestrator.watch import LocalWatcher
+
+
+class RecordingPipeline:
+    """Records which documents each round would render."""
+
+    def __init__(self):
+        self.rounds = []
+        self.error = None
+
+    def process_all(self, only=None, **kwargs):
+        self.rounds.append(only)
+        if self.error is not None:
+            raise self.error
+        return [only]
+
+
+def load_schools(path):
+    return [SchoolRecord(**s) for s in json.loads(path.read_text())]
+
+
+def touch(path, data=None):
+    """Rewrite a file with a newer mtime, as an editor's save would."""
+    if data is not None:
+        path.write_bytes(data)
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+
+@pytest.fixture
+def inputs(fixtures_dir, logos_dir, sample_schools, tmp_path):
+    templates = tmp_path / "templates"
+    templates.mkdir()
+    for name in ("A.docx", "B.docx"):
+        shutil.copy(fixtures_dir / "templates" / "Sample_Policy.docx", templates / name)
+    logos = tmp_path / "logos"
+    shutil.copytree(logos_dir, logos)
+    schools_json = tmp_path / "schools.json"
+    schools_json.write_text(json.dumps([vars(s) for s in sample_schools]))
+    return templates, logos, schools_json
+
+
+def make_watcher(inputs, tmp_path, **kwargs):
+    now = [0.0]
+    pipeline = RecordingPipeline()
+    watcher = LocalWatcher(
+        pipeline, *inputs, tmp_path / "out", load_schools=load_schools,
+        debounce=0.3, clock=lambda: now[0], **kwargs,
+    )
+    watcher.start()
+    return watcher, pipeline, now
+
+
+class TestLocalWatcher:
+    def test_rapid_saves_render_once_after_debounce(self, inputs, tmp_path):
+        templates, _, _ = inputs
+        watcher, pipeline, now = make_watcher(inputs, tmp_path)
+        assert pipeline.rounds == [None]  # the first run renders everything
+
+        for step in range(3):
+            now[0] = step * 0.1
+            touch(templates / "A.docx")
+            assert watcher.poll() is None
+        now[0] = 0.35
+        assert watcher.poll() is None  # only 0.15s since the last save
+        now[0] = 0.6
+
+        assert watcher.poll() == [{("STM", "A"), ("HFC", "A"), ("SJV", "A")}]
+        now[0] = 2.0
+        assert watcher.poll() is None
+        assert len(pipeline.rounds) == 2
+
+    def test_logo_and_school_changes_render_that_school(
+        self, inputs, sample_schools, tmp_path
+    ):
+        templates, logos, schools_json = inputs
+        watcher, _, now = make_watcher(inputs, tmp_path, template_filter=["B"])
+
+        touch(logos / "STM.png")
+        sample_schools[1].PrincipalName = "Dr New Principal"
+        new = SchoolRecord(**{**vars(sample_schools[0]), "SchoolCode": "NEW"})
+        schools_json.write_text(json.dumps([vars(s) for s in sample_schools + [new]]))
+        (templates / "~$A.docx").write_bytes(b"lock")  # Word's owner file
+        watcher.poll()
+        now[0] = 1.0
+
+        assert watcher.poll() == [{("STM", "B"), ("HFC", "B"), ("NEW", "B")}]
+
+    def test_unreadable_schools_json_keeps_previous_schools(self, inputs, tmp_path):
+        _, _, schools_json = inputs
+        watcher, _, now = make_watcher(inputs, tmp_path)
+        good = schools_json.read_bytes()
+
+        touch(schools_json, b"[{")
+        watcher.poll()
+        now[0] = 1.0
+        assert watcher.poll() is None
+        assert len(watcher.schools) == 3
+
+        touch(schools_json, good.replace(b"Hill", b"Hills", 1))
+        now[0] = 2.0
+        watcher.poll()
+        now[0] = 3.0
+        assert watcher.poll() is not None
+
+    def test_failed_round_is_retried_with_the_next_change(self, inputs, tmp_path):
+        templates, _, _ = inputs
+        watcher, pipeline, now = make_watcher(inputs, tmp_path)
+
+        pipeline.error = OSError("disk full")
+        touch(templates / "A.docx")
+        watcher.poll()
+        now[0] = 1.0
+        assert watcher.poll() is None
+
+        pipeline.error = None
+        touch(templates / "B.docx")
+        watcher.poll()
+        now[0] = 2.0
+        assert watcher.poll() == [
+            {(code, t) for code in ("STM", "HFC", "SJV") for t in ("A", "B")}
+        ]
+
+    def test_errors_do_not_stop_the_loop(self, inputs, tmp_path):
+        templates, _, _ = inputs
+        watcher, pipeline, now = make_watcher(inputs, tmp_path)
+        pipeline.error = ValueError("bad template")
+        rounds = []
+
+        class Steps:
+            """Stands in for the stop event: each wait is one 0.5s poll."""
+
+            def __init__(self):
+                self.count = 0
+
+            def wait(self, timeout):
+                self.count += 1
+                now[0] += 0.5
+                if self.count in (1, 3):
+                    touch(templates / "A.docx")
+                if self.count == 3:
+                    pipeline.error = None
+                return self.count > 5
+
+        def on_results(results):
+            rounds.append(results)
+            raise RuntimeError("printing failed")
+
+        watcher.run(on_results, Steps())
+
+        assert len(rounds) == 1
+        assert pipeline.rounds[1:] == [rounds[0][0]] * 2